@@ -8,19 +8,18 @@ import os
 import sys
 from google.adk.agents import Agent
 from google.adk.tools import agent_tool
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-# Import all the specialized agents
-from agents.reddit_scout.agent import agent as reddit_scout_agent
-from agents.summarization.agent import agent as summarization_agent
-from agents.classification.agent import agent as classification_agent
-from agents.analysis.politics_agent import agent as politics_analysis_agent
-from agents.analysis.technology_agent import agent as technology_analysis_agent
-from agents.analysis.business_agent import agent as business_analysis_agent
-from agents.analysis.finance_agent import agent as finance_analysis_agent
+# Import all the specialized agents (importing 'agents' also loads the .env file)
+from agents import (
+    reddit_scout_agent,
+    summarization_agent,
+    classification_agent,
+    politics_analysis_agent,
+    technology_analysis_agent,
+    business_analysis_agent,
+    finance_analysis_agent,
+)
+from agents.common.tracing import instrument_agents
 
 # Define the Agent
 agent = Agent(
@@ -68,4 +67,7 @@ agent = Agent(
         agent_tool.AgentTool(agent=business_analysis_agent),
         agent_tool.AgentTool(agent=finance_analysis_agent)
     ],
-) 
\ No newline at end of file
+) 
+
+# Spans for every agent hop and model call; the callbacks do nothing unless tracing is on.
+instrument_agents(agent)
@@ -1,16 +1,56 @@
-# This file makes 'reddit_scout' a Python package.
-# It should import the agent instance to make it discoverable.
-
-# Import the agent instances
-from agents.reddit_scout.agent import agent as reddit_scout_agent
-from agents.summarization.agent import agent as summarization_agent 
-from agents.classification.agent import agent as classification_agent
-from agents.analysis.politics_agent import agent as politics_analysis_agent
-from agents.analysis.technology_agent import agent as technology_analysis_agent
-from agents.analysis.business_agent import agent as business_analysis_agent
-from agents.analysis.finance_agent import agent as finance_analysis_agent
-from agents.router.agent import agent as router_agent
-
-# Export the router agent as the main entry point for the web UI
-agent = router_agent
-
+# This file makes 'agents' a Python package.
+# Agents are registered by name and built on first access, so importing a
+# helper package such as agents.common does not construct every agent and load
+# ADK, the Gemini client and PRAW up front.
+
+import importlib
+from typing import Any, Dict, List
+
+from agents.common.env import load_env
+
+# Load .env once, before any agent module reads its configuration.
+load_env()
+
+# Module defining each agent, by the name it is exported under.
+AGENT_MODULES: Dict[str, str] = {
+    "reddit_scout_agent": "agents.reddit_scout.agent",
+    "summarization_agent": "agents.summarization.agent",
+    "classification_agent": "agents.classification.agent",
+    "politics_analysis_agent": "agents.analysis.politics_agent",
+    "technology_analysis_agent": "agents.analysis.technology_agent",
+    "business_analysis_agent": "agents.analysis.business_agent",
+    "finance_analysis_agent": "agents.analysis.finance_agent",
+    "router_agent": "agents.router.agent",
+    # The router agent is the main entry point for the web UI
+    "agent": "agents.router.agent",
+}
+
+__all__ = list(AGENT_MODULES)
+
+
+def get_agent(name: str) -> Any:
+    """
+    Returns a registered agent, importing the module that defines it on first use.
+
+    Args:
+        name: The exported name, e.g. 'router_agent' or 'reddit_scout_agent'.
+
+    Returns:
+        The agent instance.
+    """
+    if name not in AGENT_MODULES:
+        raise KeyError(f"Unknown agent '{name}'. Registered agents: {', '.join(AGENT_MODULES)}")
+    agent = importlib.import_module(AGENT_MODULES[name]).agent
+    # Later lookups find the attribute directly and skip __getattr__.
+    globals()[name] = agent
+    return agent
+
+
+def __getattr__(name: str) -> Any:
+    if name in AGENT_MODULES:
+        return get_agent(name)
+    raise AttributeError(f"module 'agents' has no attribute '{name}'")
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(AGENT_MODULES))
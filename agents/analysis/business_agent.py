@@ -1,10 +1,19 @@
 import os
+import sys
 from typing import Dict, List, Any
 
+# Add the parent directory to sys.path to allow importing from sibling packages
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
+
 from google.adk.agents import Agent
-from dotenv import load_dotenv
-load_dotenv()
 
+from agents.common.response_cache import cache_after_model, cache_before_model, cache_model_error
+from agents.common.tracing import traced
+from agents.analysis.discussion import DISCUSSION_INSTRUCTION, get_comment_digests
+
+@traced()
 def analyze_business_news(news_content: Dict[str, List[str]]) -> Dict[str, Any]:
     """
     Analyzes business news headlines and provides deeper insights.
@@ -45,6 +54,10 @@ agent = Agent(
         "   - Consider both short-term impacts and potential long-term implications"
         "   - Place corporate news in context of broader industry and economic conditions"
         "   - Explain financial terminology in accessible language when needed"
+        + DISCUSSION_INSTRUCTION
     ),
-    tools=[analyze_business_news],
+    tools=[analyze_business_news, get_comment_digests],
+    before_model_callback=cache_before_model,
+    after_model_callback=cache_after_model,
+    on_model_error_callback=cache_model_error,
 ) 
\ No newline at end of file
@@ -0,0 +1,29 @@
+import importlib
+from typing import Dict, List
+
+# Instruction section shared by the analysis agents, which all have the
+# get_comment_digests tool.
+DISCUSSION_INSTRUCTION = (
+    "4. **Discussion**:"
+    "   - Headlines alone can be thin; when reactions would sharpen the analysis, call `get_comment_digests` for up to two of the subreddits to read the top comments under their hottest posts"
+    "   - Treat comments as public reaction, not as facts"
+)
+
+
+def get_comment_digests(subreddit: str, limit: int = 3) -> Dict[str, List[str]]:
+    """
+    Fetches the top comments under the hottest posts of a subreddit, as compact digests.
+
+    Args:
+        subreddit: The name of the subreddit (e.g., 'worldnews').
+        limit: The number of hottest posts whose comments are fetched.
+
+    Returns:
+        A dictionary with the subreddit name as key and one digest per post as
+        value: the headline with its score and comment count, then the top
+        comments. Returns an error message if the posts can't be fetched.
+    """
+    # The reddit_scout package builds the scout agent when it is imported, so
+    # it is only loaded once an analysis agent actually asks for comments.
+    comments = importlib.import_module("agents.reddit_scout.comments")
+    return comments.get_comment_digests(subreddit, limit)
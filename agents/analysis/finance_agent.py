@@ -3,12 +3,17 @@ import sys
 from typing import Dict, List, Any
 
 # Add the parent directory to sys.path to allow importing from sibling packages
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
 
 from google.adk.agents import Agent
-from dotenv import load_dotenv
-load_dotenv()
 
+from agents.common.response_cache import cache_after_model, cache_before_model, cache_model_error
+from agents.common.tracing import traced
+from agents.analysis.discussion import DISCUSSION_INSTRUCTION, get_comment_digests
+
+@traced()
 def analyze_finance_news(news_content: Dict[str, List[str]]) -> Dict[str, Any]:
     """
     Analyzes financial news headlines and provides deeper insights.
@@ -49,6 +54,10 @@ agent = Agent(
         "   - Consider global economic contexts where relevant"
         "   - Avoid making specific investment recommendations"
         "   - Focus on fundamental factors rather than short-term market movements"
+        + DISCUSSION_INSTRUCTION
     ),
-    tools=[analyze_finance_news],
+    tools=[analyze_finance_news, get_comment_digests],
+    before_model_callback=cache_before_model,
+    after_model_callback=cache_after_model,
+    on_model_error_callback=cache_model_error,
 ) 
\ No newline at end of file
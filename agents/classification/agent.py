@@ -1,14 +1,45 @@
 import os
 import sys
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 
 # Add the parent directory to sys.path to allow importing from sibling packages
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
 
 from google.adk.agents import Agent
-from dotenv import load_dotenv
-load_dotenv()
 
+from agents.common.response_cache import cache_after_model, cache_before_model, cache_model_error
+from agents.common.tracing import traced
+
+from agents.common.dedup import annotate_sources, dedupe_news
+from .local_classifier import UNCATEGORIZED, classify_headlines
+
+@traced()
+def classify_content(news_content: Dict[str, List[str]]) -> Tuple[Dict[str, Dict[str, List[str]]], Dict[str, List[str]]]:
+    """
+    Deduplicates news headlines and classifies them locally.
+
+    Args:
+        news_content: A dictionary where keys are sources (e.g., subreddit names) and
+                     values are lists of headlines to classify.
+
+    Returns:
+        The headlines grouped by category and source, with their text unchanged,
+        and a dictionary mapping each merged headline to its other sources.
+    """
+    # Collapse the same story carried by several sources so it is only classified once
+    news_content, also_in, stats = dedupe_news(news_content)
+    print(f"--- Tool result: {stats['input_headlines']} -> {stats['output_headlines']} headlines after dedup ({stats['reduction_ratio']:.0%} reduction) ---")
+    
+    # Obvious headlines are classified locally; only low-confidence ones are left
+    # for the LLM to place through the agent's reasoning
+    classified = classify_headlines(news_content)
+    uncertain = sum(len(headlines) for headlines in classified.get(UNCATEGORIZED, {}).values())
+    print(f"--- Tool result: {uncertain} headlines left for LLM classification ---")
+    return classified, also_in
+
+@traced()
 def classify_news(news_content: Dict[str, List[str]]) -> Dict[str, Dict[str, List[str]]]:
     """
     Classifies news headlines into different topic categories.
@@ -20,12 +51,12 @@ def classify_news(news_content: Dict[str, List[str]]) -> Dict[str, Dict[str, Lis
     Returns:
         A dictionary where the first level keys are category names (politics, technology, etc.)
         and values are dictionaries with source names as keys and filtered headlines as values.
+        Headlines the local classifier is not confident about are grouped under
+        'uncategorized' and must be classified by the agent.
     """
     print(f"--- Tool called: Classifying news from {len(news_content)} sources ---")
-    
-    # The actual classification will be handled by the LLM through the agent's reasoning
-    # This function is just a passthrough to make the dictionary available to the agent
-    return news_content  # Return original content, agent will handle classification in reasoning
+    classified, also_in = classify_content(news_content)
+    return annotate_sources(classified, also_in)
 
 # Define the Agent
 agent = Agent(
@@ -44,14 +75,16 @@ agent = Agent(
         "   - Health: Medical news, public health, wellness, healthcare systems"
         "   - Environment: Climate, sustainability, natural disasters, conservation"
         "2. **Classification Process**:"
-        "   - Analyze each headline to determine its primary topic"
+        "   - Always call the `classify_news` tool first. It returns headlines already grouped by category and source"
+        "   - Keep the tool's categories as they are; only headlines under 'uncategorized' need your judgment"
+        "   - Analyze each uncategorized headline to determine its primary topic"
         "   - Group headlines by topic category"
         "   - For each headline, assign exactly one primary category (the best fit)"
         "   - If a headline could belong to multiple categories, choose the most prominent theme"
         "3. **Output Format**:"
         "   - Organize your response by category, not by source"
         "   - Under each category heading, list the relevant headlines"
-        "   - Include the source (e.g., subreddit name) with each headline"
+        "   - Include the source (e.g., subreddit name) with each headline, plus any sources listed after 'also in:'"
         "   - If a category has no headlines, you can omit it entirely"
         "4. **Classification Priority**:"
         "   - Focus on the main subject matter of each headline"
@@ -59,4 +92,7 @@ agent = Agent(
         "   - Maintain neutrality in your categorization"
     ),
     tools=[classify_news],
+    before_model_callback=cache_before_model,
+    after_model_callback=cache_after_model,
+    on_model_error_callback=cache_model_error,
 ) 
\ No newline at end of file
@@ -0,0 +1,2 @@
+# This file makes 'common' a Python package.
+# It holds processing helpers shared by several agents.
@@ -0,0 +1,254 @@
+import hashlib
+import os
+import random
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Minimum word-set Jaccard similarity for two headlines to count as the same story.
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.6"))
+
+# MinHash signature length and its split into LSH bands. With 8 bands of 3 rows,
+# pairs at or above ~0.5 similarity almost always share a bucket.
+NUM_PERM = 24
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+# Candidates compared per bucket; bounds the cost of very common signatures.
+MAX_BUCKET_CANDIDATES = 64
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or over that the "
+    "to was were will with after amid into new says said".split()
+)
+
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(1729)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)]
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class Headline:
+    """A canonical headline together with every source that carried it."""
+
+    __slots__ = ("title", "sources")
+
+    def __init__(self, title: str, sources: List[str]):
+        self.title = title
+        self.sources = sources
+
+    def __repr__(self) -> str:
+        return f"Headline({self.title!r}, sources={self.sources!r})"
+
+
+class MinHasher:
+    """Computes MinHash signatures, caching the per-token hash rows."""
+
+    def __init__(self):
+        self._token_rows: Dict[str, Tuple[int, ...]] = {}
+
+    def _row(self, token: str) -> Tuple[int, ...]:
+        row = self._token_rows.get(token)
+        if row is None:
+            value = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+            row = tuple((a * value + b) % _MERSENNE for a, b in _PERMUTATIONS)
+            self._token_rows[token] = row
+        return row
+
+    def signature(self, tokens: Iterable[str]) -> Optional[Tuple[int, ...]]:
+        rows = [self._row(token) for token in tokens]
+        if not rows:
+            return None
+        # Column-wise minimum over the token rows.
+        return tuple(map(min, zip(*rows)))
+
+
+def shingles(title: str) -> frozenset:
+    """Returns the normalized word set used to compare headlines."""
+    return frozenset(token for token in _TOKEN_RE.findall(title.lower()) if token not in STOPWORDS)
+
+
+class HeadlineIndex:
+    """
+    Incremental near-duplicate index over headlines.
+
+    Candidate matches come from MinHash LSH buckets, so adding a headline costs
+    roughly the same however many are indexed; each candidate is confirmed with
+    the exact Jaccard similarity of the two word sets.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, hasher: Optional[MinHasher] = None):
+        self.threshold = threshold
+        self.hasher = hasher or MinHasher()
+        self.headlines: List[Headline] = []
+        self._word_sets: List[frozenset] = []
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.headlines)
+
+    def find(self, title: str) -> Optional[Headline]:
+        """Returns the indexed headline `title` duplicates, if any."""
+        match, _, _ = self._lookup(title)
+        return None if match is None else self.headlines[match]
+
+    def add(self, source: str, title: str) -> Tuple[Headline, bool]:
+        """
+        Adds a headline, merging it into an indexed duplicate if there is one.
+
+        Returns:
+            The canonical Headline and True if `title` started a new story.
+        """
+        match, words, keys = self._lookup(title)
+        if match is not None:
+            headline = self.headlines[match]
+            if source not in headline.sources:
+                headline.sources.append(source)
+            return headline, False
+
+        index = len(self.headlines)
+        headline = Headline(title, [source])
+        self.headlines.append(headline)
+        self._word_sets.append(words)
+        for key in keys:
+            self._buckets.setdefault(key, []).append(index)
+        return headline, True
+
+    def _lookup(self, title: str) -> Tuple[Optional[int], frozenset, List[Tuple[int, Tuple[int, ...]]]]:
+        words = shingles(title)
+        signature = self.hasher.signature(words)
+        keys = []
+        if signature is None:
+            return None, words, keys
+        candidates = set()
+        for band in range(BANDS):
+            key = (band, signature[band * ROWS:(band + 1) * ROWS])
+            keys.append(key)
+            candidates.update(self._buckets.get(key, ())[-MAX_BUCKET_CANDIDATES:])
+        for index in sorted(candidates):
+            other = self._word_sets[index]
+            if len(words & other) >= self.threshold * len(words | other):
+                return index, words, keys
+        return None, words, keys
+
+
+def collapse_headlines(
+    items: Iterable[Tuple[str, str]], threshold: float = DEDUP_THRESHOLD
+) -> List[Headline]:
+    """
+    Merges near-duplicate headlines.
+
+    The first headline of every group is kept as the canonical title.
+
+    Args:
+        items: (source, title) pairs in priority order.
+        threshold: Minimum Jaccard similarity for two headlines to be merged.
+
+    Returns:
+        One Headline per story, in order of first appearance.
+    """
+    index = HeadlineIndex(threshold)
+    for source, title in items:
+        index.add(source, title)
+    return index.headlines
+
+
+class StreamingDeduplicator:
+    """
+    Near-duplicate filter for an unbounded stream of headlines.
+
+    Keeps two generations of HeadlineIndex: once the current one holds
+    `max_entries` headlines it becomes the previous one and the oldest is
+    dropped, so memory stays bounded while recent stories are remembered.
+    """
+
+    def __init__(self, max_entries: int = 20000, threshold: float = DEDUP_THRESHOLD):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._hasher = MinHasher()
+        self._current = HeadlineIndex(threshold, self._hasher)
+        self._previous: Optional[HeadlineIndex] = None
+
+    def is_new(self, source: str, title: str) -> bool:
+        """Records a headline and returns False if it repeats a remembered story."""
+        if self._previous is not None and self._previous.find(title) is not None:
+            return False
+        _, new = self._current.add(source, title)
+        if len(self._current) >= self.max_entries:
+            self._previous = self._current
+            # A fresh hasher drops the token rows cached for the retired generation.
+            self._hasher = MinHasher()
+            self._current = HeadlineIndex(self.threshold, self._hasher)
+        return new
+
+
+def dedupe_news(
+    news_content: Dict[str, List[str]], threshold: float = DEDUP_THRESHOLD
+) -> Tuple[Dict[str, List[str]], Dict[str, List[str]], Dict[str, float]]:
+    """
+    Collapses the same story reported by several sources into one headline.
+
+    Headlines keep their exact text, so later stages can still look them up
+    by title; the other sources of a merged story are returned separately.
+
+    Args:
+        news_content: A dictionary where keys are sources (e.g., subreddit names)
+                      and values are lists of headlines.
+        threshold: Minimum Jaccard similarity for two headlines to be merged.
+
+    Returns:
+        The deduplicated content in the same shape, with each merged headline
+        listed under its first source; a dictionary mapping each merged
+        headline to its other sources; and a stats dictionary with
+        input/output counts and the reduction ratio.
+    """
+    items = [(source, title) for source, titles in news_content.items() for title in titles]
+    headlines = collapse_headlines(items, threshold)
+
+    deduped: Dict[str, List[str]] = {source: [] for source in news_content}
+    also_in: Dict[str, List[str]] = {}
+    for headline in headlines:
+        deduped[headline.sources[0]].append(headline.title)
+        if len(headline.sources) > 1:
+            also_in[headline.title] = headline.sources[1:]
+
+    total = len(items)
+    stats = {
+        "input_headlines": total,
+        "output_headlines": len(headlines),
+        "reduction_ratio": (total - len(headlines)) / total if total else 0.0,
+    }
+    return deduped, also_in, stats
+
+
+def with_sources(headline: str, also_in: Dict[str, List[str]]) -> str:
+    """Formats a headline for display, naming the other sources of a merged story."""
+    others = also_in.get(headline)
+    return f"{headline} (also in: {', '.join(others)})" if others else headline
+
+
+def annotate_sources(content: Dict[str, Any], also_in: Dict[str, List[str]]) -> Dict[str, Any]:
+    """
+    Applies with_sources() to every headline of source -> headlines, or of
+    category -> source -> headlines, for content shown to a model or a user.
+    """
+    return {
+        key: annotate_sources(value, also_in) if isinstance(value, dict) else [with_sources(h, also_in) for h in value]
+        for key, value in content.items()
+    }
+
+
+def spread_sources(content: Dict[str, List[str]], also_in: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Lists every merged headline under each of its sources again, with its exact text.
+
+    Stages that pack headlines send a story carried by several sources once,
+    with all their keys, so the sources travel with the headline instead of
+    inside its text.
+    """
+    spread: Dict[str, List[str]] = {source: list(headlines) for source, headlines in content.items()}
+    for headlines in content.values():
+        for headline in headlines:
+            for source in also_in.get(headline, ()):
+                bucket = spread.setdefault(source, [])
+                if headline not in bucket:
+                    bucket.append(headline)
+    return spread
@@ -0,0 +1,28 @@
+import os
+import threading
+
+# Directory the local caches and stores default to: .cache in the project root,
+# whichever directory the process was started from.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".cache")
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """
+    Loads the project's .env file into the environment, once per process.
+
+    Every module that reads configuration at import time runs after the
+    `agents` package has called this, so they all see the same settings.
+    Variables that are already set are not overridden.
+    """
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            _loaded = True
@@ -0,0 +1,239 @@
+import json
+import math
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .tracing import annotate
+
+# Estimated tokens a packed payload may use; lower-ranked headlines are left out
+# beyond it. 0 disables trimming.
+PAYLOAD_TOKEN_BUDGET = int(os.getenv("PAYLOAD_TOKEN_BUDGET", "2000"))
+
+# Approximates a BPE tokenizer: a word, up to three digits, a punctuation mark
+# or a line break with its indentation is about one token each.
+_TOKEN_RE = re.compile(r"[^\W\d_]+|\d{1,3}|\n[ \t]*|[^\w\s]|_")
+# Reddit's epoch for the hot ranking (2005-12-08).
+_HOT_EPOCH = 1134028003
+
+_OMITTED = "({} lower-ranked headline(s) omitted)"
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly counts the tokens a model sees for `text`, without a tokenizer."""
+    return len(_TOKEN_RE.findall(text))
+
+
+def hot_rank(score: int, created_utc: float) -> float:
+    """Reddit's hot ranking: log-scaled score plus a bonus for recency."""
+    order = math.log10(max(abs(score), 1))
+    sign = 1 if score > 0 else -1 if score < 0 else 0
+    return sign * order + (created_utc - _HOT_EPOCH) / 45000
+
+
+def post_ranks(posts: Iterable[Any]) -> Dict[str, float]:
+    """
+    Maps headlines to their hot rank, from records with title, score and created_utc.
+
+    Args:
+        posts: Post records or PRAW submissions.
+    """
+    ranks: Dict[str, float] = {}
+    for post in posts:
+        rank = hot_rank(post.score, post.created_utc)
+        if rank > ranks.get(post.title, -math.inf):
+            ranks[post.title] = rank
+    return ranks
+
+
+def _normalize(headline: str) -> str:
+    return " ".join(headline.lower().split())
+
+
+def _source_keys(count: int) -> List[str]:
+    """Short keys for the source table: a..z, then aa, ab, ..."""
+    keys = []
+    for i in range(count):
+        key = ""
+        i += 1
+        while i:
+            i, rest = divmod(i - 1, 26)
+            key = chr(ord("a") + rest) + key
+        keys.append(key)
+    return keys
+
+
+class PackedPayload:
+    """
+    Headlines encoded for a prompt, with the ids needed to decode a reply.
+
+    Attributes:
+        text: The packed payload.
+        headlines: Id -> (sources, headline) of every headline in `text`.
+        dropped: Headlines left out to stay within the token budget.
+        tokens: Estimated tokens of `text`.
+        baseline_tokens: Estimated tokens of the encoding the payload replaces.
+    """
+
+    __slots__ = ("text", "headlines", "dropped", "tokens", "baseline_tokens")
+
+    def __init__(self, text: str, headlines: Dict[int, Tuple[Tuple[str, ...], str]], dropped: int, baseline: str):
+        self.text = text
+        self.headlines = headlines
+        self.dropped = dropped
+        self.tokens = estimate_tokens(text)
+        self.baseline_tokens = estimate_tokens(baseline)
+
+    @property
+    def saved(self) -> int:
+        return self.baseline_tokens - self.tokens
+
+    def resolve(self, ids: Iterable[Any]) -> Dict[str, List[str]]:
+        """
+        Turns headline ids from a reply back into source -> headlines.
+
+        Unknown ids are skipped. Entries that are not ids are taken as headline
+        text, for replies that copied headlines instead of citing them.
+        """
+        by_text = None
+        resolved: Dict[str, List[str]] = {}
+        for value in ids:
+            try:
+                entry = self.headlines.get(int(value))
+            except (TypeError, ValueError):
+                if by_text is None:
+                    by_text = {_normalize(headline): (sources, headline) for sources, headline in self.headlines.values()}
+                entry = by_text.get(_normalize(str(value)))
+            if entry is None:
+                continue
+            sources, headline = entry
+            for source in sources:
+                resolved.setdefault(source, []).append(headline)
+        return resolved
+
+    def report(self, hop: str) -> None:
+        """Prints and accumulates the tokens saved on one agent hop."""
+        with _stats_lock:
+            totals = _stats.setdefault(hop, {"payloads": 0, "tokens": 0, "baseline_tokens": 0, "dropped": 0})
+            totals["payloads"] += 1
+            totals["tokens"] += self.tokens
+            totals["baseline_tokens"] += self.baseline_tokens
+            totals["dropped"] += self.dropped
+        annotate(payload_tokens=self.tokens, payload_saved_tokens=self.saved, payload_dropped=self.dropped)
+        share = 100 * self.saved / self.baseline_tokens if self.baseline_tokens else 0
+        print(
+            f"--- Payload: {hop} {self.baseline_tokens} -> {self.tokens} tokens "
+            f"({share:.0f}% saved, {self.dropped} headline(s) trimmed) ---"
+        )
+
+
+def pack(
+    content: Dict[str, Any],
+    budget: Optional[int] = None,
+    ranks: Optional[Dict[str, float]] = None,
+    baseline: Optional[str] = None,
+) -> PackedPayload:
+    """
+    Encodes headlines compactly for an agent prompt.
+
+    Sources are listed once and referenced by short keys (omitted when there is
+    only one), and every distinct headline is one line starting with its
+    numeric id, so a reply can cite headlines by id. A headline found in several sources is sent once. If the
+    payload would exceed `budget` tokens, the lowest-ranked headlines are left
+    out: by `ranks` where given, else by their position in each listing, which
+    for hot listings already reflects score and recency.
+
+    Args:
+        content: source -> headlines, or category -> source -> headlines.
+        budget: Token budget; defaults to PAYLOAD_TOKEN_BUDGET, 0 means unlimited.
+        ranks: Optional headline -> rank (higher is kept first), e.g. from post_ranks().
+        baseline: The encoding the payload replaces, for the savings report.
+            Defaults to `content` as indented JSON.
+
+    Returns:
+        A PackedPayload.
+    """
+    budget = PAYLOAD_TOKEN_BUDGET if budget is None else budget
+    grouped = content and not all(isinstance(value, list) for value in content.values())
+    groups = content if grouped else {"": content}
+
+    # (group, normalized headline) -> [headline, sources, best position]
+    entries: Dict[Tuple[str, str], list] = {}
+    sources: Dict[str, None] = {}
+    for group, by_source in groups.items():
+        if not isinstance(by_source, dict):
+            continue
+        for source, headlines in by_source.items():
+            sources[source] = None
+            for position, headline in enumerate(headlines):
+                key = (group, _normalize(headline))
+                entry = entries.get(key)
+                if entry is None:
+                    entries[key] = [headline, [source], position]
+                else:
+                    if source not in entry[1]:
+                        entry[1].append(source)
+                    entry[2] = min(entry[2], position)
+
+    group_lines = {group: f"[{group}]" for group in groups} if grouped else {}
+    if len(sources) > 1:
+        keys = dict(zip(sources, _source_keys(len(sources))))
+        header = "Sources: " + " ".join(f"{key}=r/{source}" for source, key in keys.items())
+        lines = [(key, f"{','.join(keys[source] for source in entry[1])} {entry[0]}") for key, entry in entries.items()]
+    else:
+        # A single source is named by the prompt; lines need no source keys.
+        header = ""
+        lines = [(key, entry[0]) for key, entry in entries.items()]
+
+    kept = set(entries)
+    if budget > 0:
+        # Each line also carries its id and a line break.
+        cost = estimate_tokens(header) + sum(estimate_tokens(line) + 1 for line in group_lines.values())
+        total = cost + sum(estimate_tokens(line) + 2 for _, line in lines)
+        if total > budget:
+            cost += estimate_tokens(_OMITTED.format(len(entries))) + 1
+
+            def priority(key):
+                headline, _, position = entries[key]
+                rank = ranks.get(headline) if ranks else None
+                return (rank if rank is not None else -math.inf, -position)
+
+            kept = set()
+            for key, line in sorted(lines, key=lambda item: priority(item[0]), reverse=True):
+                line_cost = estimate_tokens(line) + 2
+                if cost + line_cost > budget:
+                    continue
+                kept.add(key)
+                cost += line_cost
+
+    out = [header] if header else []
+    headlines: Dict[int, Tuple[Tuple[str, ...], str]] = {}
+    current_group = None
+    for key, line in lines:
+        if key not in kept:
+            continue
+        if grouped and key[0] != current_group:
+            current_group = key[0]
+            out.append(group_lines[current_group])
+        headline_id = len(headlines) + 1
+        headlines[headline_id] = (tuple(entries[key][1]), entries[key][0])
+        out.append(f"{headline_id} {line}")
+    dropped = len(entries) - len(kept)
+    if dropped:
+        out.append(_OMITTED.format(dropped))
+    if baseline is None:
+        baseline = json.dumps(content, ensure_ascii=False, indent=1)
+    return PackedPayload("\n".join(out), headlines, dropped, baseline)
+
+
+def get_payload_stats() -> Dict[str, Dict[str, int]]:
+    """Returns per-hop totals of packed payloads and the tokens they saved."""
+    with _stats_lock:
+        snapshot = {hop: dict(totals) for hop, totals in _stats.items()}
+    for totals in snapshot.values():
+        totals["saved_tokens"] = totals["baseline_tokens"] - totals["tokens"]
+    return snapshot
@@ -0,0 +1,247 @@
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from .env import CACHE_DIR
+from .tracing import event
+
+# SQLite file holding cached model responses.
+RESPONSE_CACHE_PATH = os.getenv("RESPONSE_CACHE_PATH", os.path.join(CACHE_DIR, "responses.sqlite3"))
+# Seconds a cached response stays valid.
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+# Entries kept before the least recently used ones are evicted.
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+# Set to 1 to always call the model (responses are still stored).
+RESPONSE_CACHE_BYPASS = os.getenv("RESPONSE_CACHE_BYPASS", "").lower() in ("1", "true", "yes")
+
+# Session state key that bypasses the cache for one session.
+BYPASS_STATE_KEY = "cache_bypass"
+
+# Stores run between two eviction passes.
+_EVICTION_INTERVAL = 50
+# Seconds after which a model call that never returned a response is forgotten.
+_PENDING_TTL = 600.0
+
+_bypass = contextvars.ContextVar("response_cache_bypass", default=False)
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()
+
+
+def _normalize_part(part) -> Dict[str, Any]:
+    # Function call ids are generated per invocation, so they are left out.
+    if part.function_call is not None:
+        return {"call": part.function_call.name, "args": part.function_call.args or {}}
+    if part.function_response is not None:
+        return {"response": part.function_response.name, "data": part.function_response.response or {}}
+    return {"text": " ".join((part.text or "").split())}
+
+
+def request_key(agent_name: str, llm_request: LlmRequest) -> str:
+    """
+    Builds the content address of a model request.
+
+    The key combines the agent name, the model, a hash of the instruction and
+    available tools, and a hash of the conversation contents with whitespace
+    and per-call ids normalized away.
+    """
+    config = llm_request.config
+    instruction = str(config.system_instruction) if config is not None and config.system_instruction else ""
+    tools = ",".join(sorted(llm_request.tools_dict))
+    contents = [
+        {"role": content.role, "parts": [_normalize_part(part) for part in content.parts or []]}
+        for content in llm_request.contents
+    ]
+    return _digest("\n".join([
+        agent_name,
+        llm_request.model or "",
+        _digest(instruction + "\n" + tools),
+        _digest(json.dumps(contents, sort_keys=True, ensure_ascii=False, default=str)),
+    ]))
+
+
+class ResponseCache:
+    """
+    Persistent, size-bounded cache of model responses in a local SQLite file.
+
+    Entries expire after `ttl` seconds; once more than `max_entries` are stored
+    the least recently used ones are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str = RESPONSE_CACHE_PATH,
+        ttl: float = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._stores_since_eviction = 0
+        self._stats: Dict[str, int] = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, agent TEXT, model TEXT,"
+                " created_at REAL, last_used REAL, response TEXT)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT response FROM responses WHERE key = ? AND created_at > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            connection.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self._stats["hits"] += 1
+            return row[0]
+
+    def put(self, key: str, agent: str, model: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, agent, model, created_at, last_used, response)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, agent, model, now, now, response),
+            )
+            self._stats["stores"] += 1
+            self._stores_since_eviction += 1
+            if self._stores_since_eviction >= _EVICTION_INTERVAL:
+                self._evict(connection, now)
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        self._stores_since_eviction = 0
+        removed = connection.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl,)).rowcount
+        removed += connection.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        self._stats["evictions"] += removed
+
+    def count_bypass(self) -> None:
+        with self._lock:
+            self._stats["bypassed"] += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Returns hit/miss/store/eviction counters and the hit rate."""
+        with self._lock:
+            snapshot: Dict[str, float] = dict(self._stats)
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_rate"] = snapshot["hits"] / lookups if lookups else 0.0
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM responses")
+
+
+# Shared by every agent that uses the cache callbacks.
+response_cache = ResponseCache()
+
+# (cache key, model, start time) of model calls in progress, by (invocation id, agent name).
+_pending: Dict[tuple, tuple] = {}
+_pending_lock = threading.Lock()
+
+
+def _add_pending(slot: tuple, key: str, model: str) -> None:
+    now = time.time()
+    with _pending_lock:
+        # A call that raised never reaches cache_after_model; drop it once it is stale.
+        for stale in [entry for entry, (_, _, started) in _pending.items() if now - started > _PENDING_TTL]:
+            del _pending[stale]
+        _pending[slot] = (key, model, now)
+
+
+def _pop_pending(slot: tuple) -> Optional[tuple]:
+    with _pending_lock:
+        return _pending.pop(slot, None)
+
+
+@contextmanager
+def bypass_response_cache() -> Iterator[None]:
+    """Makes model calls in the enclosed block skip the cache lookup."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def _bypassed(callback_context: CallbackContext) -> bool:
+    return RESPONSE_CACHE_BYPASS or _bypass.get() or bool(callback_context.state.get(BYPASS_STATE_KEY))
+
+
+def cache_before_model(callback_context: CallbackContext, llm_request: LlmRequest) -> Optional[LlmResponse]:
+    """
+    ADK before_model_callback that answers repeated requests from the cache.
+
+    Returns:
+        The cached LlmResponse, which makes ADK skip the model call, or None.
+    """
+    key = request_key(callback_context.agent_name, llm_request)
+    cached = None
+    if _bypassed(callback_context):
+        response_cache.count_bypass()
+        event("response_cache", "bypass")
+    else:
+        cached = response_cache.get(key)
+        event("response_cache", "miss" if cached is None else "hit")
+    if cached is None:
+        _add_pending((callback_context.invocation_id, callback_context.agent_name), key, llm_request.model or "")
+        return None
+    print(f"--- Cache hit: Reusing {callback_context.agent_name} response ---")
+    return LlmResponse.model_validate_json(cached)
+
+
+def cache_after_model(callback_context: CallbackContext, llm_response: LlmResponse) -> Optional[LlmResponse]:
+    """ADK after_model_callback that stores complete, successful responses."""
+    pending = _pop_pending((callback_context.invocation_id, callback_context.agent_name))
+    if pending is None or llm_response.partial or llm_response.error_code or llm_response.content is None:
+        return None
+    data = llm_response.model_dump(mode="json", exclude_none=True)
+    for part in data.get("content", {}).get("parts", []):
+        part.get("function_call", {}).pop("id", None)
+    key, model, _ = pending
+    response_cache.put(key, callback_context.agent_name, model, json.dumps(data))
+    return None
+
+
+def cache_model_error(callback_context: CallbackContext, llm_request: LlmRequest, error: Exception) -> Optional[LlmResponse]:
+    """ADK on_model_error_callback that forgets the failed call; the error still propagates."""
+    _pop_pending((callback_context.invocation_id, callback_context.agent_name))
+    return None
+
+
+def get_response_cache_stats() -> Dict[str, float]:
+    """Returns the counters of the shared response cache."""
+    return response_cache.stats()
@@ -0,0 +1,430 @@
+import atexit
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .env import CACHE_DIR
+
+# Set to 1 to record spans; when unset every hook returns immediately.
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "").lower() in ("1", "true", "yes")
+# JSON-lines file that finished spans are appended to; empty keeps them in memory only.
+TRACE_PATH = os.getenv("TRACE_PATH", os.path.join(CACHE_DIR, "trace.jsonl"))
+# Port of the Prometheus text endpoint (/metrics); unset disables it.
+TRACE_METRICS_PORT = os.getenv("TRACE_METRICS_PORT")
+# Finished spans kept in memory for recent_spans().
+TRACE_BUFFER = int(os.getenv("TRACE_BUFFER", "1000"))
+
+# Upper bounds of the latency histogram buckets, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = TRACE_ENABLED
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("trace_span", default=None)
+_ids = itertools.count(1)
+_lock = threading.Lock()
+_recent: Deque[Dict[str, Any]] = deque(maxlen=TRACE_BUFFER)
+_histograms: Dict[Tuple[str, str], List[float]] = {}
+_errors: Dict[Tuple[str, str, str], int] = {}
+_events: Dict[Tuple[str, str], int] = {}
+_writer = None
+_server: Optional[ThreadingHTTPServer] = None
+# Spans opened in one callback and closed in another, by (invocation id, agent, kind).
+_open: Dict[Tuple[str, str, str], Tuple["Span", Optional["Span"]]] = {}
+
+
+class Span:
+    """One timed operation: a tool call, an agent hop, a model call or a request to Reddit."""
+
+    __slots__ = ("name", "kind", "span_id", "parent_id", "trace_id", "start", "attrs", "error")
+
+    def __init__(self, name: str, kind: str, attrs: Dict[str, Any]):
+        parent = _current.get()
+        self.name = name
+        self.kind = kind
+        self.span_id = next(_ids)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.trace_id = parent.trace_id if parent is not None else self.span_id
+        self.start = time.perf_counter()
+        self.attrs = attrs
+        self.error: Optional[str] = None
+
+    def finish(self) -> None:
+        duration = time.perf_counter() - self.start
+        record = {
+            "trace": self.trace_id,
+            "span": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "ts": round(time.time() - duration, 6),
+            "duration_ms": round(duration * 1000, 3),
+            "attrs": self.attrs,
+            "error": self.error,
+        }
+        _export(record, duration)
+
+
+class _NoopSpan:
+    """Returned by span() when tracing is off, so a disabled span costs one call."""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class _ActiveSpan:
+    __slots__ = ("span", "token")
+
+    def __init__(self, name: str, kind: str, attrs: Dict[str, Any]):
+        self.span = Span(name, kind, attrs)
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.span.error = exc_type.__name__
+        _current.reset(self.token)
+        self.span.finish()
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def enable(path: Optional[str] = TRACE_PATH, metrics_port: Optional[int] = None) -> None:
+    """
+    Turns tracing on at runtime.
+
+    Args:
+        path: JSON-lines file for finished spans, or None to keep them in memory.
+        metrics_port: If given, serves the Prometheus text format on this port.
+    """
+    global _enabled, _writer
+    with _lock:
+        if path and _writer is None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            _writer = open(path, "a", encoding="utf-8")
+            atexit.register(_close_writer)
+        _enabled = True
+    if metrics_port:
+        start_metrics_server(metrics_port)
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def span(name: str, kind: str = "internal", **attrs: Any):
+    """
+    Times the enclosed block as a span nested under the current one.
+
+    Usage: `with span("reddit.listing", kind="reddit", subreddit=name): ...`
+    """
+    if not _enabled:
+        return _NOOP
+    return _ActiveSpan(name, kind, attrs)
+
+
+def annotate(**attrs: Any) -> None:
+    """Adds attributes to the current span, if any."""
+    if not _enabled:
+        return
+    current = _current.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+
+def event(metric: str, value: str) -> None:
+    """
+    Counts an event such as a cache hit, in total and on the current span.
+
+    Args:
+        metric: What happened, e.g. 'listing_cache'.
+        value: The outcome, e.g. 'hit' or 'miss'.
+    """
+    if not _enabled:
+        return
+    with _lock:
+        _events[(metric, value)] = _events.get((metric, value), 0) + 1
+    current = _current.get()
+    if current is not None:
+        name = f"{metric}.{value}"
+        current.attrs[name] = current.attrs.get(name, 0) + 1
+
+
+def error(exc: BaseException) -> None:
+    """Marks the current span as failed with a handled exception."""
+    if not _enabled:
+        return
+    current = _current.get()
+    if current is not None:
+        current.error = type(exc).__name__
+
+
+def measure(value: Any) -> Tuple[int, int]:
+    """
+    Returns (items, chars) of a tool argument or result.
+
+    Items are the leaf strings, which for the news dictionaries passed between
+    agents are the headlines.
+    """
+    if isinstance(value, str):
+        return 1, len(value)
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, (list, tuple)):
+        return 0, 0
+    items = chars = 0
+    for element in value:
+        element_items, element_chars = measure(element)
+        items += element_items
+        chars += element_chars
+    return items, chars
+
+
+def traced(kind: str = "tool") -> Callable[[Callable], Callable]:
+    """
+    Decorator that records a span for every call of a tool function.
+
+    The span carries the size of the arguments and of the result. The wrapper
+    keeps the function's name, signature and docstring, which ADK uses to
+    declare the tool to the model.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            input_items, input_chars = measure(list(args) + list(kwargs.values()))
+            with _ActiveSpan(func.__name__, kind, {"input_items": input_items, "input_chars": input_chars}) as current:
+                result = func(*args, **kwargs)
+                output_items, output_chars = measure(result)
+                current.attrs["output_items"] = output_items
+                current.attrs["output_chars"] = output_chars
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+def _content_chars(content) -> int:
+    if content is None:
+        return 0
+    return sum(len(part.text or "") for part in content.parts or [])
+
+
+def trace_agent_start(callback_context) -> None:
+    """ADK before_agent_callback opening a span for an agent hop."""
+    if not _enabled:
+        return None
+    key = (callback_context.invocation_id, callback_context.agent_name, "agent")
+    parent = _current.get()
+    current = Span(callback_context.agent_name, "agent", {"input_chars": _content_chars(callback_context.user_content)})
+    _open[key] = (current, parent)
+    # Tool calls and sub-agents of this hop run in the same task, so they nest under it.
+    _current.set(current)
+    return None
+
+
+def trace_agent_end(callback_context) -> None:
+    """ADK after_agent_callback closing the span opened by trace_agent_start."""
+    if not _enabled:
+        return None
+    opened = _open.pop((callback_context.invocation_id, callback_context.agent_name, "agent"), None)
+    if opened is not None:
+        current, parent = opened
+        _current.set(parent)
+        current.finish()
+    return None
+
+
+def trace_model_start(callback_context, llm_request) -> None:
+    """ADK before_model_callback opening a span for a model call that was not answered from cache."""
+    if not _enabled:
+        return None
+    key = (callback_context.invocation_id, callback_context.agent_name, "llm")
+    prompt_chars = sum(_content_chars(content) for content in llm_request.contents)
+    _open[key] = (Span(f"{callback_context.agent_name}:llm", "llm", {"prompt_chars": prompt_chars}), None)
+    return None
+
+
+def trace_model_end(callback_context, llm_response) -> None:
+    """ADK after_model_callback closing the model call span."""
+    if not _enabled:
+        return None
+    opened = _open.pop((callback_context.invocation_id, callback_context.agent_name, "llm"), None)
+    if opened is None:
+        return None
+    current = opened[0]
+    current.attrs["output_chars"] = _content_chars(llm_response.content)
+    usage = llm_response.usage_metadata
+    if usage is not None:
+        current.attrs["prompt_tokens"] = usage.prompt_token_count
+        current.attrs["output_tokens"] = usage.candidates_token_count
+    if llm_response.error_code:
+        current.error = str(llm_response.error_code)
+    current.finish()
+    return None
+
+
+def _as_list(callback) -> list:
+    if callback is None:
+        return []
+    return list(callback) if isinstance(callback, list) else [callback]
+
+
+def instrument_agents(root) -> None:
+    """
+    Adds the tracing callbacks to an agent and every agent below it.
+
+    Agents reached through sub_agents or AgentTools are included, so every hop
+    under the router gets an agent span and every model call a model span.
+    Calling it again on the same agents has no effect.
+    """
+    from google.adk.tools import agent_tool
+
+    pending = [root]
+    seen = set()
+    while pending:
+        agent = pending.pop()
+        if id(agent) in seen:
+            continue
+        seen.add(id(agent))
+        pending.extend(agent.sub_agents)
+        for tool in getattr(agent, "tools", []):
+            if isinstance(tool, agent_tool.AgentTool):
+                pending.append(tool.agent)
+
+        before_agent = _as_list(agent.before_agent_callback)
+        if trace_agent_start in before_agent:
+            continue
+        agent.before_agent_callback = [trace_agent_start] + before_agent
+        agent.after_agent_callback = _as_list(agent.after_agent_callback) + [trace_agent_end]
+        if hasattr(agent, "before_model_callback"):
+            # After the cache lookup: a cache hit returns early and is not a model call.
+            agent.before_model_callback = _as_list(agent.before_model_callback) + [trace_model_start]
+            agent.after_model_callback = [trace_model_end] + _as_list(agent.after_model_callback)
+
+
+def _export(record: Dict[str, Any], duration: float) -> None:
+    key = (record["name"], record["kind"])
+    with _lock:
+        _recent.append(record)
+        histogram = _histograms.get(key)
+        if histogram is None:
+            # Bucket counts, then the sum and count of all observations.
+            histogram = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if duration <= bound:
+                histogram[i] += 1
+        histogram[-2] += duration
+        histogram[-1] += 1
+        if record["error"]:
+            error_key = (record["name"], record["kind"], record["error"])
+            _errors[error_key] = _errors.get(error_key, 0) + 1
+        if _writer is not None:
+            _writer.write(json.dumps(record, default=str) + "\n")
+
+
+def _close_writer() -> None:
+    global _writer
+    with _lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+
+def flush() -> None:
+    with _lock:
+        if _writer is not None:
+            _writer.flush()
+
+
+def recent_spans() -> List[Dict[str, Any]]:
+    """Returns the most recently finished spans, oldest first."""
+    with _lock:
+        return list(_recent)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def metrics_text() -> str:
+    """Renders span latencies, errors and events in the Prometheus text format."""
+    lines = [
+        "# HELP reddit_news_span_seconds Duration of tool calls, agent hops, model calls and Reddit requests.",
+        "# TYPE reddit_news_span_seconds histogram",
+    ]
+    with _lock:
+        histograms = {key: list(values) for key, values in _histograms.items()}
+        errors = dict(_errors)
+        events = dict(_events)
+    for (name, kind), values in sorted(histograms.items()):
+        labels = f'name="{_label(name)}",kind="{kind}"'
+        for bound, count in zip(BUCKETS, values):
+            lines.append(f'reddit_news_span_seconds_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f'reddit_news_span_seconds_bucket{{{labels},le="+Inf"}} {values[-1]}')
+        lines.append(f"reddit_news_span_seconds_sum{{{labels}}} {values[-2]:.6f}")
+        lines.append(f"reddit_news_span_seconds_count{{{labels}}} {values[-1]}")
+    lines.append("# HELP reddit_news_span_errors_total Spans that ended with an error, by error type.")
+    lines.append("# TYPE reddit_news_span_errors_total counter")
+    for (name, kind, error_type), count in sorted(errors.items()):
+        lines.append(f'reddit_news_span_errors_total{{name="{_label(name)}",kind="{kind}",error="{_label(error_type)}"}} {count}')
+    lines.append("# HELP reddit_news_events_total Cache lookups and other counted events, by outcome.")
+    lines.append("# TYPE reddit_news_events_total counter")
+    for (metric, value), count in sorted(events.items()):
+        lines.append(f'reddit_news_events_total{{event="{_label(metric)}",outcome="{_label(value)}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serves metrics_text() at http://host:port/metrics from a daemon thread."""
+    global _server
+    with _lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="trace-metrics", daemon=True).start()
+            print(f"--- Tracing: Metrics at http://{host}:{_server.server_port}/metrics ---")
+        return _server
+
+
+if TRACE_ENABLED:
+    enable(TRACE_PATH or None, int(TRACE_METRICS_PORT) if TRACE_METRICS_PORT else None)
@@ -0,0 +1,7 @@
+# This file makes 'pipeline' a Python package.
+# It runs the standard workflows directly, without the router LLM.
+
+# Import the entry points
+from .workflows import match_workflow, run_query, run_workflow
+from .ingest import Ingestion
+from .batch import read_queries, run_batch
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+from .workflows import run_query
+
+# Queries answered at the same time in batch mode.
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+# Seconds one batch query may take before it is reported as failed.
+BATCH_QUERY_TIMEOUT = float(os.getenv("BATCH_QUERY_TIMEOUT", "300"))
+
+
+def read_queries(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Parses batch input: one JSON query per line.
+
+    A line is either an object with a "query" and an optional "id", or a bare
+    JSON string. Blank lines are skipped. A line that can't be parsed is kept
+    with an "error", so it shows up in the results instead of stopping the batch.
+
+    Args:
+        lines: The lines of a JSONL file.
+
+    Returns:
+        One {"index", "id", "query"[, "error"]} dict per query, in input order.
+    """
+    queries: List[Dict[str, Any]] = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        entry: Dict[str, Any] = {"index": len(queries), "id": number, "query": None}
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            entry["error"] = f"line {number}: invalid JSON: {e}"
+            queries.append(entry)
+            continue
+        if isinstance(value, dict):
+            entry["id"] = value.get("id", number)
+            value = value.get("query")
+        if isinstance(value, str) and value.strip():
+            entry["query"] = value
+        else:
+            entry["error"] = f"line {number}: expected a query string or an object with a 'query'"
+        queries.append(entry)
+    return queries
+
+
+async def run_batch(
+    queries: List[Dict[str, Any]],
+    out: TextIO,
+    concurrency: Optional[int] = None,
+    use_pipeline: bool = True,
+    timeout: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Answers many queries concurrently and streams one JSON result line per query.
+
+    Every query runs in its own session through run_query(), so standard
+    workflows skip the router LLM and anything else goes to the router. The
+    sessions share the process-wide listing and response caches. Results are
+    written as queries finish, not in input order; "index" gives the input
+    position. A query that fails or times out yields a result with an "error"
+    and does not affect the others.
+
+    Args:
+        queries: Queries as returned by read_queries().
+        out: Text stream the JSON lines are written to; flushed after each line.
+        concurrency: Queries in flight at once. Defaults to BATCH_CONCURRENCY.
+        use_pipeline: Set to False to send every query through the router LLM.
+        timeout: Seconds per query. Defaults to BATCH_QUERY_TIMEOUT.
+
+    Returns:
+        A summary with the number of queries, errors, wall time and throughput.
+    """
+    concurrency = max(1, concurrency or BATCH_CONCURRENCY)
+    timeout = BATCH_QUERY_TIMEOUT if timeout is None else timeout
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+    started = time.perf_counter()
+
+    async def answer(entry: Dict[str, Any]) -> None:
+        nonlocal errors
+        record: Dict[str, Any] = {"index": entry["index"], "id": entry["id"], "query": entry["query"]}
+        if entry.get("error"):
+            record.update(error=entry["error"], wait_seconds=0.0, total_seconds=0.0)
+        else:
+            queued = time.perf_counter()
+            async with semaphore:
+                record["wait_seconds"] = round(time.perf_counter() - queued, 4)
+                began = time.perf_counter()
+                try:
+                    result = await asyncio.wait_for(run_query(entry["query"], use_pipeline=use_pipeline), timeout)
+                    record.update(path=result.path, workflow=result.workflow, text=result.text, stages=result.timings.stages)
+                    record["error"] = None
+                except asyncio.TimeoutError:
+                    record["error"] = f"timed out after {timeout:g} seconds"
+                except Exception as e:
+                    record["error"] = f"{type(e).__name__}: {e}"
+                record["total_seconds"] = round(time.perf_counter() - began, 4)
+        if record["error"] is not None:
+            errors += 1
+            print(f"--- Batch error: Query {entry['id']} failed: {record['error']} ---")
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+
+    await asyncio.gather(*(answer(entry) for entry in queries))
+    seconds = time.perf_counter() - started
+    return {
+        "queries": len(queries),
+        "errors": errors,
+        "concurrency": concurrency,
+        "seconds": round(seconds, 3),
+        "throughput_per_s": round(len(queries) / seconds, 2) if seconds else 0.0,
+    }
@@ -0,0 +1,58 @@
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+# Maximum number of agent calls in flight for one fan-out.
+AGENT_CONCURRENCY = int(os.getenv("AGENT_FANOUT_CONCURRENCY", "4"))
+# Seconds each agent call may take before it is reported as failed.
+AGENT_TIMEOUT = float(os.getenv("AGENT_FANOUT_TIMEOUT", "60"))
+
+
+class FanOutResult:
+    """The outcome of one fanned-out call: either a value or an error message."""
+
+    def __init__(self, key: str, value: Any = None, error: Optional[str] = None):
+        self.key = key
+        self.value = value
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def fan_out(
+    calls: List[Tuple[str, Callable[[], Awaitable[Any]]]],
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> List[FanOutResult]:
+    """
+    Runs independent async calls concurrently with a cap and per-call timeouts.
+
+    A call that raises or times out yields a failed result; the others are not
+    affected. Results come back in the order of `calls`, whatever order the
+    calls finish in.
+
+    Args:
+        calls: (key, factory) pairs; each factory returns the awaitable to run.
+        max_concurrency: Upper bound on calls in flight. Defaults to AGENT_CONCURRENCY.
+        timeout: Per-call timeout in seconds. Defaults to AGENT_TIMEOUT.
+
+    Returns:
+        One FanOutResult per call, in input order.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or AGENT_CONCURRENCY))
+    timeout = AGENT_TIMEOUT if timeout is None else timeout
+
+    async def run(key: str, factory: Callable[[], Awaitable[Any]]) -> FanOutResult:
+        async with semaphore:
+            try:
+                return FanOutResult(key, await asyncio.wait_for(factory(), timeout))
+            except asyncio.TimeoutError:
+                print(f"--- Pipeline error: {key} timed out after {timeout:g}s ---")
+                return FanOutResult(key, error=f"timed out after {timeout:g} seconds")
+            except Exception as e:
+                print(f"--- Pipeline error: {key} failed: {e} ---")
+                return FanOutResult(key, error=f"{type(e).__name__}: {e}")
+
+    return list(await asyncio.gather(*(run(key, factory) for key, factory in calls)))
@@ -0,0 +1,193 @@
+import os
+import queue
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from agents.classification.local_classifier import CONFIDENCE_THRESHOLD, UNCATEGORIZED, get_classifier
+from agents.common.dedup import StreamingDeduplicator
+from agents.reddit_scout.cache import listing_cache
+from agents.reddit_scout.posts import Post
+from agents.reddit_scout.store import headline_store
+from agents.reddit_scout.stream import STREAM_POLL_INTERVAL, NewPostPoller
+
+# Batches buffered between two ingestion stages; a slow stage blocks the ones before it.
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "8"))
+# Newest posts per subreddit kept in the listing cache under the 'new' listing.
+STREAM_CACHED_POSTS = 100
+
+Stage = Callable[[Iterator[Any]], Iterator[Any]]
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class StreamItem:
+    """A streamed post together with where it came from and how it was classified."""
+
+    __slots__ = ("subreddit", "post", "category", "confidence")
+
+    def __init__(self, subreddit: str, post: Post):
+        self.subreddit = subreddit
+        self.post = post
+        self.category: Optional[str] = None
+        self.confidence = 0.0
+
+    def __repr__(self) -> str:
+        return f"StreamItem(r/{self.subreddit}, {self.post.title!r}, {self.category})"
+
+
+def run_stages(
+    source: Iterable[Any],
+    stages: List[Stage],
+    maxsize: int = STREAM_QUEUE_SIZE,
+    depths: Optional[Dict[str, int]] = None,
+) -> Iterator[Any]:
+    """
+    Runs generator stages in their own threads, connected by bounded queues.
+
+    Each stage consumes the iterator of the previous stage's output. When a
+    queue is full its producer blocks, so a slow stage slows the stages in
+    front of it instead of letting buffers grow. An exception in any stage is
+    re-raised to the consumer, and closing the returned iterator stops all
+    stages.
+
+    Args:
+        source: The first iterable, e.g. a poller.
+        stages: Generator functions applied in order.
+        maxsize: Capacity of each queue between two stages.
+        depths: If given, receives the highest depth seen on each queue.
+
+    Returns:
+        An iterator over the output of the last stage.
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize) for _ in range(len(stages) + 1)]
+    names = ["source"] + [getattr(stage, "__name__", f"stage{i}") for i, stage in enumerate(stages)]
+    if depths is not None:
+        depths.update({name: 0 for name in names})
+
+    def put(out: queue.Queue, name: str, item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+            if depths is not None:
+                depths[name] = max(depths[name], out.qsize())
+            return True
+        return False
+
+    def drain(inbox: queue.Queue) -> Iterator[Any]:
+        while not stop.is_set():
+            try:
+                item = inbox.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+
+    def pump(iterable: Callable[[], Iterable[Any]], out: queue.Queue, name: str) -> None:
+        try:
+            for item in iterable():
+                if not put(out, name, item):
+                    return
+        except BaseException as e:
+            put(out, name, _Failure(e))
+        else:
+            put(out, name, _DONE)
+
+    threads = [threading.Thread(target=pump, args=(lambda: source, queues[0], names[0]), daemon=True)]
+    for i, stage in enumerate(stages):
+        threads.append(threading.Thread(
+            target=pump,
+            args=(lambda stage=stage, inbox=queues[i]: stage(drain(inbox)), queues[i + 1], names[i + 1]),
+            daemon=True,
+        ))
+    for thread in threads:
+        thread.start()
+
+    try:
+        yield from drain(queues[-1])
+    finally:
+        stop.set()
+        stopper = getattr(source, "stop", None)
+        if stopper is not None:
+            stopper()
+
+
+class Ingestion:
+    """
+    Streaming ingestion of new posts: poll, dedup, classify, then store.
+
+    Iterating yields lists of StreamItems as they leave the last stage. Posts
+    repeating a story seen recently (on any subreddit) are dropped by the dedup
+    stage; the rest are classified locally and written to the headline store
+    and the 'new' listings of the listing cache.
+    """
+
+    def __init__(
+        self,
+        subreddits: List[str],
+        source=None,
+        interval: float = STREAM_POLL_INTERVAL,
+        max_rounds: Optional[int] = None,
+        queue_size: int = STREAM_QUEUE_SIZE,
+        threshold: float = CONFIDENCE_THRESHOLD,
+    ):
+        self.poller = NewPostPoller(subreddits, source, interval, max_rounds)
+        self.queue_size = queue_size
+        self.threshold = threshold
+        self.depths: Dict[str, int] = {}
+        self._dedup = StreamingDeduplicator()
+        self._recent: Dict[str, Deque[Post]] = {}
+        self._counts: Dict[str, int] = {"duplicates": 0, "classified": 0, "uncategorized": 0, "stored": 0}
+
+    def __iter__(self) -> Iterator[List[StreamItem]]:
+        return run_stages(self.poller, [self.dedup, self.classify, self.store], self.queue_size, self.depths)
+
+    def stop(self) -> None:
+        self.poller.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns poller and stage counters plus the highest queue depths."""
+        return {**self.poller.stats(), **self._counts, "max_queue_depths": dict(self.depths)}
+
+    def dedup(self, batches: Iterator[tuple]) -> Iterator[List[StreamItem]]:
+        for subreddit, posts in batches:
+            items = [StreamItem(subreddit, post) for post in posts if self._dedup.is_new(subreddit, post.title)]
+            self._counts["duplicates"] += len(posts) - len(items)
+            if items:
+                yield items
+
+    def classify(self, batches: Iterator[List[StreamItem]]) -> Iterator[List[StreamItem]]:
+        classifier = get_classifier()
+        for items in batches:
+            predictions = classifier.predict([item.post.title for item in items])
+            for item, (category, confidence) in zip(items, predictions):
+                item.category = category if confidence >= self.threshold else UNCATEGORIZED
+                item.confidence = confidence
+                if item.category == UNCATEGORIZED:
+                    self._counts["uncategorized"] += 1
+            self._counts["classified"] += len(items)
+            yield items
+
+    def store(self, batches: Iterator[List[StreamItem]]) -> Iterator[List[StreamItem]]:
+        for items in batches:
+            # Batches come from one subreddit each, so this is one transaction.
+            subreddit = items[0].subreddit
+            posts = [item.post for item in items]
+            if headline_store is not None:
+                headline_store.upsert(subreddit, posts)
+            recent = self._recent.setdefault(subreddit, deque(maxlen=STREAM_CACHED_POSTS))
+            recent.extendleft(posts)
+            listing_cache.put(subreddit, "new", len(recent), list(recent))
+            self._counts["stored"] += len(items)
+            yield items
@@ -0,0 +1,80 @@
+import os
+import time
+import uuid
+from typing import Dict, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.run_config import RunConfig, ToolThreadPoolConfig
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from .timing import StageTimings
+
+APP_NAME = "reddit_news_pipeline"
+
+# Threads that run the agents' synchronous tools, so a tool waiting on Reddit
+# doesn't hold up other sessions on the event loop. 0 runs tools on the loop.
+TOOL_THREADS = int(os.getenv("AGENT_TOOL_THREADS", "16"))
+
+_runners: Dict[str, InMemoryRunner] = {}
+_run_config = RunConfig(tool_thread_pool_config=ToolThreadPoolConfig(max_workers=TOOL_THREADS)) if TOOL_THREADS > 0 else None
+
+
+def get_runner(agent: BaseAgent) -> InMemoryRunner:
+    """Returns a cached in-memory runner for the agent."""
+    runner = _runners.get(agent.name)
+    if runner is None:
+        runner = InMemoryRunner(agent=agent, app_name=APP_NAME)
+        _runners[agent.name] = runner
+    return runner
+
+
+async def invoke_agent(
+    agent: BaseAgent,
+    message: str,
+    timings: Optional[StageTimings] = None,
+    user_id: str = "pipeline",
+) -> str:
+    """
+    Runs an agent on a single message in a fresh session.
+
+    Args:
+        agent: The ADK agent to run.
+        message: The user message sent to the agent.
+        timings: If given, each tool call made by the agent is recorded as a
+            'tool:<name>' stage, and the remaining time as '<agent>:llm'.
+        user_id: The user the session belongs to.
+
+    Returns:
+        The text of the agent's final response.
+    """
+    runner = get_runner(agent)
+    session = await runner.session_service.create_session(
+        app_name=APP_NAME, user_id=user_id, session_id=uuid.uuid4().hex
+    )
+    content = types.Content(role="user", parts=[types.Part(text=message)])
+
+    started = time.perf_counter()
+    tool_started: Dict[str, float] = {}
+    tool_seconds = 0.0
+    final_text = ""
+    async for event in runner.run_async(
+        user_id=user_id, session_id=session.id, new_message=content, run_config=_run_config
+    ):
+        now = time.perf_counter()
+        for call in event.get_function_calls():
+            tool_started[call.id or call.name] = now
+        for response in event.get_function_responses():
+            began = tool_started.pop(response.id or response.name, None)
+            if began is not None:
+                tool_seconds += now - began
+                if timings is not None:
+                    timings.record(f"tool:{response.name}", now - began)
+        if event.is_final_response() and event.content and event.content.parts:
+            text = "".join(part.text or "" for part in event.content.parts)
+            if text:
+                final_text = text
+
+    if timings is not None:
+        timings.record(f"{agent.name}:llm", time.perf_counter() - started - tool_seconds)
+    return final_text
@@ -0,0 +1,37 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+from agents.common.tracing import span
+
+
+class StageTimings:
+    """Collects wall-clock durations of the stages of one request."""
+
+    def __init__(self):
+        self.stages: List[Dict[str, float]] = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Times the enclosed block as one stage, and traces it when tracing is on."""
+        started = time.perf_counter()
+        try:
+            with span(name, "stage"):
+                yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float) -> None:
+        self.stages.append({"stage": name, "seconds": round(seconds, 4)})
+
+    def total(self) -> float:
+        return round(time.perf_counter() - self._started, 4)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {"stages": list(self.stages), "total_seconds": self.total()}
+
+    def format(self) -> str:
+        lines = [f"  {entry['stage']:<32} {entry['seconds'] * 1000:>9.1f} ms" for entry in self.stages]
+        lines.append(f"  {'total':<32} {self.total() * 1000:>9.1f} ms")
+        return "\n".join(lines)
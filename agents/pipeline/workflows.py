@@ -0,0 +1,448 @@
+import asyncio
+import json
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from agents.analysis.business_agent import agent as business_analysis_agent
+from agents.analysis.finance_agent import agent as finance_analysis_agent
+from agents.analysis.politics_agent import agent as politics_analysis_agent
+from agents.analysis.technology_agent import agent as technology_analysis_agent
+from agents.classification.agent import agent as classification_agent
+from agents.classification.agent import classify_content
+from agents.classification.local_classifier import CATEGORIES, UNCATEGORIZED
+from agents.common.dedup import spread_sources, with_sources
+from agents.common.payload import PAYLOAD_TOKEN_BUDGET, estimate_tokens, pack, post_ranks
+from agents.common.tracing import annotate, span
+from agents.reddit_scout.agent import get_multi_subreddit_news
+from agents.reddit_scout.cache import listing_cache
+from agents.reddit_scout.comments import comment_digests
+from agents.reddit_scout.fanout import failure_message
+from agents.router.agent import agent as router_agent
+from agents.summarization.agent import agent as summarization_agent
+from agents.summarization.agent import dedupe_content
+from agents.summarization.rolling import UNCHANGED, build_prompt, rolling_summaries
+
+from .fanout import fan_out
+from .invoke import invoke_agent
+from .timing import StageTimings
+
+DEFAULT_SUBREDDITS = ["worldnews", "news", "sports"]
+DEFAULT_LIMIT = 5
+# Hottest posts per subreddit whose top comments go to the analysis agents; 0 sends headlines only.
+ANALYSIS_COMMENT_POSTS = int(os.getenv("ANALYSIS_COMMENT_POSTS", "2"))
+
+# Analysis agents responsible for each classification category.
+ANALYSIS_AGENTS = {
+    "politics": [politics_analysis_agent],
+    "technology": [technology_analysis_agent],
+    "business": [business_analysis_agent, finance_analysis_agent],
+}
+
+# Words in a request that narrow an analysis to some categories.
+FOCUS_PATTERNS = {
+    "politics": re.compile(r"\bpolitic", re.I),
+    "technology": re.compile(r"\btech", re.I),
+    "business": re.compile(r"\b(business|financ|market|econom|stock)", re.I),
+}
+
+StageFunc = Callable[[Dict[str, Any], StageTimings], Awaitable[Any]]
+
+
+class Stage:
+    """One step of a pipeline; its result is stored in the context under its name."""
+
+    def __init__(self, name: str, func: StageFunc, after: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.after = tuple(after)
+
+
+class Pipeline:
+    """
+    A small DAG of stages executed without the router LLM.
+
+    Stages run as soon as the stages they come after have finished; stages
+    whose dependencies are satisfied at the same time run concurrently.
+    """
+
+    def __init__(self, name: str, stages: List[Stage]):
+        self.name = name
+        self.stages = stages
+
+    async def run(self, context: Dict[str, Any], timings: StageTimings) -> Dict[str, Any]:
+        done = set()
+        pending = list(self.stages)
+        while pending:
+            ready = [stage for stage in pending if set(stage.after) <= done]
+            if not ready:
+                raise ValueError(f"Pipeline '{self.name}' has unsatisfiable stage dependencies")
+            results = await asyncio.gather(*(self._run_stage(stage, context, timings) for stage in ready))
+            for stage, result in zip(ready, results):
+                context[stage.name] = result
+                done.add(stage.name)
+                pending.remove(stage)
+        return context
+
+    async def _run_stage(self, stage: Stage, context: Dict[str, Any], timings: StageTimings) -> Any:
+        with timings.stage(stage.name):
+            return await stage.func(context, timings)
+
+
+class PipelineResult:
+    """The answer to one request together with how it was produced."""
+
+    def __init__(self, text: str, path: str, workflow: Optional[str], timings: StageTimings):
+        self.text = text
+        self.path = path
+        self.workflow = workflow
+        self.timings = timings
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"path": self.path, "workflow": self.workflow, "text": self.text, **self.timings.as_dict()}
+
+
+def _dump(content: Any) -> str:
+    return json.dumps(content, ensure_ascii=False, indent=1)
+
+
+def headline_ranks(context: Dict[str, Any]) -> Dict[str, float]:
+    """Returns the hot rank of the fetched headlines, from the posts in the listing cache."""
+    posts = []
+    for subreddit in context["subreddits"]:
+        posts.extend(listing_cache.peek(subreddit, "hot", context["limit"]) or [])
+    return post_ranks(posts)
+
+
+async def fetch_stage(context: Dict[str, Any], timings: StageTimings) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetches the requested subreddits' headlines.
+
+    The scout reports a subreddit that failed, or had no posts, with a message
+    in place of its headlines; those are kept apart, so they are reported
+    rather than deduplicated, classified or sent to a model.
+    """
+    fetched = await asyncio.to_thread(get_multi_subreddit_news, context["subreddits"], context["limit"])
+    headlines: Dict[str, List[str]] = {}
+    failures: Dict[str, str] = {}
+    for source, items in fetched.items():
+        message = failure_message(items)
+        if message is None:
+            headlines[source] = items
+        else:
+            failures[source] = message
+    if failures:
+        print(f"--- Pipeline warning: No headlines from {', '.join(f'r/{source}' for source in failures)} ---")
+    return {"headlines": headlines, "failures": failures}
+
+
+def format_failures(context: Dict[str, Any]) -> str:
+    """Renders the subreddits the fetch stage got no headlines from, one per line."""
+    return "\n".join(f"_r/{source}: {message}_" for source, message in context["fetch"]["failures"].items())
+
+
+def _with_failures(text: str, context: Dict[str, Any]) -> str:
+    failures = format_failures(context)
+    return f"{text}\n\n{failures}" if failures else text
+
+
+async def dedup_stage(context: Dict[str, Any], timings: StageTimings) -> Dict[str, Any]:
+    content, also_in = await asyncio.to_thread(dedupe_content, context["fetch"]["headlines"])
+    return {"content": content, "also_in": also_in}
+
+
+async def summarize_stage(context: Dict[str, Any], timings: StageTimings) -> str:
+    also_in = context["dedup"]["also_in"]
+    failures = context["fetch"]["failures"]
+    # Only sources whose fetch returned headlines are planned and committed, so
+    # the rolling state never records an error message as a seen headline.
+    content = {
+        source: headlines
+        for source, headlines in context["dedup"]["content"].items()
+        if headlines and source not in failures
+    }
+    summaries: Dict[str, str] = {}
+    calls = []
+    ranks = headline_ranks(context)
+    for source, headlines in content.items():
+        # Sources polled before only send the headlines new since their last summary.
+        plan = rolling_summaries.plan(source, headlines)
+        if plan.mode == UNCHANGED:
+            summaries[source] = plan.previous_summary
+            continue
+        print(f"--- Pipeline: Summarizing r/{source} ({plan.mode}, {len(plan.headlines)} headline(s)) ---")
+        # The other sources of a merged story are named in the prompt only.
+        lines = [with_sources(headline, also_in) for headline in plan.headlines]
+        line_ranks = {line: ranks[headline] for line, headline in zip(lines, plan.headlines) if headline in ranks}
+        packed = pack({source: lines}, ranks=line_ranks, baseline=json.dumps(lines, ensure_ascii=False))
+        packed.report(summarization_agent.name)
+        message = build_prompt(source, plan, packed.text)
+        calls.append((source, lambda message=message: invoke_agent(summarization_agent, message, timings)))
+
+    for result in await fan_out(calls):
+        if result.ok and result.value:
+            rolling_summaries.commit(result.key, content[result.key], result.value)
+            summaries[result.key] = result.value
+        else:
+            summaries[result.key] = f"_Summary unavailable: {result.error or 'empty response'}_"
+    for source, message in failures.items():
+        # A failed fetch leaves the source's rolling state as it was; its last summary is shown, marked as such.
+        previous = rolling_summaries.previous_summary(source)
+        summaries[source] = f"_{message}_" + (f"\n\nLast summary:\n{previous}" if previous else "")
+    if not summaries:
+        return "No headlines were found."
+    return "\n\n".join(f"**r/{source}**\n{summaries[source]}" for source in list(content) + list(failures))
+
+
+async def classify_stage(context: Dict[str, Any], timings: StageTimings) -> Dict[str, Dict[str, List[str]]]:
+    classified, also_in = await asyncio.to_thread(classify_content, context["fetch"]["headlines"])
+    # A merged story is listed under all of its sources again, so packing sends
+    # it once with all their keys and lookups by title still find it.
+    classified = {category: spread_sources(sources, also_in) for category, sources in classified.items()}
+    uncertain = classified.pop(UNCATEGORIZED, None)
+    if not uncertain:
+        return classified
+
+    # Only the headlines the local classifier was unsure about go to the LLM,
+    # which answers with their ids instead of copying them.
+    packed = pack(uncertain, ranks=headline_ranks(context), baseline=_dump(uncertain))
+    packed.report(classification_agent.name)
+    message = (
+        f"Classify these headlines into exactly one of: {', '.join(CATEGORIES)}. "
+        "Each line is a headline id, the keys of its sources, and the headline. "
+        "Do not call any tools. Respond with only a JSON object mapping category -> "
+        "list of headline ids.\n" + packed.text
+    )
+    reply = await invoke_agent(classification_agent, message, timings)
+    try:
+        resolved = json.loads(reply[reply.index("{"):reply.rindex("}") + 1])
+    except ValueError:
+        print("--- Pipeline warning: Could not parse LLM classification, keeping headlines uncategorized ---")
+        resolved = {UNCATEGORIZED: uncertain}
+    for category, ids in resolved.items():
+        # Category -> source -> headlines is still accepted from replies that ignore the ids.
+        sources = ids if isinstance(ids, dict) else packed.resolve(ids if isinstance(ids, list) else [ids])
+        category = category.lower()
+        if category not in CATEGORIES and category != UNCATEGORIZED:
+            # Only known categories are rendered, so anything else would be lost.
+            print(f"--- Pipeline warning: LLM used unknown category '{category}', keeping its headlines uncategorized ---")
+            category = UNCATEGORIZED
+        for source, headlines in sources.items():
+            bucket = classified.setdefault(category, {}).setdefault(source, [])
+            bucket.extend(headline for headline in headlines if headline not in bucket)
+
+    # Headlines the reply left out, or the payload had to trim, stay uncategorized.
+    placed = {
+        (source, headline)
+        for sources in classified.values()
+        for source, headlines in sources.items()
+        for headline in headlines
+    }
+    for source, headlines in uncertain.items():
+        for headline in headlines:
+            if (source, headline) not in placed:
+                classified.setdefault(UNCATEGORIZED, {}).setdefault(source, []).append(headline)
+    return classified
+
+
+def format_categories(classified: Dict[str, Dict[str, List[str]]]) -> str:
+    """Renders classified headlines as a markdown list grouped by category."""
+    lines = []
+    for category in CATEGORIES + [UNCATEGORIZED]:
+        sources = classified.get(category)
+        if not sources:
+            continue
+        lines.append(f"**{category.capitalize()}**")
+        # A story carried by several sources is listed once, naming all of them.
+        by_headline: Dict[str, List[str]] = {}
+        for source, headlines in sources.items():
+            for headline in headlines:
+                by_headline.setdefault(headline, []).append(f"r/{source}")
+        lines.extend(f"- {headline} ({', '.join(names)})" for headline, names in by_headline.items())
+        lines.append("")
+    return "\n".join(lines).strip()
+
+
+async def categories_stage(context: Dict[str, Any], timings: StageTimings) -> str:
+    return _with_failures(format_categories(context["classify"]) or "No headlines were found.", context)
+
+
+async def comments_stage(context: Dict[str, Any], timings: StageTimings) -> Dict[str, str]:
+    """Fetches comment digests of the hottest fetched posts, by headline, within the comment budgets."""
+    if ANALYSIS_COMMENT_POSTS <= 0:
+        return {}
+    posts = []
+    for subreddit in context["subreddits"]:
+        posts.extend((listing_cache.peek(subreddit, "hot", context["limit"]) or [])[:ANALYSIS_COMMENT_POSTS])
+    digests = await asyncio.to_thread(comment_digests, posts)
+    return {post.title: digests[post.id] for post in posts if post.id in digests}
+
+
+def analysis_targets(context: Dict[str, Any]) -> List[tuple]:
+    """Returns (category, agent) pairs to run, in a stable order."""
+    classified = context["classify"]
+    focus = context.get("focus") or [category for category in ANALYSIS_AGENTS if classified.get(category)]
+    return [
+        (category, agent)
+        for category in ANALYSIS_AGENTS
+        if category in focus and classified.get(category)
+        for agent in ANALYSIS_AGENTS[category]
+    ]
+
+
+async def analyze_stage(context: Dict[str, Any], timings: StageTimings) -> str:
+    classified = context["classify"]
+    targets = analysis_targets(context)
+    if not targets:
+        return _with_failures("No headlines matched a category with an analysis agent.\n\n" + format_categories(classified), context)
+
+    ranks = headline_ranks(context)
+
+    def call(category, agent):
+        packed = pack(classified[category], ranks=ranks, baseline=_dump(classified[category]))
+        packed.report(agent.name)
+        message = (
+            f"Provide your in-depth analysis of these {category} headlines. "
+            "Each line is a headline id, the keys of its sources, and the headline. "
+            "Do not call any tools; answer directly.\n" + packed.text
+        )
+        headlines = {headline for items in classified[category].values() for headline in items}
+        discussion, tokens = [], 0
+        for title, digest in context.get("comments", {}).items():
+            # Comments get a token budget of their own, on top of the headlines'.
+            cost = estimate_tokens(digest)
+            if title in headlines and (not PAYLOAD_TOKEN_BUDGET or tokens + cost <= PAYLOAD_TOKEN_BUDGET):
+                discussion.append(digest)
+                tokens += cost
+        if discussion:
+            message += "\n\nTop comments under some of these posts (public reaction, not facts):\n" + "\n\n".join(discussion)
+        return lambda: invoke_agent(agent, message, timings)
+
+    # The analysis agents are independent, so they run side by side.
+    results = await fan_out([(agent.name, call(category, agent)) for category, agent in targets])
+    sections = []
+    for result in results:
+        body = result.value if result.ok else f"_Analysis unavailable: {result.error}_"
+        sections.append(f"## {result.key}\n{body}")
+    return _with_failures("\n\n".join(sections), context)
+
+
+WORKFLOWS: Dict[str, Pipeline] = {
+    # News + summary
+    "summary": Pipeline("summary", [
+        Stage("fetch", fetch_stage),
+        Stage("dedup", dedup_stage, after=["fetch"]),
+        Stage("summarize", summarize_stage, after=["dedup"]),
+    ]),
+    # News + categories
+    "categories": Pipeline("categories", [
+        Stage("fetch", fetch_stage),
+        Stage("classify", classify_stage, after=["fetch"]),
+        Stage("format", categories_stage, after=["classify"]),
+    ]),
+    # News + in-depth analysis
+    "analysis": Pipeline("analysis", [
+        Stage("fetch", fetch_stage),
+        Stage("classify", classify_stage, after=["fetch"]),
+        Stage("comments", comments_stage, after=["fetch"]),
+        Stage("analyze", analyze_stage, after=["classify", "comments"]),
+    ]),
+}
+
+# Output stage of each workflow.
+RESULT_STAGES = {"summary": "summarize", "categories": "format", "analysis": "analyze"}
+
+_SUBREDDIT_RE = re.compile(r"\br/([A-Za-z0-9_]+)")
+_ANALYSIS_RE = re.compile(r"\b(analy[sz]|in-depth|insight)", re.I)
+_CATEGORIES_RE = re.compile(r"\b(categori|classif|topic)", re.I)
+_SUMMARY_RE = re.compile(r"\b(summar|brief|digest)", re.I)
+# Checked with the subreddit names removed, so r/news alone doesn't ask for news.
+_NEWS_RE = re.compile(r"\b(news|headlines|posts)\b", re.I)
+# Requests that mention subreddits without naming them need the router to pick them.
+_VAGUE_SUBREDDITS_RE = re.compile(r"\bsubreddits?\b", re.I)
+# Requests for data the standard workflows don't fetch, which only the router's tools serve.
+_ROUTER_INTENT_RES = [
+    # Stored headlines and time windows (get_stored_headlines)
+    re.compile(r"\b(stored|histor|archiv|yesterday|since\b|(last|past)\s+((\d+|few|couple of|several)\s+)?(hour|day|week|month))", re.I),
+    # Comments and reactions (get_comment_digests)
+    re.compile(r"\b(comment|reaction|reacting|saying|discuss|opinion|people think)", re.I),
+    # Trending and fast-growing posts (get_trending_news)
+    re.compile(r"\b(trend|rising|velocity|taking off|gaining traction|blowing up|viral)", re.I),
+]
+
+
+def match_workflow(query: str) -> Optional[Dict[str, Any]]:
+    """
+    Maps a request onto one of the standard workflows.
+
+    Args:
+        query: The user's request.
+
+    Returns:
+        A context dictionary with the workflow name, subreddits and analysis
+        focus, or None if the request is free-form and needs the router LLM.
+    """
+    subreddits = _SUBREDDIT_RE.findall(query)
+    if not subreddits and _VAGUE_SUBREDDITS_RE.search(query):
+        return None
+    if any(pattern.search(query) for pattern in _ROUTER_INTENT_RES):
+        return None
+    wants_news = bool(_NEWS_RE.search(_SUBREDDIT_RE.sub(" ", query)))
+    if not subreddits and not wants_news:
+        return None
+
+    wants_analysis = bool(_ANALYSIS_RE.search(query))
+    wants_categories = bool(_CATEGORIES_RE.search(query))
+    wants_summary = bool(_SUMMARY_RE.search(query))
+    if wants_analysis and wants_summary:
+        return None  # a custom multi-step pipeline
+    if wants_analysis:
+        workflow = "analysis"
+    elif wants_categories and not wants_summary:
+        workflow = "categories"
+    elif wants_categories:
+        return None  # both summary and categories: a custom pipeline
+    elif wants_summary or wants_news:
+        # A summary, or a plain news request, is the standard news + summary workflow.
+        workflow = "summary"
+    else:
+        return None  # anything else about a subreddit is free-form
+
+    focus = [category for category, pattern in FOCUS_PATTERNS.items() if pattern.search(query)]
+    return {
+        "workflow": workflow,
+        "subreddits": subreddits or list(DEFAULT_SUBREDDITS),
+        "limit": DEFAULT_LIMIT,
+        "focus": focus,
+    }
+
+
+async def run_workflow(name: str, context: Dict[str, Any]) -> PipelineResult:
+    """Runs a standard workflow directly, without the router LLM."""
+    timings = StageTimings()
+    context = await WORKFLOWS[name].run(dict(context), timings)
+    return PipelineResult(context[RESULT_STAGES[name]], "pipeline", name, timings)
+
+
+async def run_query(query: str, use_pipeline: bool = True) -> PipelineResult:
+    """
+    Answers a request through a standard workflow when possible, else the router.
+
+    Args:
+        query: The user's request.
+        use_pipeline: Set to False to always go through the router LLM.
+
+    Returns:
+        A PipelineResult with the answer, the path taken and per-stage timings.
+    """
+    with span("query", "request", input_chars=len(query)):
+        context = match_workflow(query) if use_pipeline else None
+        if context is not None:
+            print(f"--- Pipeline: Running '{context['workflow']}' workflow for {', '.join(context['subreddits'])} ---")
+            result = await run_workflow(context["workflow"], context)
+        else:
+            timings = StageTimings()
+            text = await invoke_agent(router_agent, query, timings)
+            result = PipelineResult(text, "router", None, timings)
+        annotate(path=result.path, workflow=result.workflow, output_chars=len(result.text))
+        return result
@@ -1,18 +1,138 @@
+import contextvars
 import random
 import os
+import sqlite3
+import sys
+from concurrent.futures import wait
 from typing import Optional, List, Dict
 
 from google.adk.agents import Agent
 
-from dotenv import load_dotenv
-load_dotenv()
+# Add the parent directory to sys.path to allow importing from sibling packages
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
 
-import praw
-from praw.exceptions import PRAWException
+from agents.common.tracing import error, span, traced
 
+from .cache import CACHE_TTL, listing_cache
+from .client import get_reddit_client
+from .comments import get_comment_digests
+from .fanout import COMBINED_FETCH, COMBINED_MAX_SUBREDDITS, FETCH_TIMEOUT, fetch_concurrently, get_executor
+from .listings import fetch_hot_posts, fetch_subreddit_posts, record_hot_posts
+from .posts import Post, titles
+from .prefetch import PREFETCH_ENABLED, PrefetchDaemon
+from .store import headline_store
+from .trending import TRENDING_FETCH_LIMIT, describe, trending
+from .validation import SubredditUnavailable, is_reddit_error, subreddit_validation
+
+# Posts per combined listing request, the most Reddit returns at once.
+_COMBINED_PAGE = 100
+
+def _fetch_combined_hot(subreddits: List[str], limit: int) -> List[str]:
+    """
+    Fetches the hot posts of several subreddits with one combined r/a+b+c listing.
+
+    Reddit ranks a combined listing by the same hot score as each subreddit's
+    own, so splitting it by each post's subreddit yields their hot listings in
+    order, except that busy subreddits crowd out quiet ones. A subreddit's
+    posts are cached like a listing fetched on its own if there are at least
+    `limit` of them, or if the combined listing ended within the page, so none
+    are missing.
+
+    Returns:
+        The subreddits whose listings were cached.
+    """
+    reddit = get_reddit_client()
+    name = "+".join(subreddits)
+    with span("reddit.hot", "reddit", subreddit=name, limit=_COMBINED_PAGE) as current:
+        submissions = list(reddit.subreddit(name).hot(limit=_COMBINED_PAGE))
+        if current is not None:
+            current.attrs["items"] = len(submissions)
+    exhausted = len(submissions) < _COMBINED_PAGE
+
+    by_subreddit: Dict[str, List[Post]] = {subreddit.lower(): [] for subreddit in subreddits}
+    for submission in submissions:
+        posts = by_subreddit.get(submission.subreddit.display_name.lower())
+        if posts is not None:
+            posts.append(Post.from_submission(submission))
+
+    cached = []
+    for subreddit in subreddits:
+        posts = by_subreddit[subreddit.lower()]
+        # Short subreddits are left to a fetch of their own, which also checks
+        # that one without any posts exists.
+        if len(posts) < limit and not (exhausted and posts):
+            continue
+        record_hot_posts(subreddit, posts)
+        # A listing known to be complete is stored as exhausted, so it answers any limit.
+        listing_cache.put(subreddit, "hot", len(posts) + 1 if exhausted else len(posts), posts)
+        cached.append(subreddit)
+    return cached
+
+def _prefill_combined(subreddits: List[str], limit: int) -> None:
+    """
+    Caches the hot listings of subreddits not fresh in the listing cache, using combined listings.
+
+    Subreddits known to be unavailable are left out, and a combined listing
+    that fails is only reported: its subreddits are then fetched one by one.
+    """
+    pending = []
+    for subreddit in {subreddit.lower(): subreddit for subreddit in subreddits}.values():
+        age = listing_cache.age(subreddit, "hot", limit)
+        if age is not None and age < CACHE_TTL:
+            continue
+        try:
+            subreddit_validation.check(subreddit)
+        except SubredditUnavailable:
+            continue
+        pending.append(subreddit)
+    # Each subreddit needs room for `limit` posts in a combined page.
+    size = min(COMBINED_MAX_SUBREDDITS, _COMBINED_PAGE // max(1, limit))
+    if size < 2 or len(pending) < 2:
+        return
+    count = -(-len(pending) // size)
+    size = -(-len(pending) // count)  # as even as possible
+    groups = [group for group in (pending[i:i + size] for i in range(0, len(pending), size)) if len(group) > 1]
+
+    executor = get_executor()
+    for group in groups:
+        print(f"--- Tool called: Fetching r/{'+'.join(group)} as one combined listing ---")
+    # Run in a copy of the caller's context so trace spans nest under the call.
+    futures = {
+        executor.submit(contextvars.copy_context().run, _fetch_combined_hot, group, limit): group
+        for group in groups
+    }
+    wait(futures, timeout=FETCH_TIMEOUT)
+    for future, group in futures.items():
+        if not future.done():
+            print(f"--- Tool warning: Combined listing of {len(group)} subreddits timed out; fetching them separately ---")
+        elif future.exception() is not None:
+            print(f"--- Tool warning: Combined listing of {len(group)} subreddits failed ({future.exception()}); fetching them separately ---")
+        elif len(future.result()) < len(group):
+            print(f"--- Tool warning: {len(group) - len(future.result())} of {len(group)} subreddits came back short; fetching them separately ---")
+
+# Keeps the default subreddits, and any others users keep asking for, warm in the listing cache.
+prefetcher = PrefetchDaemon(fetch_hot_posts)
+
+def start_prefetch() -> bool:
+    """
+    Starts the background prefetcher unless it is disabled or credentials are missing.
+
+    Returns:
+        True if the prefetcher is running.
+    """
+    if not PREFETCH_ENABLED or get_reddit_client() is None:
+        return False
+    if not prefetcher.running:
+        prefetcher.start()
+    return True
+
+@traced()
 def get_subreddit_news(subreddit: str, limit: int = 5) -> dict[str, list[str]]:
     """
     Fetches top post titles from a specified subreddit using the Reddit API.
+    Recently fetched listings are served from the shared listing cache.
 
     Args:
         subreddit: The name of the subreddit to fetch news from (e.g., 'worldnews', 'news', 'sports').
@@ -24,36 +144,55 @@ def get_subreddit_news(subreddit: str, limit: int = 5) -> dict[str, list[str]]:
         missing, the subreddit is invalid, or an API error occurs.
     """
     print(f"--- Tool called: Fetching from r/{subreddit} via Reddit API ---")
-    client_id = os.getenv("REDDIT_CLIENT_ID")
-    client_secret = os.getenv("REDDIT_CLIENT_SECRET")
-    user_agent = os.getenv("REDDIT_USER_AGENT")
+    reddit = get_reddit_client()
 
-    if not all([client_id, client_secret, user_agent]):
+    if reddit is None:
         print("--- Tool error: Reddit API credentials missing in .env file. ---")
         return {subreddit: ["Error: Reddit API credentials not configured."]}
 
+    if start_prefetch():
+        prefetcher.record_request(subreddit)
     try:
-        reddit = praw.Reddit(
-            client_id=client_id,
-            client_secret=client_secret,
-            user_agent=user_agent,
-        )
-        # Check if subreddit exists and is accessible
-        reddit.subreddits.search_by_name(subreddit, exact=True)
-        sub = reddit.subreddit(subreddit)
-        top_posts = list(sub.hot(limit=limit)) # Fetch hot posts
-        titles = [post.title for post in top_posts]
-        if not titles:
+        posts = fetch_subreddit_posts(subreddit, limit)
+        if not posts:
              return {subreddit: [f"No recent hot posts found in r/{subreddit}."]}
-        return {subreddit: titles}
-    except PRAWException as e:
-        print(f"--- Tool error: Reddit API error for r/{subreddit}: {e} ---")
-        # More specific error handling could be added here (e.g., 404 for invalid sub)
-        return {subreddit: [f"Error accessing r/{subreddit}. It might be private, banned, or non-existent. Details: {e}"]}
-    except Exception as e: # Catch other potential errors
+        return {subreddit: titles(posts)}
+    except Exception as e:
+        error(e)
+        if is_reddit_error(e):
+            print(f"--- Tool error: Reddit API error for r/{subreddit}: {e} ---")
+            # More specific error handling could be added here (e.g., 404 for invalid sub)
+            return {subreddit: [f"Error accessing r/{subreddit}. It might be private, banned, or non-existent. Details: {e}"]}
+        # Catch other potential errors
         print(f"--- Tool error: Unexpected error for r/{subreddit}: {e} ---")
         return {subreddit: [f"An unexpected error occurred while fetching from r/{subreddit}."]}
 
+@traced()
+def get_stored_headlines(subreddit: str, hours: float = 6, limit: int = 20) -> dict[str, list[str]]:
+    """
+    Returns headlines already fetched from a subreddit, without calling the Reddit API.
+
+    Args:
+        subreddit: The name of the subreddit to look up (e.g., 'news').
+        hours: How far back to look, by post creation time.
+        limit: The maximum number of headlines to return, newest first.
+
+    Returns:
+        A dictionary with the subreddit name as key and a list of stored
+        post titles as value, or a message if nothing was stored.
+    """
+    print(f"--- Tool called: Reading stored headlines from r/{subreddit} (last {hours:g}h) ---")
+    if headline_store is None:
+        return {subreddit: ["Error: The headline store is disabled (HEADLINE_STORE_PATH is empty)."]}
+    try:
+        rows = headline_store.recent(subreddit, hours, limit)
+    except (sqlite3.Error, OSError) as e:
+        print(f"--- Tool error: Could not read stored headlines from r/{subreddit}: {e} ---")
+        return {subreddit: [f"Error: The headline store could not be read: {e}"]}
+    if not rows:
+        return {subreddit: [f"No stored headlines from r/{subreddit} in the last {hours:g} hours."]}
+    return {subreddit: [row["title"] for row in rows]}
+
 def get_mock_reddit_news(subreddit: str) -> dict[str, list[str]]:
     """
     Simulates fetching top post titles from various subreddits.
@@ -129,10 +268,64 @@ def get_mock_reddit_news(subreddit: str) -> dict[str, list[str]]:
         print(f"--- Tool warning: Unknown subreddit '{subreddit}' requested. ---")
         return {subreddit: [f"Sorry, I don't have mock data for r/{subreddit}."]}
 
+def _poll_for_trending(subreddit: str, limit: int) -> Dict[str, List[str]]:
+    """Fetches a hot listing so the trending engine observes it; returns only errors."""
+    if start_prefetch():
+        # Subreddits asked about repeatedly are then polled in the background too.
+        prefetcher.record_request(subreddit)
+    try:
+        fetch_subreddit_posts(subreddit, limit)
+    except Exception as e:
+        error(e)
+        print(f"--- Tool error: Could not poll r/{subreddit} for trending posts: {e} ---")
+        return {subreddit: [f"Error accessing r/{subreddit}. Details: {e}"]}
+    return {subreddit: []}
+
+@traced()
+def get_trending_news(subreddits: Optional[List[str]] = None, limit: int = 10) -> Dict[str, List[str]]:
+    """
+    Finds the posts whose score and comments are growing fastest right now.
+
+    Growth is measured across every poll of the hot listings, including the
+    background refreshes, so the ranking sharpens as the scout keeps running.
+    A post seen only once is ranked by its average growth since it was posted.
+
+    Args:
+        subreddits: Subreddits to rank; their hot posts are polled first. Defaults
+            to every subreddit fetched so far, or the default set if none was.
+        limit: The number of trending posts to return.
+
+    Returns:
+        A dictionary with "trending" as key and one line per post as value,
+        fastest first: the title, subreddit, score and engagement gained per
+        hour, noting whether the growth is accelerating or slowing. Subreddits
+        that could not be polled are reported under "errors".
+    """
+    print(f"--- Tool called: Ranking trending posts in {', '.join(subreddits) if subreddits else 'all tracked subreddits'} ---")
+    if get_reddit_client() is None:
+        print("--- Tool error: Reddit API credentials missing in .env file. ---")
+        return {"trending": ["Error: Reddit API credentials not configured."]}
+    polled = subreddits or (None if len(trending) else ["worldnews", "news", "sports"])
+    errors: List[str] = []
+    if polled:
+        results = fetch_concurrently(_poll_for_trending, polled, TRENDING_FETCH_LIMIT)
+        errors = [message for messages in results.values() for message in messages]
+    top = trending.top(limit, subreddits)
+    response = {"trending": [describe(entry) for entry in top] or ["No trending posts found yet."]}
+    if errors:
+        response["errors"] = errors
+    return response
+
 # Function to fetch news from multiple subreddits
+@traced()
 def get_multi_subreddit_news(subreddits: Optional[List[str]] = None, limit: int = 3) -> Dict[str, List[str]]:
     """
-    Fetches news from multiple subreddits.
+    Fetches news from multiple subreddits concurrently.
+
+    Subreddits are first fetched together with combined r/a+b+c listings, one
+    request for up to COMBINED_MAX_SUBREDDITS of them; only those that come
+    back short, such as quiet subreddits crowded out by busy ones, are then
+    fetched on their own.
     
     Args:
         subreddits: List of subreddit names to fetch news from. Defaults to ["worldnews", "news", "sports"]
@@ -140,16 +333,14 @@ def get_multi_subreddit_news(subreddits: Optional[List[str]] = None, limit: int
 
     Returns:
         A dictionary with subreddit names as keys and lists of post titles as values.
+        A subreddit that fails or times out gets an error message as its only entry.
     """
     if subreddits is None:
         subreddits = ["worldnews", "news", "sports"]
-    
-    results = {}
-    for subreddit in subreddits:
-        subreddit_results = get_subreddit_news(subreddit, limit)
-        results.update(subreddit_results)
-    
-    return results
+
+    if COMBINED_FETCH and get_reddit_client() is not None:
+        _prefill_combined(subreddits, limit)
+    return fetch_concurrently(get_subreddit_news, subreddits, limit)
 
 # Define the Agent
 agent = Agent(
@@ -165,7 +356,10 @@ agent = Agent(
         "   - If both default and specific subreddits are requested, use both."
         "3. **Synthesize Output:** Present the exact list of titles returned by the tool."
         "4. **Format Response:** Present the information as a concise, bulleted list grouped by subreddit. Clearly state which subreddit each group of information came from. If the tool indicates an error or an unknown subreddit, report that message directly."
-        "5. **MUST CALL TOOL:** You **MUST** call the `get_subreddit_news` tool for each subreddit mentioned, or use `get_multi_subreddit_news` for the default set. Do NOT generate summaries without calling the tool first."
+        "5. **MUST CALL TOOL:** You **MUST** call the `get_subreddit_news` tool for each subreddit mentioned, or use `get_multi_subreddit_news` for the default set or any group of several subreddits (it fetches them in parallel). Do NOT generate summaries without calling the tool first."
+        "6. **Past Headlines:** If the user asks what was already seen or posted earlier (e.g., 'the last 6 hours of r/news'), use `get_stored_headlines`, which reads previously fetched posts without calling Reddit."
+        "7. **Discussion:** If the user asks what people are saying about the news, or wants reactions or comments, use `get_comment_digests` for the subreddit; it returns the top comments under its hottest posts."
+        "8. **Trending:** If the user asks what is trending, taking off or gaining traction, use `get_trending_news`, with the subreddits if any are mentioned; it ranks posts by how fast their score and comments grow."
     ),
-    tools=[get_subreddit_news, get_multi_subreddit_news],
+    tools=[get_subreddit_news, get_multi_subreddit_news, get_stored_headlines, get_comment_digests, get_trending_news],
 )
\ No newline at end of file
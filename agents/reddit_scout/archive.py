@@ -0,0 +1,302 @@
+import json
+import os
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from agents.common.tracing import span
+
+from .client import get_reddit_client
+from .posts import Post
+from .ratelimit import BACKGROUND, scheduler
+from .validation import SubredditUnavailable, unavailable_reason
+
+# Listings an archive run walks for every subreddit.
+ARCHIVE_LISTINGS = [name.strip() for name in os.getenv("ARCHIVE_LISTINGS", "hot,new,top").split(",") if name.strip()]
+# Posts fetched per subreddit and listing at most; Reddit serves about 1000.
+ARCHIVE_MAX_POSTS = int(os.getenv("ARCHIVE_MAX_POSTS", "1000"))
+# Time window of the top listing: hour, day, week, month, year or all.
+ARCHIVE_TOP_WINDOW = os.getenv("ARCHIVE_TOP_WINDOW", "all")
+# Attempts per page before a fetch gives up; it can be resumed from its cursor.
+ARCHIVE_RETRIES = int(os.getenv("ARCHIVE_RETRIES", "3"))
+
+# Reddit returns at most this many posts per listing request.
+PAGE_SIZE = 100
+# Seconds before the first retry of a failed page; doubled for every further one.
+_RETRY_DELAY = 1.0
+# Entry of the cursor file holding the output offset; cursor keys always contain a "/".
+_OFFSET_KEY = "output_offset"
+
+# Called with the subreddit, the listing and one page of posts. A sink with an
+# `offset` attribute, the size of the output it has committed, gets it saved
+# with the cursors, so a resumed run can drop anything written after it.
+Sink = Callable[[str, str, List[Post]], None]
+
+
+class PageCursor:
+    """
+    Position of a paginated listing fetch.
+
+    Holds the `after` fullname Reddit continues the listing from and the
+    number of posts fetched so far, so a fetch that failed, or a process that
+    was stopped, resumes where it left off. Converts to and from JSON-friendly
+    dictionaries with as_dict() and from_dict().
+    """
+
+    __slots__ = ("subreddit", "listing", "after", "fetched", "done")
+
+    def __init__(self, subreddit: str, listing: str, after: Optional[str] = None, fetched: int = 0, done: bool = False):
+        self.subreddit = subreddit
+        self.listing = listing
+        self.after = after
+        self.fetched = fetched
+        self.done = done
+
+    @property
+    def key(self) -> str:
+        return f"{self.subreddit.lower()}/{self.listing}"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PageCursor":
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def __repr__(self) -> str:
+        return f"PageCursor({self.key}, after={self.after!r}, fetched={self.fetched}, done={self.done})"
+
+
+def _fetch_page(cursor: PageCursor, size: int, retries: int) -> Dict[str, Any]:
+    reddit = get_reddit_client()
+    if reddit is None:
+        raise RuntimeError("Reddit API credentials not configured.")
+    params: Dict[str, Any] = {"limit": size, "count": cursor.fetched, "raw_json": 1}
+    if cursor.after:
+        params["after"] = cursor.after
+    if cursor.listing in ("top", "controversial"):
+        params["t"] = ARCHIVE_TOP_WINDOW
+
+    for attempt in range(1, retries + 1):
+        try:
+            with span("reddit.page", "reddit", listing=cursor.key, offset=cursor.fetched), scheduler.priority(BACKGROUND):
+                return reddit.request(method="GET", path=f"r/{cursor.subreddit}/{cursor.listing}", params=params)
+        except Exception as e:
+            reason = unavailable_reason(e)
+            if reason is not None:
+                raise SubredditUnavailable(cursor.subreddit, reason) from e
+            if attempt == retries:
+                raise
+            delay = _RETRY_DELAY * 2 ** (attempt - 1)
+            print(f"--- Archive warning: Page {cursor.fetched // PAGE_SIZE + 1} of r/{cursor.key} failed ({e}); retrying in {delay:g}s ---")
+            time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+def iter_pages(
+    cursor: PageCursor,
+    limit: Optional[int] = None,
+    page_size: int = PAGE_SIZE,
+    retries: Optional[int] = None,
+) -> Iterator[List[Post]]:
+    """
+    Fetches a listing page by page with `after` cursors, yielding each page.
+
+    Only the current page is held, so memory stays constant however many
+    posts are fetched. `cursor` is advanced past a page only when the next one
+    is requested, i.e. once the consumer has handled it; if the consumer
+    fails or stops early, or a page can't be fetched within `retries`
+    attempts, the cursor still points at the unfinished page and passing it
+    to iter_pages() again resumes from there.
+
+    Args:
+        cursor: Where to start; a fresh PageCursor starts at the top of the listing.
+        limit: Posts to fetch at most, counting those fetched before resuming.
+            Defaults to ARCHIVE_MAX_POSTS.
+        page_size: Posts per request, at most 100.
+        retries: Attempts per page. Defaults to ARCHIVE_RETRIES.
+
+    Yields:
+        Lists of Post records in listing order.
+
+    Raises:
+        SubredditUnavailable: If the subreddit is private, banned or nonexistent.
+    """
+    limit = ARCHIVE_MAX_POSTS if limit is None else limit
+    retries = max(1, ARCHIVE_RETRIES if retries is None else retries)
+    page_size = max(1, min(page_size, PAGE_SIZE))
+    while not cursor.done and cursor.fetched < limit:
+        data = _fetch_page(cursor, min(page_size, limit - cursor.fetched), retries)["data"]
+        posts = [Post.from_data(child["data"]) for child in data["children"] if child["kind"] == "t3"]
+        after = data.get("after")
+        if posts:
+            yield posts
+        cursor.after = after
+        cursor.fetched += len(posts)
+        cursor.done = after is None or not posts or cursor.fetched >= limit
+
+
+class JsonlSink:
+    """
+    Writes every archived post as one JSON line, a page at a time.
+
+    The post's fields are written together with its subreddit and listing.
+    Pass a path to open the file (appending, so resumed runs continue it) or
+    an open text stream such as sys.stdout. A file is written unbuffered and
+    a page that fails partway is cut off again, so the file only ever ends
+    after a whole page; `offset` is its size up to there.
+    """
+
+    def __init__(self, target: Any = "-", append: bool = True, resume_at: Optional[int] = None):
+        """
+        Args:
+            target: A file path, "-" for stdout, or an open text stream.
+            append: Continue an existing file instead of starting it over.
+            resume_at: When appending, the offset saved with the cursors;
+                anything the file holds beyond it is dropped.
+        """
+        self._owned = isinstance(target, str) and target != "-"
+        self.stream: Any = sys.stdout if target == "-" else target
+        self.offset: Optional[int] = None
+        if self._owned:
+            self.stream = open(target, "ab" if append else "wb", buffering=0)
+            self.offset = os.fstat(self.stream.fileno()).st_size
+            if append and resume_at is not None and resume_at < self.offset:
+                print(f"--- Archive: Dropping {self.offset - resume_at} bytes written after the last saved cursor ---")
+                os.ftruncate(self.stream.fileno(), resume_at)
+                self.offset = resume_at
+        self.written = 0
+
+    def __call__(self, subreddit: str, listing: str, posts: List[Post]) -> None:
+        page = "".join(
+            json.dumps({"subreddit": subreddit, "listing": listing, **post.as_dict()}, ensure_ascii=False) + "\n"
+            for post in posts
+        )
+        if not self._owned:
+            self.stream.write(page)
+            self.stream.flush()
+        else:
+            data = page.encode("utf-8")
+            remaining = memoryview(data)
+            try:
+                # Unbuffered writes may be short.
+                while remaining:
+                    remaining = remaining[self.stream.write(remaining):]
+            except BaseException:
+                # Cut off the part of the page that made it, so a resumed run doesn't write it twice.
+                os.ftruncate(self.stream.fileno(), self.offset)
+                self.stream.seek(self.offset)
+                raise
+            self.offset += len(data)
+        self.written += len(posts)
+
+    def close(self) -> None:
+        if self._owned:
+            self.stream.close()
+
+
+class CursorFile:
+    """
+    PageCursors persisted to a JSON file, so an archive run can resume after a crash.
+
+    The file is replaced atomically on every save and stays small: one entry
+    per subreddit and listing, and the offset the output was committed up to
+    at the last save.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._cursors: Dict[str, Any] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._cursors = json.load(f)
+
+    @property
+    def output_offset(self) -> Optional[int]:
+        """The sink offset saved with the cursors, or None if the sink has none."""
+        return self._cursors.get(_OFFSET_KEY)
+
+    def cursor(self, subreddit: str, listing: str) -> PageCursor:
+        """Returns the saved cursor of a listing, or a fresh one."""
+        fresh = PageCursor(subreddit, listing)
+        saved = self._cursors.get(fresh.key)
+        return PageCursor.from_dict(saved) if saved else fresh
+
+    def save(self, cursor: PageCursor, output_offset: Optional[int] = None) -> None:
+        with self._lock:
+            self._cursors[cursor.key] = cursor.as_dict()
+            if output_offset is not None:
+                self._cursors[_OFFSET_KEY] = output_offset
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temporary = self.path + ".tmp"
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(self._cursors, f, indent=1)
+            os.replace(temporary, self.path)
+
+
+def archive(
+    subreddits: Iterable[str],
+    sink: Sink,
+    listings: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    cursors: Optional[CursorFile] = None,
+) -> Dict[str, Any]:
+    """
+    Fetches deep listings of several subreddits page by page into a sink.
+
+    Listings are fetched one after another at background priority, so an
+    archive run never delays interactive requests. Each page goes to the
+    sink before the next is fetched. With a CursorFile every listing's
+    cursor is saved after each page, together with the sink's offset, and
+    listings already finished in an earlier run are skipped; a listing that fails is reported and the run
+    moves on, to resume that listing next time. An unavailable subreddit is
+    skipped altogether.
+
+    Args:
+        subreddits: Subreddit names to archive.
+        sink: Called as sink(subreddit, listing, posts) for every page, e.g. a JsonlSink.
+        listings: Listings to walk. Defaults to ARCHIVE_LISTINGS.
+        limit: Posts per subreddit and listing. Defaults to ARCHIVE_MAX_POSTS.
+        cursors: Optional CursorFile to resume from and save progress to.
+
+    Returns:
+        Counts of posts, pages and finished, skipped and failed listings.
+
+    Raises:
+        RuntimeError: If Reddit API credentials are missing.
+    """
+    if get_reddit_client() is None:
+        raise RuntimeError("Reddit API credentials not configured.")
+    listings = listings or ARCHIVE_LISTINGS
+    summary: Dict[str, Any] = {"posts": 0, "pages": 0, "finished": 0, "skipped": 0, "failed": []}
+    for subreddit in subreddits:
+        for listing in listings:
+            cursor = cursors.cursor(subreddit, listing) if cursors else PageCursor(subreddit, listing)
+            if cursor.done:
+                summary["skipped"] += 1
+                continue
+            print(f"--- Archive: Fetching r/{cursor.key} from post {cursor.fetched} ---")
+            try:
+                for posts in iter_pages(cursor, limit):
+                    if cursors:
+                        # The cursor has just moved past the page the sink finished.
+                        cursors.save(cursor, getattr(sink, "offset", None))
+                    sink(subreddit, listing, posts)
+                    summary["posts"] += len(posts)
+                    summary["pages"] += 1
+                summary["finished"] += 1
+            except SubredditUnavailable as e:
+                print(f"--- Archive error: Skipping r/{subreddit}: {e} ---")
+                summary["failed"].append(cursor.key)
+                break
+            except Exception as e:
+                print(f"--- Archive error: r/{cursor.key} stopped at post {cursor.fetched}: {e} ---")
+                summary["failed"].append(cursor.key)
+            finally:
+                if cursors:
+                    cursors.save(cursor, getattr(sink, "offset", None))
+    return summary
@@ -0,0 +1,276 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agents.common.tracing import event
+
+from .fanout import get_executor
+from .posts import Post
+from .ratelimit import BACKGROUND, scheduler
+
+# Seconds a cached listing is served without contacting Reddit.
+CACHE_TTL = float(os.getenv("REDDIT_CACHE_TTL", "60"))
+# Additional seconds an expired listing is still served while it is refreshed.
+CACHE_STALE_TTL = float(os.getenv("REDDIT_CACHE_STALE_TTL", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("REDDIT_CACHE_MAX_ENTRIES", "256"))
+# Directory for the optional on-disk tier; unset keeps the cache in memory only.
+CACHE_DIR = os.getenv("REDDIT_CACHE_DIR")
+
+Loader = Callable[[str, int], List[Any]]
+
+
+class CacheEntry:
+    __slots__ = ("limit", "items", "fetched_at")
+
+    def __init__(self, limit: int, items: List[Any], fetched_at: float):
+        self.limit = limit
+        self.items = items
+        self.fetched_at = fetched_at
+
+    def covers(self, limit: int) -> bool:
+        # A listing that came back shorter than requested is exhausted, so it
+        # answers any larger request as well.
+        return self.limit >= limit or len(self.items) < self.limit
+
+
+class _Load:
+    """A listing load in progress, awaited by concurrent requests for the same listing."""
+
+    __slots__ = ("limit", "done", "items", "error")
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.done = threading.Event()
+        self.items: List[Any] = []
+        self.error: Optional[BaseException] = None
+
+
+class ListingCache:
+    """
+    LRU cache of subreddit listings with stale-while-revalidate semantics.
+
+    Entries are keyed by (subreddit, listing) and remember the `limit` they were
+    fetched with, so a cached hot list of 25 posts also answers a request for 5.
+    Listings older than `ttl` are still returned for up to `stale_ttl` more
+    seconds while a background refresh replaces them. Concurrent misses for the
+    same listing share a single load.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CACHE_MAX_ENTRIES,
+        ttl: float = CACHE_TTL,
+        stale_ttl: float = CACHE_STALE_TTL,
+        disk_dir: Optional[str] = CACHE_DIR,
+        name: str = "listing_cache",
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self._refreshing: set = set()
+        self._loading: Dict[Tuple[str, str], _Load] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "stale_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, subreddit: str, listing: str, limit: int, loader: Loader) -> List[Any]:
+        """
+        Returns up to `limit` items of a listing, loading it only when necessary.
+
+        Args:
+            subreddit: The subreddit name.
+            listing: The listing type, e.g. 'hot'.
+            limit: The number of items wanted.
+            loader: Called as loader(subreddit, limit) on a miss or refresh. Its
+                exceptions propagate to the caller and nothing is cached.
+
+        Returns:
+            The cached or freshly loaded items, truncated to `limit`.
+        """
+        key = (subreddit.lower(), listing)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or not entry.covers(limit):
+                entry = None
+            else:
+                self._entries.move_to_end(key)
+
+        if entry is None and self.disk_dir:
+            entry = self._read_disk(key)
+            if entry is not None and entry.covers(limit) and now - entry.fetched_at < self.ttl + self.stale_ttl:
+                self._count("disk_hits")
+                event(self.name, "disk")
+                self._store(key, entry, write_disk=False)
+            else:
+                entry = None
+
+        if entry is not None:
+            age = now - entry.fetched_at
+            if age < self.ttl:
+                self._count("hits")
+                event(self.name, "hit")
+                return entry.items[:limit]
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale_hits")
+                event(self.name, "stale")
+                self._refresh_in_background(key, subreddit, max(limit, entry.limit), loader)
+                return entry.items[:limit]
+
+        with self._lock:
+            load = self._loading.get(key)
+            waiting = load is not None and load.limit >= limit
+            if not waiting:
+                load = _Load(limit)
+                self._loading[key] = load
+        if waiting:
+            # Another request is already loading this listing; wait for its result.
+            self._count("coalesced")
+            event(self.name, "coalesced")
+            load.done.wait()
+            if load.error is not None:
+                raise load.error
+            return load.items[:limit]
+
+        self._count("misses")
+        event(self.name, "miss")
+        try:
+            load.items = loader(subreddit, limit)
+            self._store(key, CacheEntry(limit, load.items, time.time()))
+        except BaseException as e:
+            load.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._loading.get(key) is load:
+                    del self._loading[key]
+            load.done.set()
+        return load.items[:limit]
+
+    def put(self, subreddit: str, listing: str, limit: int, items: List[Any]) -> None:
+        """Stores a listing fetched outside of `get`, e.g. by a prefetcher."""
+        self._store((subreddit.lower(), listing), CacheEntry(limit, items, time.time()))
+
+    def peek(self, subreddit: str, listing: str, limit: int) -> Optional[List[Any]]:
+        """Returns the in-memory items of a listing, however old, without loading or counting."""
+        with self._lock:
+            entry = self._entries.get((subreddit.lower(), listing))
+            if entry is None or not entry.covers(limit):
+                return None
+            return entry.items[:limit]
+
+    def age(self, subreddit: str, listing: str, limit: int = 0) -> Optional[float]:
+        """Returns the age in seconds of the in-memory listing covering `limit`, or None."""
+        with self._lock:
+            entry = self._entries.get((subreddit.lower(), listing))
+            if entry is None or not entry.covers(limit):
+                return None
+            return time.time() - entry.fetched_at
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss/eviction counters plus the current number of entries."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["entries"] = len(self._entries)
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _store(self, key: Tuple[str, str], entry: CacheEntry, write_disk: bool = True) -> None:
+        with self._lock:
+            current = self._entries.get(key)
+            # Keep a fresh wider listing rather than replacing it with a narrower one.
+            if current is not None and current.limit > entry.limit and entry.fetched_at - current.fetched_at < self.ttl:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        if write_disk and self.disk_dir:
+            self._write_disk(key, entry)
+
+    def _refresh_in_background(self, key: Tuple[str, str], subreddit: str, limit: int, loader: Loader) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                # Nobody is waiting on this fetch; let interactive requests go first.
+                with scheduler.priority(BACKGROUND):
+                    items = loader(subreddit, limit)
+                self._store(key, CacheEntry(limit, items, time.time()))
+                self._count("refreshes")
+            except Exception as e:
+                print(f"--- Cache warning: Background refresh of r/{subreddit} failed: {e} ---")
+                self._count("refresh_errors")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        get_executor().submit(refresh)
+
+    def _disk_path(self, key: Tuple[str, str]) -> str:
+        subreddit, listing = key
+        name = re.sub(r"[^a-z0-9_]", "_", f"{listing}-{subreddit}")
+        return os.path.join(self.disk_dir, f"{name}.json")
+
+    def _read_disk(self, key: Tuple[str, str]) -> Optional[CacheEntry]:
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            items = data["items"]
+            if data.get("kind") == "posts":
+                items = [Post(*row) for row in items]
+            return CacheEntry(data["limit"], items, data["fetched_at"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_disk(self, key: Tuple[str, str], entry: CacheEntry) -> None:
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        data = {"limit": entry.limit, "items": entry.items, "fetched_at": entry.fetched_at}
+        if entry.items and isinstance(entry.items[0], Post):
+            # Posts are written as rows of field values to keep the files small.
+            data["kind"] = "posts"
+            data["items"] = [post.as_tuple() for post in entry.items]
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"--- Cache warning: Could not write {path}: {e} ---")
+
+
+# Shared by every scout tool call in the process.
+listing_cache = ListingCache()
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Returns the counters of the shared listing cache."""
+    return listing_cache.stats()
@@ -0,0 +1,219 @@
+import atexit
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Cassette file (gzip-compressed JSON lines) to record Reddit responses to or replay them from.
+REDDIT_CASSETTE = os.getenv("REDDIT_CASSETTE")
+# 'record', 'replay', or 'auto' (replay if the file exists, else record).
+REDDIT_CASSETTE_MODE = os.getenv("REDDIT_CASSETTE_MODE", "auto").lower()
+# Seconds each replayed response takes: a number, or 'recorded' for the recorded time.
+REDDIT_CASSETTE_LATENCY = os.getenv("REDDIT_CASSETTE_LATENCY", "0")
+# Random extra seconds, up to this much, added to each replayed response.
+REDDIT_CASSETTE_JITTER = float(os.getenv("REDDIT_CASSETTE_JITTER", "0"))
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Response headers worth keeping; rate-limit headers would make replays throttle.
+_KEPT_HEADERS = ("content-type", "location")
+_TOKEN_PATH = "/api/v1/access_token"
+
+
+class CassetteMiss(requests.RequestException):
+    """
+    Raised when a replayed request has no recorded response.
+
+    Not a ConnectionError, which prawcore would retry with backoff.
+    """
+
+
+def request_key(method: str, url: str) -> str:
+    """
+    Returns the key a request is recorded under.
+
+    The host is left out, so a cassette recorded against reddit.com replays
+    for any endpoint, and the path and query are normalized.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method.upper()} {parts.path.lower().rstrip('/')}?{query}"
+
+
+class Cassette:
+    """
+    Recorded Reddit API interactions, keyed by request.
+
+    When a request was recorded several times, the responses are replayed in
+    recorded order and the last one repeats, so polling a listing replays the
+    way it changed. Access tokens are never written to the file.
+    """
+
+    def __init__(self, path: str, mode: str, latency: str = "0", jitter: float = 0.0):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Cassette mode must be '{RECORD}' or '{REPLAY}', not '{mode}'")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._records: List[Dict[str, Any]] = []
+        self._index: Dict[str, List[Dict[str, Any]]] = {}
+        self._positions: Dict[str, int] = {}
+        self._stats: Dict[str, int] = {"recorded": 0, "replayed": 0, "misses": 0}
+        if mode == REPLAY:
+            self._load()
+        else:
+            atexit.register(self.save)
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._records.append(record)
+                    self._index.setdefault(record["key"], []).append(record)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def adapter(self, inner: BaseAdapter) -> BaseAdapter:
+        """Returns the transport adapter to mount: recording through `inner`, or replaying without it."""
+        return _RecordingAdapter(self, inner) if self.mode == RECORD else _ReplayAdapter(self)
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response) -> None:
+        key = request_key(request.method, request.url)
+        body = response.text
+        if key.split("?")[0].endswith(_TOKEN_PATH) and response.status_code == 200:
+            token = json.loads(body)
+            token["access_token"] = "replay-token"
+            body = json.dumps(token)
+        record = {
+            "key": key,
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers},
+            "body": body,
+            "elapsed": round(response.elapsed.total_seconds(), 4),
+        }
+        with self._lock:
+            self._records.append(record)
+            self._stats["recorded"] += 1
+
+    def replay(self, request: requests.PreparedRequest) -> requests.Response:
+        key = request_key(request.method, request.url)
+        with self._lock:
+            recorded = self._index.get(key)
+            if not recorded:
+                self._stats["misses"] += 1
+                raise CassetteMiss(f"No recorded response for {key} in {self.path}", request=request)
+            position = self._positions.get(key, 0)
+            self._positions[key] = min(position + 1, len(recorded) - 1)
+            self._stats["replayed"] += 1
+        record = recorded[position]
+
+        delay = record["elapsed"] if self.latency == "recorded" else float(self.latency)
+        delay += random.uniform(0, self.jitter) if self.jitter else 0.0
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = record["status"]
+        response.headers = CaseInsensitiveDict(record["headers"])
+        response._content = record["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(seconds=delay)
+        return response
+
+    def rewind(self) -> None:
+        """Starts every recorded sequence from its first response again."""
+        with self._lock:
+            self._positions.clear()
+
+    def save(self) -> None:
+        """Writes the recorded interactions; called automatically at exit when recording."""
+        if self.mode != RECORD:
+            return
+        with self._lock:
+            records = list(self._records)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with gzip.open(self.path, "wt", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            snapshot = dict(self._stats)
+        snapshot["interactions"] = len(self._records)
+        return snapshot
+
+
+class _RecordingAdapter(BaseAdapter):
+    def __init__(self, cassette: Cassette, inner: BaseAdapter):
+        super().__init__()
+        self.cassette = cassette
+        self.inner = inner
+
+    def send(self, request, **kwargs):
+        response = self.inner.send(request, **kwargs)
+        self.cassette.record(request, response)
+        return response
+
+    def close(self):
+        self.inner.close()
+
+
+class _ReplayAdapter(BaseAdapter):
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        return self.cassette.replay(request)
+
+    def close(self):
+        pass
+
+
+_cassette: Optional[Cassette] = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """
+    Returns the process-wide cassette configured by REDDIT_CASSETTE, or None.
+
+    In 'auto' mode an existing cassette file is replayed and a missing one is
+    recorded.
+    """
+    global _cassette
+    if not REDDIT_CASSETTE:
+        return None
+    if _cassette is None:
+        with _cassette_lock:
+            if _cassette is None:
+                mode = REDDIT_CASSETTE_MODE
+                if mode == "auto":
+                    mode = REPLAY if os.path.exists(REDDIT_CASSETTE) else RECORD
+                _cassette = Cassette(REDDIT_CASSETTE, mode, REDDIT_CASSETTE_LATENCY, REDDIT_CASSETTE_JITTER)
+                print(f"--- Reddit cassette: {'Replaying' if mode == REPLAY else 'Recording to'} {REDDIT_CASSETTE} ---")
+    return _cassette
+
+
+def replaying() -> bool:
+    """True if Reddit responses come from a cassette instead of the network."""
+    cassette = get_cassette()
+    return cassette is not None and cassette.mode == REPLAY
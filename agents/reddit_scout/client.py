@@ -0,0 +1,242 @@
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .cassette import get_cassette, replaying
+from .ratelimit import scheduler
+
+if TYPE_CHECKING:
+    import praw
+
+# Size of the keep-alive pool shared by every tool call in this process.
+POOL_MAXSIZE = int(os.getenv("REDDIT_POOL_MAXSIZE", "16"))
+
+TOKEN_PATH = "/api/v1/access_token"
+
+# A token fetched this recently is handed to concurrent callers instead of
+# performing another exchange.
+TOKEN_REUSE_WINDOW = 30.0
+
+# Times a request answered with 429 is queued again before the error is returned.
+MAX_THROTTLE_RETRIES = int(os.getenv("REDDIT_MAX_THROTTLE_RETRIES", "3"))
+
+
+class PoolStats:
+    """Thread-safe counters describing how the shared Reddit client is reused."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {
+            "hits": 0,
+            "clients_created": 0,
+            "new_connections": 0,
+            "token_refreshes": 0,
+            "requests": 0,
+        }
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+    def reset(self) -> None:
+        with self._lock:
+            for name in self._counts:
+                self._counts[name] = 0
+
+
+stats = PoolStats()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        stats.increment("new_connections")
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        stats.increment("new_connections")
+        return super()._new_conn()
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTP adapter that keeps connections alive and counts every new socket."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+class PooledSession(requests.Session):
+    """
+    Keep-alive session shared by every caller of the pooled Reddit client.
+
+    API requests pass through the shared rate-limit scheduler, which queues them
+    until Reddit's budget allows and re-queues requests answered with 429.
+    Token exchanges are serialized: when several threads notice an expired token
+    at once, the first performs the exchange and the others reuse its response.
+    A token rejected with 401 is never handed out again.
+    """
+
+    def __init__(self):
+        super().__init__()
+        adapter = _PooledAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE)
+        cassette = get_cassette()
+        if cassette is not None:
+            # Records responses passing through the pool, or replays them without it.
+            adapter = cassette.adapter(adapter)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self._token_lock = threading.Lock()
+        self._token_response: Optional[requests.Response] = None
+        self._token_fetched_at = 0.0
+
+    def request(self, method, url, *args, **kwargs):
+        if TOKEN_PATH not in url:
+            attempts = 0
+            while True:
+                scheduler.acquire()
+                stats.increment("requests")
+                sent_at = time.monotonic()
+                response = super().request(method, url, *args, **kwargs)
+                scheduler.update(response.headers, response.status_code)
+                if response.status_code == 401:
+                    self._discard_token(sent_at)
+                if response.status_code != 429 or attempts >= MAX_THROTTLE_RETRIES:
+                    return response
+                attempts += 1
+
+        requested_at = time.monotonic()
+        with self._token_lock:
+            fresh = (
+                self._token_response is not None
+                and self._token_fetched_at >= requested_at - TOKEN_REUSE_WINDOW
+            )
+            if fresh:
+                return self._token_response
+            stats.increment("requests")
+            stats.increment("token_refreshes")
+            response = super().request(method, url, *args, **kwargs)
+            if response.status_code == 200:
+                self._token_response = response
+                self._token_fetched_at = time.monotonic()
+            return response
+
+    def _discard_token(self, sent_at: float) -> None:
+        """Stops reusing a token Reddit rejected, so the re-authorization exchanges a new one."""
+        with self._token_lock:
+            # A token fetched after the request was sent may be a valid replacement.
+            if self._token_fetched_at <= sent_at:
+                self._token_response = None
+
+
+def build_session() -> requests.Session:
+    """
+    Creates the keep-alive HTTP session shared by the pooled Reddit client.
+
+    Returns:
+        A requests session whose connection pool is reused across tool calls.
+    """
+    return PooledSession()
+
+
+def _credentials() -> Optional[Tuple[str, str, str]]:
+    client_id = os.getenv("REDDIT_CLIENT_ID")
+    client_secret = os.getenv("REDDIT_CLIENT_SECRET")
+    user_agent = os.getenv("REDDIT_USER_AGENT")
+    if not all([client_id, client_secret, user_agent]):
+        if replaying():
+            # Replayed responses need no real credentials.
+            return "replay", "replay", "reddit-news-aggregator cassette replay"
+        return None
+    return client_id, client_secret, user_agent
+
+
+_clients: Dict[Tuple[str, str, str], "praw.Reddit"] = {}
+_sessions: Dict[Tuple[str, str, str], requests.Session] = {}
+_clients_lock = threading.Lock()
+
+
+def get_reddit_client() -> Optional["praw.Reddit"]:
+    """
+    Returns the process-wide Reddit client for the configured credentials.
+
+    The client is created once per set of credentials and shares a single
+    keep-alive HTTP session. PRAW keeps the application-only OAuth token on the
+    client and requests a new one only after it expires, so repeated tool calls
+    skip the token exchange entirely.
+
+    Returns:
+        A praw.Reddit instance, or None if the Reddit API credentials are missing.
+    """
+    credentials = _credentials()
+    if credentials is None:
+        return None
+
+    client = _clients.get(credentials)
+    if client is not None:
+        stats.increment("hits")
+        return client
+
+    with _clients_lock:
+        client = _clients.get(credentials)
+        if client is not None:
+            stats.increment("hits")
+            return client
+        # Imported here rather than at module level; PRAW adds noticeably to startup.
+        import praw
+
+        client_id, client_secret, user_agent = credentials
+        session = build_session()
+        endpoints = {}
+        # Point the client at another host, e.g. benchmarks/fake_reddit.py.
+        if os.getenv("REDDIT_OAUTH_URL"):
+            endpoints["oauth_url"] = os.environ["REDDIT_OAUTH_URL"]
+        if os.getenv("REDDIT_URL"):
+            endpoints["reddit_url"] = os.environ["REDDIT_URL"]
+        client = praw.Reddit(
+            client_id=client_id,
+            client_secret=client_secret,
+            user_agent=user_agent,
+            requestor_kwargs={"session": session},
+            # Tools may run from ADK's event loop or worker threads; the shared
+            # client is safe to use from either.
+            check_for_async=False,
+            **endpoints,
+        )
+        _clients[credentials] = client
+        _sessions[credentials] = session
+        stats.increment("clients_created")
+        return client
+
+
+def get_pool_stats() -> Dict[str, int]:
+    """
+    Returns a snapshot of the shared client counters.
+
+    Returns:
+        A dictionary with hits (reused client lookups), clients_created,
+        new_connections (TCP connections opened), token_refreshes and requests.
+    """
+    return stats.snapshot()
+
+
+def reset_clients() -> None:
+    """Closes and forgets every pooled client, e.g. after credentials change."""
+    with _clients_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _clients.clear()
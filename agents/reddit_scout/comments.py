@@ -0,0 +1,303 @@
+import contextvars
+import html
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from agents.common.tracing import error, span, traced
+
+from .cache import ListingCache
+from .client import get_reddit_client
+from .fanout import FETCH_CONCURRENCY, get_executor
+from .listings import fetch_subreddit_posts
+from .posts import Post
+
+# Top-level comments kept per post.
+COMMENT_TOP_N = int(os.getenv("REDDIT_COMMENT_TOP_N", "5"))
+# Reply levels kept below each top-level comment; 0 keeps top-level comments only.
+COMMENT_DEPTH = int(os.getenv("REDDIT_COMMENT_DEPTH", "1"))
+# Replies kept per comment on each of those levels.
+COMMENT_REPLIES = int(os.getenv("REDDIT_COMMENT_REPLIES", "2"))
+# Reddit API requests one comment fetch may make, across all of its posts.
+COMMENT_MAX_REQUESTS = int(os.getenv("REDDIT_COMMENT_MAX_REQUESTS", "10"))
+# Seconds one comment fetch may take; posts not done by then are left out.
+COMMENT_TIMEOUT = float(os.getenv("REDDIT_COMMENT_TIMEOUT", "5"))
+# Characters kept of each comment.
+COMMENT_BODY_CHARS = int(os.getenv("REDDIT_COMMENT_BODY_CHARS", "200"))
+# Seconds fetched comment threads are reused.
+COMMENT_CACHE_TTL = float(os.getenv("REDDIT_COMMENT_CACHE_TTL", "300"))
+
+# Reddit returns at most this many comments per request.
+_MAX_LIMIT = 500
+_UNREADABLE = ("[deleted]", "[removed]")
+
+
+class BudgetExhausted(Exception):
+    """Raised when a comment fetch has used up its API requests."""
+
+    def __init__(self, post_id: str, budget: "RequestBudget"):
+        super().__init__(post_id)
+        self.budget = budget
+
+
+class RequestBudget:
+    """Thread-safe count of the API requests a comment fetch may still make."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        """Claims one request; False if none are left."""
+        with self._lock:
+            if self.used >= self.limit:
+                return False
+            self.used += 1
+            return True
+
+
+def _readable(comment: Dict[str, Any]) -> bool:
+    # Stickied comments are moderator notes, not discussion.
+    return comment.get("body") not in _UNREADABLE and not comment.get("stickied")
+
+
+def _replies(comment: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The replies of a comment, from a nested tree or as attached by _nest()."""
+    if "_replies" in comment:
+        return comment["_replies"]
+    listing = comment.get("replies")
+    if not listing:
+        return []
+    return [child["data"] for child in listing["data"]["children"] if child["kind"] == "t1"]
+
+
+def _nest(things: List[Dict[str, Any]], link_name: str) -> List[Dict[str, Any]]:
+    """Rebuilds the flat comment list of /api/morechildren into top-level comments with replies."""
+    by_name: Dict[str, Dict[str, Any]] = {}
+    roots = []
+    for thing in things:
+        if thing["kind"] != "t1":
+            continue
+        comment = dict(thing["data"], _replies=[])
+        by_name[comment["name"]] = comment
+        parent = by_name.get(comment["parent_id"])
+        if parent is not None:
+            parent["_replies"].append(comment)
+        elif comment["parent_id"] == link_name:
+            roots.append(comment)
+    return roots
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join(html.unescape(text).split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def _count(value: int) -> str:
+    """Formats a score or count compactly: 950, 1.2k, 35k."""
+    if abs(value) < 1000:
+        return str(value)
+    if abs(value) < 10_000:
+        return f"{value / 1000:.1f}k"
+    return f"{value // 1000}k"
+
+
+def format_thread(comment: Dict[str, Any], depth: int, replies: int, level: int = 0) -> str:
+    """
+    Renders a comment and up to `replies` replies per level, `depth` levels down.
+
+    Each comment is one indented line: its score in brackets and its body,
+    cut to COMMENT_BODY_CHARS.
+    """
+    lines = [f"{'  ' * level}- [{_count(comment.get('score', 0))}] {_shorten(comment['body'], COMMENT_BODY_CHARS)}"]
+    if level < depth:
+        kept = [reply for reply in _replies(comment) if _readable(reply)][:replies]
+        lines.extend(format_thread(reply, depth, replies, level + 1) for reply in kept)
+    return "\n".join(lines)
+
+
+def _load_threads(post_id: str, top_n: int, depth: int, replies: int, budget: RequestBudget) -> List[str]:
+    """
+    Fetches the top comment threads of a post, rendered, with at most two requests.
+
+    The comments request asks Reddit for only as many comments, and levels, as
+    the digest keeps. If the top-level comments it returns fall short of
+    `top_n`, one /api/morechildren request fills them up, budget permitting;
+    nothing else is expanded.
+    """
+    reddit = get_reddit_client()
+    if not budget.take():
+        raise BudgetExhausted(post_id, budget)
+    # Reddit counts replies against `limit` as well.
+    wanted = top_n * sum(replies ** level for level in range(depth + 1))
+    with span("reddit.comments", "reddit", post=post_id, limit=wanted):
+        data = reddit.request(
+            method="GET",
+            path=f"comments/{post_id}",
+            params={"limit": min(wanted, _MAX_LIMIT), "depth": depth + 1, "sort": "top"},
+        )
+    children = data[1]["data"]["children"]
+    comments = [child["data"] for child in children if child["kind"] == "t1" and _readable(child["data"])]
+    more = next((child["data"] for child in children if child["kind"] == "more"), None)
+
+    if len(comments) < top_n and more and more.get("children") and budget.take():
+        ids = more["children"][:top_n - len(comments)]
+        with span("reddit.morechildren", "reddit", post=post_id, items=len(ids)):
+            data = reddit.request(
+                method="GET",
+                path="api/morechildren",
+                params={
+                    "link_id": f"t3_{post_id}",
+                    "children": ",".join(ids),
+                    "depth": depth + 1,
+                    "sort": "top",
+                    "api_type": "json",
+                    "limit_children": False,
+                },
+            )
+        things = data.get("json", {}).get("data", {}).get("things", [])
+        comments.extend(comment for comment in _nest(things, f"t3_{post_id}") if _readable(comment))
+    return [format_thread(comment, depth, replies) for comment in comments[:top_n]]
+
+
+# Rendered comment threads by post. Entries are never served stale, since a
+# background refresh would make requests outside any fetch's budget.
+comment_cache = ListingCache(ttl=COMMENT_CACHE_TTL, stale_ttl=0, disk_dir=None, name="comment_cache")
+
+
+def _header(post: Post) -> str:
+    return f"{post.title} (score {_count(post.score)}, {_count(post.num_comments)} comments)"
+
+
+def _digest(post: Post, top_n: int, depth: int, replies: int, budget: RequestBudget) -> str:
+    if not post.num_comments:
+        return _header(post) + "\n(no comments)"
+    while True:
+        try:
+            threads = comment_cache.get(
+                post.id,
+                f"comments:{depth}:{replies}",
+                top_n,
+                lambda post_id, limit: _load_threads(post_id, limit, depth, replies, budget),
+            )
+            break
+        except BudgetExhausted as e:
+            if e.budget is budget:
+                raise
+            # A concurrent fetch we waited on ran out of its own budget; load with ours.
+    return "\n".join([_header(post), *threads]) if threads else _header(post) + "\n(no comments)"
+
+
+def iter_comment_digests(
+    posts: Iterable[Post],
+    top_n: Optional[int] = None,
+    depth: Optional[int] = None,
+    replies: Optional[int] = None,
+    max_requests: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Iterator[Tuple[Post, str]]:
+    """
+    Fetches the comments of several posts in parallel, yielding digests as they finish.
+
+    Every post costs one API request, or two when its top-level comments have
+    to be filled up; threads fetched recently are reused without a request.
+    Once `max_requests` are spent or `timeout` has passed, the remaining posts
+    are yielded with a note instead of their comments, so the fetch never
+    takes longer than `timeout`.
+
+    Args:
+        posts: The posts, e.g. from fetch_subreddit_posts().
+        top_n: Top-level comments per post. Defaults to COMMENT_TOP_N.
+        depth: Reply levels below each of them. Defaults to COMMENT_DEPTH.
+        replies: Replies per comment and level. Defaults to COMMENT_REPLIES.
+        max_requests: API requests for all posts together. Defaults to COMMENT_MAX_REQUESTS.
+        timeout: Seconds for all posts together. Defaults to COMMENT_TIMEOUT.
+
+    Yields:
+        (post, digest) pairs in completion order. A digest is the headline with
+        its score and comment count, then one indented line per comment.
+    """
+    top_n = COMMENT_TOP_N if top_n is None else top_n
+    depth = COMMENT_DEPTH if depth is None else depth
+    replies = COMMENT_REPLIES if replies is None else replies
+    budget = RequestBudget(COMMENT_MAX_REQUESTS if max_requests is None else max_requests)
+    timeout = COMMENT_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    executor = get_executor()
+
+    queue = list(reversed({post.id: post for post in posts}.values()))
+    in_flight: Dict[Future, Post] = {}
+    while queue or in_flight:
+        while queue and len(in_flight) < FETCH_CONCURRENCY:
+            post = queue.pop()
+            # Run in a copy of the caller's context so trace spans nest under the call.
+            future = executor.submit(contextvars.copy_context().run, _digest, post, top_n, depth, replies, budget)
+            in_flight[future] = post
+        done, _ = wait(in_flight, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            post = in_flight.pop(future)
+            try:
+                yield post, future.result()
+            except BudgetExhausted:
+                yield post, _header(post) + f"\n(comments skipped: the budget of {budget.limit} requests is spent)"
+            except Exception as e:
+                print(f"--- Tool warning: Could not fetch comments of post {post.id}: {e} ---")
+                yield post, _header(post) + "\n(comments unavailable)"
+
+    for future, post in in_flight.items():
+        # The worker finishes in the background; a successful result still fills the cache.
+        future.cancel()
+        yield post, _header(post) + f"\n(comments skipped: not fetched within {timeout:g}s)"
+    for post in reversed(queue):
+        yield post, _header(post) + f"\n(comments skipped: not fetched within {timeout:g}s)"
+
+
+def comment_digests(posts: List[Post], **budgets: Any) -> Dict[str, str]:
+    """
+    Returns post id -> comment digest for `posts`, in their order.
+
+    Takes the same keyword arguments as iter_comment_digests().
+    """
+    digests = {post.id: digest for post, digest in iter_comment_digests(posts, **budgets)}
+    return {post.id: digests[post.id] for post in posts if post.id in digests}
+
+
+@traced()
+def get_comment_digests(subreddit: str, limit: int = 3) -> Dict[str, List[str]]:
+    """
+    Fetches the top comments under the hottest posts of a subreddit, as compact digests.
+
+    Comments of all posts are fetched in parallel with hard limits on the
+    comments and reply levels kept per post, the API requests made and the
+    time taken, so a large thread costs no more than a small one.
+
+    Args:
+        subreddit: The name of the subreddit (e.g., 'worldnews').
+        limit: The number of hottest posts whose comments are fetched.
+
+    Returns:
+        A dictionary with the subreddit name as key and one digest per post as
+        value: the headline with its score and comment count, then the top
+        comments, each on a line with its score, replies indented below it.
+        Returns an error message if the posts can't be fetched.
+    """
+    print(f"--- Tool called: Fetching comments of {limit} posts from r/{subreddit} ---")
+    if get_reddit_client() is None:
+        print("--- Tool error: Reddit API credentials missing in .env file. ---")
+        return {subreddit: ["Error: Reddit API credentials not configured."]}
+    try:
+        posts = fetch_subreddit_posts(subreddit, limit)
+    except Exception as e:
+        error(e)
+        print(f"--- Tool error: Could not fetch posts of r/{subreddit}: {e} ---")
+        return {subreddit: [f"Error accessing r/{subreddit}. Details: {e}"]}
+    if not posts:
+        return {subreddit: [f"No recent hot posts found in r/{subreddit}."]}
+    return {subreddit: list(comment_digests(posts).values())}
@@ -0,0 +1,124 @@
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+# Maximum number of subreddits fetched at once by a single multi-subreddit call.
+FETCH_CONCURRENCY = int(os.getenv("REDDIT_FETCH_CONCURRENCY", "8"))
+# Seconds each subreddit is given before its slot is released with an error entry.
+FETCH_TIMEOUT = float(os.getenv("REDDIT_FETCH_TIMEOUT", "10"))
+# Worker threads shared by every fan-out in the process. Kept above the per-call
+# concurrency so a fetch that overran its deadline does not starve later calls.
+FETCH_WORKERS = int(os.getenv("REDDIT_FETCH_WORKERS", "32"))
+# Fetch the subreddits of a multi-subreddit call with combined r/a+b+c listings
+# first, so most of them cost no request of their own.
+COMBINED_FETCH = os.getenv("REDDIT_COMBINED_FETCH", "1").lower() not in ("0", "false", "no")
+# Subreddits per combined listing request.
+COMBINED_MAX_SUBREDDITS = int(os.getenv("REDDIT_COMBINED_MAX_SUBREDDITS", "20"))
+
+# Starts of the messages the scout's tools return in place of a subreddit's headlines.
+FAILURE_PREFIXES = ("Error", "An unexpected error", "No recent hot posts found", "Sorry, I don't have")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def failure_message(headlines: List[str]) -> Optional[str]:
+    """
+    Returns the message a fetch returned instead of a subreddit's headlines.
+
+    Args:
+        headlines: One subreddit's entry in a scout tool's result.
+
+    Returns:
+        The error, or the note that there were no posts, or None if the
+        entry holds headlines.
+    """
+    if len(headlines) == 1 and headlines[0].startswith(FAILURE_PREFIXES):
+        return headlines[0]
+    return None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Returns the process-wide thread pool used for Reddit fetches."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=FETCH_WORKERS, thread_name_prefix="reddit-fetch"
+                )
+    return _executor
+
+
+def fetch_concurrently(
+    fetch: Callable[[str, int], Dict[str, List[str]]],
+    subreddits: List[str],
+    limit: int,
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> Dict[str, List[str]]:
+    """
+    Runs a single-subreddit fetch for many subreddits in parallel.
+
+    At most `max_concurrency` fetches are in flight at once. Each subreddit gets
+    its own deadline, counted from the moment its fetch is submitted; a fetch that
+    misses it is reported as an error entry while the others carry on.
+
+    Args:
+        fetch: Function with the signature of get_subreddit_news.
+        subreddits: Subreddit names to fetch, in the order results should appear.
+        limit: Maximum number of posts to fetch per subreddit.
+        max_concurrency: Upper bound on parallel fetches. Defaults to FETCH_CONCURRENCY.
+        timeout: Per-subreddit deadline in seconds. Defaults to FETCH_TIMEOUT.
+
+    Returns:
+        A dictionary with subreddit names as keys and lists of post titles (or an
+        error message) as values, ordered like `subreddits`.
+    """
+    max_concurrency = max(1, max_concurrency or FETCH_CONCURRENCY)
+    timeout = FETCH_TIMEOUT if timeout is None else timeout
+    executor = get_executor()
+
+    results: Dict[str, List[str]] = {}
+    pending = list(dict.fromkeys(subreddits))  # drop duplicates, keep order
+    queue = list(reversed(pending))
+    in_flight: Dict[Future, str] = {}
+    deadlines: Dict[Future, float] = {}
+
+    while queue or in_flight:
+        while queue and len(in_flight) < max_concurrency:
+            subreddit = queue.pop()
+            # Run in a copy of the caller's context so trace spans nest under the call.
+            future = executor.submit(contextvars.copy_context().run, fetch, subreddit, limit)
+            in_flight[future] = subreddit
+            deadlines[future] = time.monotonic() + timeout
+
+        next_deadline = min(deadlines[future] for future in in_flight)
+        done, _ = wait(
+            in_flight,
+            timeout=max(0.0, next_deadline - time.monotonic()),
+            return_when=FIRST_COMPLETED,
+        )
+
+        for future in done:
+            subreddit = in_flight.pop(future)
+            del deadlines[future]
+            try:
+                results.update(future.result())
+            except Exception as e:
+                print(f"--- Tool error: Unexpected error for r/{subreddit}: {e} ---")
+                results[subreddit] = [f"An unexpected error occurred while fetching from r/{subreddit}."]
+
+        now = time.monotonic()
+        for future in [f for f in in_flight if deadlines[f] <= now]:
+            subreddit = in_flight.pop(future)
+            del deadlines[future]
+            # The worker keeps running in the background; its result is discarded.
+            future.cancel()
+            print(f"--- Tool error: Timed out fetching r/{subreddit} after {timeout:g}s ---")
+            results[subreddit] = [f"Error: Timed out fetching r/{subreddit} after {timeout:g} seconds."]
+
+    return {subreddit: results[subreddit] for subreddit in pending if subreddit in results}
@@ -0,0 +1,63 @@
+from typing import List
+
+from agents.common.tracing import span
+
+from .cache import listing_cache
+from .client import get_reddit_client
+from .posts import Post
+from .store import record_posts
+from .trending import trending
+from .validation import SubredditUnavailable, subreddit_validation, unavailable_reason
+
+
+def fetch_hot_posts(subreddit: str, limit: int) -> List[Post]:
+    """
+    Fetches hot posts straight from the Reddit API, bypassing the listing cache.
+
+    The listing request doubles as the existence check: Reddit answers it with a
+    redirect, 403 or 404 for nonexistent, private or banned subreddits. Only an
+    empty listing of a subreddit not yet known to be valid costs a second request.
+    """
+    known_valid = subreddit_validation.check(subreddit)
+    reddit = get_reddit_client()
+    sub = reddit.subreddit(subreddit)
+    try:
+        with span("reddit.hot", "reddit", subreddit=subreddit, limit=limit) as current:
+            posts = [Post.from_submission(submission) for submission in sub.hot(limit=limit)] # Fetch hot posts
+            if current is not None:
+                current.attrs["items"] = len(posts)
+        if not posts and not known_valid:
+            # Check if subreddit exists and is accessible
+            with span("reddit.search_by_name", "reddit", subreddit=subreddit):
+                reddit.subreddits.search_by_name(subreddit, exact=True)
+    except Exception as e:
+        reason = unavailable_reason(e)
+        if reason is None:
+            raise
+        subreddit_validation.mark_invalid(subreddit, reason)
+        raise SubredditUnavailable(subreddit, reason) from e
+    record_hot_posts(subreddit, posts)
+    return posts
+
+
+def record_hot_posts(subreddit: str, posts: List[Post]) -> None:
+    """Marks a subreddit valid and hands its fetched hot posts to the headline store and the trending engine."""
+    subreddit_validation.mark_valid(subreddit)
+    record_posts(subreddit, posts)
+    trending.observe(subreddit, posts)
+
+
+def fetch_subreddit_posts(subreddit: str, limit: int = 5) -> List[Post]:
+    """
+    Returns hot posts of a subreddit with their metadata, using the listing cache.
+
+    Unlike the scout's tools, errors are raised rather than returned as messages.
+
+    Args:
+        subreddit: The name of the subreddit to fetch.
+        limit: The maximum number of posts to return.
+
+    Returns:
+        A list of Post records, hottest first.
+    """
+    return listing_cache.get(subreddit, "hot", limit, fetch_hot_posts)
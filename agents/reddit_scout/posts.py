@@ -0,0 +1,73 @@
+from typing import Any, Dict, Iterable, List
+
+
+class Post:
+    """
+    A fetched Reddit post with the metadata downstream stages rank by.
+
+    Uses `__slots__`, so a post costs a fixed 7 pointers plus its values
+    rather than a per-instance dictionary.
+    """
+
+    __slots__ = ("id", "title", "score", "num_comments", "created_utc", "url", "permalink")
+
+    def __init__(
+        self,
+        id: str,
+        title: str,
+        score: int = 0,
+        num_comments: int = 0,
+        created_utc: float = 0.0,
+        url: str = "",
+        permalink: str = "",
+    ):
+        self.id = id
+        self.title = title
+        self.score = score
+        self.num_comments = num_comments
+        self.created_utc = created_utc
+        self.url = url
+        self.permalink = permalink
+
+    @classmethod
+    def from_submission(cls, submission: Any) -> "Post":
+        """Copies the listing fields of a PRAW submission; no extra request is made."""
+        return cls(
+            submission.id,
+            submission.title,
+            submission.score,
+            submission.num_comments,
+            submission.created_utc,
+            submission.url,
+            submission.permalink,
+        )
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "Post":
+        """Copies the listing fields of a raw "t3" data dictionary from the Reddit API."""
+        return cls(
+            data["id"],
+            data["title"],
+            data.get("score", 0),
+            data.get("num_comments", 0),
+            data.get("created_utc", 0.0),
+            data.get("url", ""),
+            data.get("permalink", ""),
+        )
+
+    def as_tuple(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Post) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self) -> str:
+        return f"Post(id={self.id!r}, title={self.title!r}, score={self.score})"
+
+
+def titles(posts: Iterable[Post]) -> List[str]:
+    """Converts posts to the title-only shape returned by the scout tools."""
+    return [post.title for post in posts]
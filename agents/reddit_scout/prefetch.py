@@ -0,0 +1,193 @@
+import heapq
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from .cache import CACHE_STALE_TTL, CACHE_TTL, listing_cache
+from .fanout import get_executor
+from .ratelimit import BACKGROUND, scheduler
+from .validation import SubredditUnavailable
+
+# Set to 0 to never refresh listings in the background.
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1").lower() not in ("0", "false", "no")
+# Subreddits always kept warm, in addition to the ones users keep asking for.
+PREFETCH_SUBREDDITS = [name.strip() for name in os.getenv("PREFETCH_SUBREDDITS", "worldnews,news,sports").split(",") if name.strip()]
+# Posts fetched per refresh; cached listings answer any smaller request.
+PREFETCH_LIMIT = int(os.getenv("PREFETCH_LIMIT", "25"))
+# Refresh interval bounds. The busiest subreddits are refreshed just before
+# their cache entry expires; idle ones just before their stale copy runs out.
+PREFETCH_MIN_INTERVAL = float(os.getenv("PREFETCH_MIN_INTERVAL", str(max(1.0, CACHE_TTL * 0.8))))
+PREFETCH_MAX_INTERVAL = float(os.getenv("PREFETCH_MAX_INTERVAL", str(max(1.0, (CACHE_TTL + CACHE_STALE_TTL) * 0.8))))
+# Fraction of each interval randomized, so refreshes don't line up.
+PREFETCH_JITTER = float(os.getenv("PREFETCH_JITTER", "0.1"))
+# Half-life in seconds of the request counts that drive the refresh frequency.
+PREFETCH_DEMAND_HALF_LIFE = float(os.getenv("PREFETCH_DEMAND_HALF_LIFE", "900"))
+# Decayed request count at which a subreddit outside the configured set is kept warm.
+PREFETCH_PROMOTE_DEMAND = float(os.getenv("PREFETCH_PROMOTE_DEMAND", "2"))
+PREFETCH_MAX_SUBREDDITS = int(os.getenv("PREFETCH_MAX_SUBREDDITS", "20"))
+
+Loader = Callable[[str, int], list]
+
+
+class _Demand:
+    __slots__ = ("score", "updated")
+
+    def __init__(self):
+        self.score = 0.0
+        self.updated = time.monotonic()
+
+    def value(self, now: float, half_life: float) -> float:
+        return self.score * 0.5 ** ((now - self.updated) / half_life)
+
+    def add(self, now: float, half_life: float) -> None:
+        self.score = self.value(now, half_life) + 1.0
+        self.updated = now
+
+
+class PrefetchDaemon:
+    """
+    Background thread that keeps hot listings of likely subreddits in the cache.
+
+    The configured subreddits are always refreshed; others are added once they
+    are requested often enough and dropped again when interest fades. Each
+    subreddit's refresh interval shrinks from `max_interval` towards
+    `min_interval` as its decayed request count grows, and is jittered.
+    Refreshes run at background priority, so they never delay interactive calls.
+    """
+
+    def __init__(
+        self,
+        loader: Loader,
+        subreddits: Optional[List[str]] = None,
+        limit: int = PREFETCH_LIMIT,
+        min_interval: float = PREFETCH_MIN_INTERVAL,
+        max_interval: float = PREFETCH_MAX_INTERVAL,
+        jitter: float = PREFETCH_JITTER,
+        half_life: float = PREFETCH_DEMAND_HALF_LIFE,
+    ):
+        self.loader = loader
+        self.pinned = {name.lower() for name in (PREFETCH_SUBREDDITS if subreddits is None else subreddits)}
+        self.limit = limit
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.jitter = jitter
+        self.half_life = half_life
+        self._demand: Dict[str, _Demand] = {}
+        self._due: List[tuple] = []
+        self._scheduled: set = set()
+        self._failures: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, int] = {"refreshes": 0, "skipped_fresh": 0, "errors": 0, "promoted": 0, "dropped": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> "PrefetchDaemon":
+        """Starts the daemon thread; the pinned subreddits are refreshed right away."""
+        with self._lock:
+            if self.running:
+                return self
+            self._stopped.clear()
+            now = time.monotonic()
+            for subreddit in sorted(self.pinned):
+                self._schedule(subreddit, now)
+            self._thread = threading.Thread(target=self._run, name="reddit-prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+
+    def record_request(self, subreddit: str) -> None:
+        """Counts an interactive request for a subreddit towards its refresh frequency."""
+        name = subreddit.lower()
+        now = time.monotonic()
+        with self._lock:
+            demand = self._demand.setdefault(name, _Demand())
+            demand.add(now, self.half_life)
+            if name in self._scheduled or name in self.pinned:
+                return
+            if demand.score >= PREFETCH_PROMOTE_DEMAND and len(self._scheduled) < PREFETCH_MAX_SUBREDDITS:
+                self._stats["promoted"] += 1
+                self._schedule(name, now + self.interval(name))
+        self._wake.set()
+
+    def interval(self, subreddit: str) -> float:
+        """Returns the refresh interval for a subreddit given its current demand."""
+        demand = self._demand.get(subreddit)
+        score = demand.value(time.monotonic(), self.half_life) if demand is not None else 0.0
+        return max(self.min_interval, self.max_interval / (1.0 + score))
+
+    def tracked(self) -> List[str]:
+        with self._lock:
+            return sorted(self._scheduled)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["tracked"] = len(self._scheduled)
+        return snapshot
+
+    def _schedule(self, subreddit: str, when: float) -> None:
+        self._scheduled.add(subreddit)
+        heapq.heappush(self._due, (when, subreddit))
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            with self._lock:
+                now = time.monotonic()
+                ready = []
+                while self._due and self._due[0][0] <= now:
+                    ready.append(heapq.heappop(self._due)[1])
+                wait = self._due[0][0] - now if self._due else None
+            for subreddit in ready:
+                get_executor().submit(self._refresh, subreddit)
+            self._wake.wait(wait)
+            self._wake.clear()
+
+    def _refresh(self, subreddit: str) -> None:
+        interval = self.interval(subreddit)
+        try:
+            age = listing_cache.age(subreddit, "hot", self.limit)
+            if age is not None and age < interval / 2:
+                # An interactive call refreshed it recently.
+                with self._lock:
+                    self._stats["skipped_fresh"] += 1
+            else:
+                with scheduler.priority(BACKGROUND):
+                    posts = self.loader(subreddit, self.limit)
+                listing_cache.put(subreddit, "hot", self.limit, posts)
+                with self._lock:
+                    self._stats["refreshes"] += 1
+            self._failures.pop(subreddit, None)
+        except SubredditUnavailable as e:
+            print(f"--- Prefetch warning: {e}; no longer refreshing r/{subreddit} ---")
+            with self._lock:
+                self._stats["errors"] += 1
+                self._scheduled.discard(subreddit)
+            return
+        except Exception as e:
+            failures = self._failures.get(subreddit, 0) + 1
+            self._failures[subreddit] = failures
+            print(f"--- Prefetch warning: Refreshing r/{subreddit} failed ({failures}x): {e} ---")
+            with self._lock:
+                self._stats["errors"] += 1
+            interval = min(self.max_interval, interval * 2 ** failures)
+
+        with self._lock:
+            demand = self._demand.get(subreddit)
+            faded = demand is None or demand.value(time.monotonic(), self.half_life) < 0.1
+            if subreddit not in self.pinned and faded:
+                self._scheduled.discard(subreddit)
+                self._stats["dropped"] += 1
+                return
+            delay = interval * (1.0 + random.uniform(-self.jitter, self.jitter))
+            heapq.heappush(self._due, (time.monotonic() + delay, subreddit))
+        self._wake.set()
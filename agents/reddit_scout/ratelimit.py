@@ -0,0 +1,220 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterator, Mapping, Optional
+
+# Request priorities; lower values are served first.
+INTERACTIVE = 0
+BACKGROUND = 1
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BACKGROUND: "background"}
+
+# Sustained request rate used until Reddit reports its own budget.
+RATE_LIMIT_QPM = float(os.getenv("REDDIT_RATE_LIMIT_QPM", "100"))
+# Requests that may be issued back to back before the rate applies.
+RATE_LIMIT_BURST = float(os.getenv("REDDIT_RATE_LIMIT_BURST", "10"))
+# Requests of the server-reported budget kept in reserve for interactive calls.
+RATE_LIMIT_RESERVE = float(os.getenv("REDDIT_RATE_LIMIT_RESERVE", "5"))
+
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """
+    Reads a Retry-After style header, given in seconds or as an HTTP-date.
+
+    Returns:
+        The seconds to wait (negative for a date in the past), or None if the
+        header is missing or cannot be parsed.
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return (when - datetime.now(timezone.utc)).total_seconds()
+
+class RequestScheduler:
+    """
+    Process-wide token bucket shared by every Reddit API request.
+
+    Callers block in `acquire` until a token is available instead of running
+    into 429 responses. Waiters are served by priority, then in arrival order,
+    so interactive tool calls overtake queued background refreshes. The bucket
+    follows the x-ratelimit-remaining/x-ratelimit-reset headers Reddit sends
+    with every response, spreading the remaining budget over the reset window.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float = RATE_LIMIT_QPM,
+        burst: float = RATE_LIMIT_BURST,
+        reserve: float = RATE_LIMIT_RESERVE,
+    ):
+        self.default_rate = rate_per_minute / 60.0
+        self.burst = max(1.0, burst)
+        self.reserve = reserve
+        self._rate = self.default_rate
+        self._tokens = self.burst
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._reserve_until = 0.0
+        self._waiters: list = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._stats: Dict[str, float] = {
+            "requests": 0,
+            "interactive_requests": 0,
+            "background_requests": 0,
+            "throttled_responses": 0,
+            "queued": 0,
+            "max_queue_depth": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    @contextmanager
+    def priority(self, level: int) -> Iterator[None]:
+        """Runs the enclosed requests of the current thread at the given priority."""
+        previous = getattr(self._local, "priority", INTERACTIVE)
+        self._local.priority = level
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    def current_priority(self) -> int:
+        return getattr(self._local, "priority", INTERACTIVE)
+
+    def acquire(self, priority: Optional[int] = None) -> float:
+        """
+        Blocks until the caller may issue one request.
+
+        Args:
+            priority: INTERACTIVE or BACKGROUND. Defaults to the priority set for
+                the current thread with `priority()`.
+
+        Returns:
+            The number of seconds spent waiting.
+        """
+        if priority is None:
+            priority = self.current_priority()
+        started = time.monotonic()
+        ticket = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiters, ticket)
+            depth = len(self._waiters)
+            if depth > 1:
+                self._stats["queued"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], depth)
+            while True:
+                delay = self._delay_for(ticket)
+                if delay <= 0:
+                    break
+                self._condition.wait(delay)
+            heapq.heappop(self._waiters)
+            self._tokens -= 1
+            waited = time.monotonic() - started
+            self._stats["requests"] += 1
+            self._stats[f"{PRIORITY_NAMES.get(priority, 'background')}_requests"] += 1
+            self._stats["total_wait_seconds"] += waited
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+            # Let the next waiter re-evaluate now that the head has changed.
+            self._condition.notify_all()
+        return waited
+
+    def update(self, headers: Mapping[str, str], status_code: int = 200) -> None:
+        """
+        Adjusts the bucket from the rate-limit headers of a Reddit response.
+
+        Args:
+            headers: The response headers.
+            status_code: The response status; 429 pauses all requests until reset.
+        """
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        with self._condition:
+            self._refill()
+            now = time.monotonic()
+            if status_code == 429:
+                self._stats["throttled_responses"] += 1
+                retry_after = _retry_after_seconds(headers.get("retry-after"))
+                if retry_after is None:
+                    retry_after = _retry_after_seconds(reset)
+                self._tokens = 0.0
+                self._paused_until = max(self._paused_until, now + max(1.0, retry_after or 1.0))
+            elif remaining is not None and reset is not None:
+                remaining_requests = float(remaining)
+                seconds_to_reset = max(1.0, float(reset))
+                if remaining_requests < 1:
+                    self._tokens = 0.0
+                    self._paused_until = max(self._paused_until, now + seconds_to_reset)
+                else:
+                    # Spread what is left of the window evenly over its remaining time.
+                    self._rate = remaining_requests / seconds_to_reset
+                    self._tokens = min(self._tokens, remaining_requests)
+                if remaining_requests <= self.reserve:
+                    self._reserve_until = now + seconds_to_reset
+                else:
+                    self._reserve_until = 0.0
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns scheduler counters.
+
+        Returns:
+            A dictionary with the current queue depth, request counts per
+            priority, throttled responses and total/average/maximum wait times.
+        """
+        with self._condition:
+            snapshot = dict(self._stats)
+            snapshot["queue_depth"] = len(self._waiters)
+            snapshot["tokens"] = round(self._tokens, 3)
+            snapshot["rate_per_second"] = round(self._rate, 3)
+        requests = snapshot["requests"] or 1
+        snapshot["avg_wait_seconds"] = snapshot["total_wait_seconds"] / requests
+        return snapshot
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def _delay_for(self, ticket) -> float:
+        """Seconds until `ticket` may proceed; 0 if it may proceed now."""
+        if self._waiters[0] != ticket:
+            # Wait for the head of the queue to be served; it will notify us.
+            return 1.0
+        now = time.monotonic()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if ticket[0] != INTERACTIVE and now < self._reserve_until:
+            # Background work waits for the next reset rather than spending
+            # the reserve kept for interactive tool calls.
+            return self._reserve_until - now
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / max(self._rate, 1e-6)
+
+
+# Shared by every Reddit request issued from this process.
+scheduler = RequestScheduler()
+
+
+def get_scheduler_stats() -> Dict[str, float]:
+    """Returns the counters of the shared request scheduler."""
+    return scheduler.stats()
@@ -0,0 +1,181 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from agents.common.env import CACHE_DIR
+
+# SQLite file recording every fetched post; set to an empty string to disable.
+HEADLINE_STORE_PATH = os.getenv("HEADLINE_STORE_PATH", os.path.join(CACHE_DIR, "headlines.sqlite3"))
+
+_COLUMNS = ("post_id", "subreddit", "title", "score", "created_utc", "fetched_at")
+
+# Posts are clustered by id (no separate rowid b-tree), and the two secondary
+# indexes are the only other structures a write touches.
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS headlines ("
+    " post_id TEXT PRIMARY KEY, subreddit TEXT NOT NULL, title TEXT NOT NULL,"
+    " score INTEGER, created_utc REAL, fetched_at REAL NOT NULL) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS headlines_subreddit_created ON headlines (subreddit, created_utc)",
+    "CREATE INDEX IF NOT EXISTS headlines_fetched ON headlines (fetched_at)",
+)
+
+# A post seen again is updated in place with its latest title, score and fetch time.
+_UPSERT = (
+    "INSERT INTO headlines (post_id, subreddit, title, score, created_utc, fetched_at)"
+    " VALUES (?, ?, ?, ?, ?, ?)"
+    " ON CONFLICT (post_id) DO UPDATE SET"
+    " title = excluded.title, score = excluded.score, fetched_at = excluded.fetched_at"
+)
+
+
+class HeadlineStore:
+    """
+    Persistent store of fetched posts in a local SQLite file, keyed by post id.
+
+    Posts seen again are updated in place rather than duplicated, so the store
+    grows with the number of distinct posts, not the number of polls.
+    """
+
+    def __init__(self, path: str = HEADLINE_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._stats: Dict[str, int] = {"writes": 0, "rows_written": 0, "queries": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in _SCHEMA:
+                connection.execute(statement)
+            self._connection = connection
+        return self._connection
+
+    def upsert(self, subreddit: str, posts: Iterable[Any], fetched_at: Optional[float] = None) -> int:
+        """
+        Records a batch of posts from one subreddit in a single transaction.
+
+        Args:
+            subreddit: The subreddit the posts were fetched from.
+            posts: Objects with `id`, `title`, `score` and `created_utc`
+                attributes, such as PRAW submissions.
+            fetched_at: The fetch time. Defaults to now.
+
+        Returns:
+            The number of posts written.
+        """
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        subreddit = subreddit.lower()
+        rows = [
+            (post.id, subreddit, post.title, post.score, post.created_utc, fetched_at)
+            for post in posts
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN")
+            try:
+                connection.executemany(_UPSERT, rows)
+                connection.execute("COMMIT")
+            except sqlite3.Error:
+                connection.execute("ROLLBACK")
+                raise
+            self._stats["writes"] += 1
+            self._stats["rows_written"] += len(rows)
+        return len(rows)
+
+    def seen(self, post_ids: Iterable[str]) -> Set[str]:
+        """Returns the given post ids that are already in the store."""
+        post_ids = list(post_ids)
+        found: Set[str] = set()
+        with self._lock:
+            connection = self._connect()
+            # Stay well below SQLite's bound-parameter limit.
+            for start in range(0, len(post_ids), 500):
+                chunk = post_ids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(row[0] for row in connection.execute(
+                    f"SELECT post_id FROM headlines WHERE post_id IN ({placeholders})", chunk
+                ))
+            self._stats["queries"] += 1
+        return found
+
+    def query(
+        self,
+        subreddit: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Returns stored posts created in a time range, newest first.
+
+        Args:
+            subreddit: Only return posts from this subreddit.
+            since: Earliest creation time (Unix seconds), inclusive.
+            until: Latest creation time (Unix seconds), exclusive.
+            limit: Maximum number of posts to return.
+
+        Returns:
+            A list of dictionaries with the stored columns.
+        """
+        clauses, params = [], []
+        if subreddit is not None:
+            clauses.append("subreddit = ?")
+            params.append(subreddit.lower())
+        if since is not None:
+            clauses.append("created_utc >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("created_utc < ?")
+            params.append(until)
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM headlines"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_utc DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+            self._stats["queries"] += 1
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def recent(self, subreddit: str, hours: float, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Returns posts from a subreddit created in the last `hours` hours."""
+        return self.query(subreddit, since=time.time() - hours * 3600, limit=limit)
+
+    def prune(self, older_than: float) -> int:
+        """Deletes posts last fetched before `older_than` (Unix seconds)."""
+        with self._lock:
+            return self._connect().execute("DELETE FROM headlines WHERE fetched_at < ?", (older_than,)).rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM headlines").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+
+# Shared by every fetch in the process, or None when the store is disabled.
+headline_store: Optional[HeadlineStore] = HeadlineStore() if HEADLINE_STORE_PATH else None
+
+
+def record_posts(subreddit: str, posts: Iterable[Any]) -> None:
+    """Writes fetched posts to the shared store; storage errors never fail a fetch."""
+    if headline_store is None:
+        return
+    try:
+        headline_store.upsert(subreddit, posts)
+    except (sqlite3.Error, OSError) as e:
+        # e.g. a read-only or full disk, or a directory that can't be created
+        print(f"--- Tool warning: Could not store posts from r/{subreddit}: {e} ---")
@@ -0,0 +1,222 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, wait
+from typing import Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from .client import get_reddit_client
+from .fanout import FETCH_TIMEOUT, get_executor
+from .posts import Post
+from .ratelimit import BACKGROUND, scheduler
+
+# Seconds between two polls of the /new listings.
+STREAM_POLL_INTERVAL = float(os.getenv("STREAM_POLL_INTERVAL", "30"))
+# Consecutive empty cursor polls after which a subreddit is polled without its
+# cursor, in case the post the cursor points at was deleted.
+STREAM_RESYNC_ROUNDS = int(os.getenv("STREAM_RESYNC_ROUNDS", "10"))
+# Pages fetched per subreddit and round when it is behind by more than a page.
+STREAM_MAX_PAGES = int(os.getenv("STREAM_MAX_PAGES", "3"))
+# Post ids remembered per subreddit to drop repeats across polls.
+STREAM_SEEN_PER_SUBREDDIT = 1000
+
+Batch = Tuple[str, List[Post]]
+
+
+class RedditNewSource:
+    """Reads /new listings from the Reddit API at background priority."""
+
+    def fetch_new(self, subreddit: str, before: Optional[str], limit: int) -> List[Post]:
+        """
+        Returns the newest posts of a subreddit, newest first.
+
+        Args:
+            subreddit: The subreddit name.
+            before: Fullname of a post; only posts newer than it are returned.
+            limit: The page size, at most 100.
+        """
+        reddit = get_reddit_client()
+        if reddit is None:
+            raise RuntimeError("Reddit API credentials not configured.")
+        params = {"before": before} if before else {}
+        with scheduler.priority(BACKGROUND):
+            return [Post.from_submission(s) for s in reddit.subreddit(subreddit).new(limit=limit, params=params)]
+
+
+class ReplaySource:
+    """
+    Replays /new responses recorded by RecordingSource, without any network.
+
+    Each subreddit's recorded responses are returned in order; once they run
+    out the subreddit returns nothing and `exhausted` becomes True.
+    """
+
+    def __init__(self, path: str):
+        self._responses: Dict[str, Deque[List[Post]]] = {}
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    posts = [Post(*row) for row in record["posts"]]
+                    self._responses.setdefault(record["subreddit"].lower(), deque()).append(posts)
+        self._lock = threading.Lock()
+
+    @property
+    def exhausted(self) -> bool:
+        with self._lock:
+            return not any(self._responses.values())
+
+    def fetch_new(self, subreddit: str, before: Optional[str], limit: int) -> List[Post]:
+        with self._lock:
+            responses = self._responses.get(subreddit.lower())
+            return responses.popleft()[:limit] if responses else []
+
+
+class RecordingSource:
+    """Passes calls through to another source and appends every response to a JSONL file."""
+
+    def __init__(self, source, path: str):
+        self.source = source
+        self.path = path
+        self._lock = threading.Lock()
+
+    def fetch_new(self, subreddit: str, before: Optional[str], limit: int) -> List[Post]:
+        posts = self.source.fetch_new(subreddit, before, limit)
+        line = json.dumps({"subreddit": subreddit, "before": before, "posts": [post.as_tuple() for post in posts]})
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+        return posts
+
+
+class _Cursor:
+    __slots__ = ("before", "seen", "order", "empty_rounds")
+
+    def __init__(self):
+        self.before: Optional[str] = None
+        self.seen: Set[str] = set()
+        self.order: Deque[str] = deque()
+        self.empty_rounds = 0
+
+    def remember(self, post_id: str) -> None:
+        self.seen.add(post_id)
+        self.order.append(post_id)
+        if len(self.order) > STREAM_SEEN_PER_SUBREDDIT:
+            self.seen.discard(self.order.popleft())
+
+
+class NewPostPoller:
+    """
+    Cursor-based poller that yields posts as they are submitted.
+
+    Every subreddit keeps the fullname of the newest post it has seen and asks
+    Reddit only for posts newer than that, so posts are neither missed between
+    polls nor downloaded twice. Iterating the poller yields one
+    (subreddit, posts) batch per subreddit and round, oldest post first.
+    """
+
+    def __init__(
+        self,
+        subreddits: List[str],
+        source=None,
+        interval: float = STREAM_POLL_INTERVAL,
+        max_rounds: Optional[int] = None,
+        page_size: int = 100,
+    ):
+        self.subreddits = list(subreddits)
+        self.source = source or RedditNewSource()
+        self.interval = interval
+        self.max_rounds = max_rounds
+        self.page_size = page_size
+        self._cursors: Dict[str, _Cursor] = {subreddit: _Cursor() for subreddit in self.subreddits}
+        # Polls that have not been collected yet; a subreddit's cursor belongs to
+        # its poll until that poll finishes.
+        self._in_flight: Dict[str, Future] = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"rounds": 0, "requests": 0, "new_posts": 0, "repeats": 0, "errors": 0}
+
+    def __iter__(self) -> Iterator[Batch]:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            yield from self.poll_once()
+            if self.max_rounds is not None and self._stats["rounds"] >= self.max_rounds:
+                return
+            if getattr(self.source, "exhausted", False):
+                return
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def poll_once(self) -> List[Batch]:
+        """
+        Polls every subreddit once, concurrently, and returns the non-empty batches.
+
+        A poll that overruns its deadline keeps running. Its subreddit is not
+        polled again until it finishes; its posts are returned by a later round.
+        """
+        executor = get_executor()
+        for subreddit in self.subreddits:
+            if subreddit not in self._in_flight:
+                self._in_flight[subreddit] = executor.submit(self._poll, subreddit)
+        batches = []
+        for subreddit in self.subreddits:
+            future = self._in_flight[subreddit]
+            if not wait([future], timeout=FETCH_TIMEOUT * STREAM_MAX_PAGES).done:
+                print(f"--- Stream warning: Polling r/{subreddit} is still running; skipping it this round ---")
+                self._count("errors")
+                continue
+            del self._in_flight[subreddit]
+            try:
+                posts = future.result()
+            except Exception as e:
+                print(f"--- Stream warning: Polling r/{subreddit} failed: {e} ---")
+                self._count("errors")
+                continue
+            if posts:
+                batches.append((subreddit, posts))
+        self._count("rounds")
+        return batches
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += amount
+
+    def _poll(self, subreddit: str) -> List[Post]:
+        cursor = self._cursors[subreddit]
+        before = cursor.before
+        if cursor.empty_rounds >= STREAM_RESYNC_ROUNDS:
+            before = None
+            cursor.empty_rounds = 0
+
+        cursored = before is not None
+        fresh: List[Post] = []
+        for _ in range(STREAM_MAX_PAGES):
+            page = self.source.fetch_new(subreddit, before, self.page_size)
+            self._count("requests")
+            if not page:
+                break
+            for post in page:
+                if post.id in cursor.seen:
+                    self._count("repeats")
+                    continue
+                cursor.remember(post.id)
+                fresh.append(post)
+            before = cursor.before = f"t3_{page[0].id}"
+            # Without a cursor the first page is the newest one; with a cursor a
+            # full page means more new posts may sit above it.
+            if not cursored or len(page) < self.page_size:
+                break
+
+        if fresh:
+            cursor.empty_rounds = 0
+        elif cursored:
+            cursor.empty_rounds += 1
+        self._count("new_posts", len(fresh))
+        fresh.sort(key=lambda post: post.created_utc)
+        return fresh
@@ -0,0 +1,228 @@
+import heapq
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+# Observations kept per post; velocity is measured across all of them.
+TRENDING_HISTORY = int(os.getenv("TRENDING_HISTORY", "8"))
+# Posts tracked at most; the ones updated least recently are evicted first.
+TRENDING_MAX_POSTS = int(os.getenv("TRENDING_MAX_POSTS", "5000"))
+# Seconds without a new observation after which a post is evicted as cold.
+TRENDING_TTL = float(os.getenv("TRENDING_TTL", "21600"))
+# Seconds ahead the ranking extrapolates each post's velocity with its acceleration,
+# at most as far as its observations reach back.
+TRENDING_HORIZON = float(os.getenv("TRENDING_HORIZON", "900"))
+# Points a comment is worth when measuring engagement.
+TRENDING_COMMENT_WEIGHT = float(os.getenv("TRENDING_COMMENT_WEIGHT", "2"))
+# Hot posts get_trending_news polls per subreddit it is asked about.
+TRENDING_FETCH_LIMIT = int(os.getenv("TRENDING_FETCH_LIMIT", "25"))
+
+# Observations this close together are treated as the same poll.
+_MIN_STEP = 1.0
+
+
+class PostTrend:
+    """
+    A tracked post with a ring buffer of (timestamp, engagement) observations.
+
+    Engagement is the score plus weighted comments. Each update is O(1):
+    velocity is the engagement gained per hour between the oldest and the
+    newest observation in the ring, and acceleration the change in velocity
+    per hour between the last two polls. A post seen only once gets its
+    average since it was posted as velocity.
+    """
+
+    __slots__ = (
+        "id", "subreddit", "title", "permalink", "score", "num_comments", "created_utc", "last_seen",
+        "velocity", "acceleration", "span", "_times", "_values", "_next", "_count", "_step_velocity", "_step",
+    )
+
+    def __init__(self, post: Any, subreddit: str, history: int):
+        self.id = post.id
+        self.subreddit = subreddit
+        self.created_utc = post.created_utc
+        self._times = [0.0] * history
+        self._values = [0.0] * history
+        self._next = 0
+        self._count = 0
+        self._step_velocity: Optional[float] = None
+        self._step = 0.0
+        self.velocity = 0.0
+        self.acceleration = 0.0
+        self.span = 0.0
+
+    def _append(self, timestamp: float, value: float) -> None:
+        self._times[self._next] = timestamp
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._times)
+        self._count = min(self._count + 1, len(self._times))
+
+    def update(self, post: Any, timestamp: float, comment_weight: float) -> None:
+        self.title = post.title
+        self.permalink = post.permalink
+        self.score = post.score
+        self.num_comments = post.num_comments
+        self.last_seen = timestamp
+        value = post.score + comment_weight * post.num_comments
+        if self._count:
+            newest = (self._next - 1) % len(self._times)
+            step = timestamp - self._times[newest]
+            if step < _MIN_STEP:
+                # Seen again within the same poll: refresh the newest observation.
+                self._values[newest] = value
+                return
+            step_velocity = (value - self._values[newest]) / step * 3600
+            if self._step_velocity is not None:
+                # Velocity change between the midpoints of the last two steps.
+                self.acceleration = (step_velocity - self._step_velocity) / ((step + self._step) / 2) * 3600
+            self._step_velocity = step_velocity
+            self._step = step
+        self._append(timestamp, value)
+        if self._count > 1:
+            # The slot after the newest is the oldest once the ring is full.
+            oldest = self._next if self._count == len(self._times) else 0
+            self.span = timestamp - self._times[oldest]
+            self.velocity = (value - self._values[oldest]) / self.span * 3600
+        elif self.created_utc and timestamp - self.created_utc >= _MIN_STEP:
+            self.velocity = value / (timestamp - self.created_utc) * 3600
+
+    def trend(self, horizon: float) -> float:
+        """
+        Engagement per hour expected `horizon` seconds after the last observation.
+
+        The extrapolation reaches no further ahead than the observations reach
+        back, so the acceleration of closely spaced polls, which is mostly
+        noise, can't outweigh the velocity.
+        """
+        return self.velocity + self.acceleration * min(horizon, self.span) / 3600
+
+    def as_dict(self, horizon: float) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "subreddit": self.subreddit,
+            "title": self.title,
+            "permalink": self.permalink,
+            "score": self.score,
+            "num_comments": self.num_comments,
+            "velocity": round(self.velocity, 1),
+            "acceleration": round(self.acceleration, 1),
+            "trend": round(self.trend(horizon), 1),
+            "observations": self._count,
+        }
+
+
+def describe(entry: Dict[str, Any]) -> str:
+    """Renders a top() entry as one line: title, subreddit, score and growth per hour."""
+    growth = f"{entry['trend']:+,.0f}/h"
+    if entry["acceleration"] > 0:
+        growth += ", accelerating"
+    elif entry["acceleration"] < 0:
+        growth += ", slowing"
+    return f"{entry['title']} (r/{entry['subreddit']}, {entry['score']:,} points, {growth})"
+
+
+class TrendingEngine:
+    """
+    Ranks posts by how fast their engagement is growing across successive polls.
+
+    Every fetched listing is observed; each post keeps a fixed-size ring buffer,
+    so memory per post is constant, and the number of posts is bounded by
+    evicting the ones not seen for `ttl` seconds and, beyond `max_posts`, the
+    ones updated least recently. Top-K queries select with a heap over the
+    tracked posts.
+    """
+
+    def __init__(
+        self,
+        history: int = TRENDING_HISTORY,
+        max_posts: int = TRENDING_MAX_POSTS,
+        ttl: float = TRENDING_TTL,
+        horizon: float = TRENDING_HORIZON,
+        comment_weight: float = TRENDING_COMMENT_WEIGHT,
+    ):
+        self.history = max(2, history)
+        self.max_posts = max_posts
+        self.ttl = ttl
+        self.horizon = horizon
+        self.comment_weight = comment_weight
+        # Ordered by last update, least recent first, so eviction pops from the front.
+        self._posts: "OrderedDict[str, PostTrend]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"observations": 0, "evictions": 0}
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def observe(self, subreddit: str, posts: Iterable[Any], timestamp: Optional[float] = None) -> None:
+        """
+        Records one poll of a listing.
+
+        Args:
+            subreddit: The subreddit the listing came from.
+            posts: Post records or PRAW submissions, with id, title, score,
+                num_comments, created_utc and permalink.
+            timestamp: When the listing was fetched. Defaults to now.
+        """
+        now = time.time() if timestamp is None else timestamp
+        name = subreddit.lower()
+        with self._lock:
+            for post in posts:
+                trend = self._posts.get(post.id)
+                if trend is None:
+                    trend = PostTrend(post, name, self.history)
+                    self._posts[post.id] = trend
+                else:
+                    self._posts.move_to_end(post.id)
+                trend.update(post, now, self.comment_weight)
+                self._stats["observations"] += 1
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        while self._posts:
+            oldest = next(iter(self._posts.values()))
+            if len(self._posts) <= self.max_posts and now - oldest.last_seen < self.ttl:
+                break
+            self._posts.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def top(self, k: int = 10, subreddits: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Returns the k posts trending fastest, across all tracked subreddits or the given ones.
+
+        Args:
+            k: Number of posts to return.
+            subreddits: Optional subreddit names to restrict the ranking to.
+
+        Returns:
+            Snapshots of the posts as dictionaries, fastest first, with their
+            velocity and acceleration in engagement per hour (and per hour²)
+            and the extrapolated trend they are ranked by.
+        """
+        names = {name.lower() for name in subreddits} if subreddits else None
+        with self._lock:
+            candidates = self._posts.values() if names is None else (
+                trend for trend in self._posts.values() if trend.subreddit in names
+            )
+            best = heapq.nlargest(k, candidates, key=lambda trend: trend.trend(self.horizon))
+            return [trend.as_dict(self.horizon) for trend in best]
+
+    def subreddits(self) -> List[str]:
+        """Returns the subreddits with tracked posts."""
+        with self._lock:
+            return sorted({trend.subreddit for trend in self._posts.values()})
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["tracked"] = len(self._posts)
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._posts.clear()
+
+
+# Observes every listing the scout fetches, including background refreshes.
+trending = TrendingEngine()
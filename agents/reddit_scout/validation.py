@@ -0,0 +1,125 @@
+import os
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# Seconds a subreddit that served a listing is trusted without re-validation.
+VALID_TTL = float(os.getenv("REDDIT_VALID_TTL", "86400"))
+# Seconds a banned, private or nonexistent subreddit is remembered as unavailable.
+INVALID_TTL = float(os.getenv("REDDIT_INVALID_TTL", "600"))
+
+
+class SubredditUnavailable(Exception):
+    """
+    Raised when a subreddit is known to be private, banned or nonexistent.
+
+    It does not derive from PRAW's exceptions so that PRAW is only imported
+    once a client is created; is_reddit_error() treats it as one of them.
+    """
+
+    def __init__(self, subreddit: str, reason: str):
+        super().__init__(f"r/{subreddit} is {reason}")
+        self.subreddit = subreddit
+        self.reason = reason
+
+
+def unavailable_reason(error: Exception) -> Optional[str]:
+    """
+    Maps an API error from a listing request to a subreddit availability reason.
+
+    Args:
+        error: The exception raised while fetching a listing.
+
+    Returns:
+        A short reason if the error means the subreddit cannot be read, else None.
+    """
+    if "prawcore" not in sys.modules:
+        # Without a client no request was made, so this is no API error.
+        return None
+    from prawcore.exceptions import Forbidden, NotFound, Redirect
+
+    if isinstance(error, Redirect):
+        # Reddit redirects listings of unknown subreddits to the search page.
+        return "nonexistent"
+    if isinstance(error, NotFound):
+        return "banned or nonexistent"
+    if isinstance(error, Forbidden):
+        return "private, quarantined or banned"
+    return None
+
+
+def is_reddit_error(error: Exception) -> bool:
+    """
+    Returns True for errors raised by PRAW and for SubredditUnavailable.
+
+    Args:
+        error: The exception raised while fetching from Reddit.
+    """
+    if isinstance(error, SubredditUnavailable):
+        return True
+    praw_exceptions = sys.modules.get("praw.exceptions")
+    return praw_exceptions is not None and isinstance(error, praw_exceptions.PRAWException)
+
+
+class SubredditValidationCache:
+    """
+    Remembers which subreddits are readable so listings can be fetched directly.
+
+    Positive results are kept for `valid_ttl` seconds and negative results,
+    which are more likely to change, for `invalid_ttl` seconds.
+    """
+
+    def __init__(self, valid_ttl: float = VALID_TTL, invalid_ttl: float = INVALID_TTL):
+        self.valid_ttl = valid_ttl
+        self.invalid_ttl = invalid_ttl
+        # subreddit -> (expires_at, reason); reason is None for valid subreddits.
+        self._entries: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"valid_hits": 0, "invalid_hits": 0, "unknown": 0}
+
+    def check(self, subreddit: str) -> bool:
+        """
+        Looks up a subreddit's cached availability.
+
+        Args:
+            subreddit: The subreddit name.
+
+        Returns:
+            True if the subreddit is known to be readable, False if unknown.
+
+        Raises:
+            SubredditUnavailable: If the subreddit is cached as unavailable.
+        """
+        key = subreddit.lower()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._stats["unknown"] += 1
+                return False
+            reason = entry[1]
+            self._stats["valid_hits" if reason is None else "invalid_hits"] += 1
+        if reason is not None:
+            raise SubredditUnavailable(subreddit, reason)
+        return True
+
+    def mark_valid(self, subreddit: str) -> None:
+        with self._lock:
+            self._entries[subreddit.lower()] = (time.time() + self.valid_ttl, None)
+
+    def mark_invalid(self, subreddit: str, reason: str) -> None:
+        with self._lock:
+            self._entries[subreddit.lower()] = (time.time() + self.invalid_ttl, reason)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["entries"] = len(self._entries)
+        return snapshot
+
+
+# Shared by every scout tool call in the process.
+subreddit_validation = SubredditValidationCache()
@@ -6,7 +6,9 @@ from google.adk.agents import Agent
 from google.adk.tools import agent_tool
 
 # Add the parent directory to sys.path to allow importing from sibling packages
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
 
 # Import all the specialized agents
 from agents.reddit_scout.agent import agent as reddit_scout_agent
@@ -16,9 +18,7 @@ from agents.analysis.politics_agent import agent as politics_analysis_agent
 from agents.analysis.technology_agent import agent as technology_analysis_agent
 from agents.analysis.business_agent import agent as business_analysis_agent
 from agents.analysis.finance_agent import agent as finance_analysis_agent
-
-from dotenv import load_dotenv
-load_dotenv()
+from agents.common.tracing import instrument_agents
 
 # Define the Router Agent
 agent = Agent(
@@ -60,4 +60,7 @@ agent = Agent(
         agent_tool.AgentTool(agent=business_analysis_agent),
         agent_tool.AgentTool(agent=finance_analysis_agent)
     ],
-) 
\ No newline at end of file
+) 
+
+# Spans for every agent hop and model call; the callbacks do nothing unless tracing is on.
+instrument_agents(agent)
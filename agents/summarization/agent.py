@@ -1,14 +1,37 @@
 import os
 import sys
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 
 # Add the parent directory to sys.path to allow importing from sibling packages
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
 
 from google.adk.agents import Agent
-from dotenv import load_dotenv
-load_dotenv()
 
+from agents.common.response_cache import cache_after_model, cache_before_model, cache_model_error
+from agents.common.tracing import traced
+
+from agents.common.dedup import annotate_sources, dedupe_news
+
+@traced()
+def dedupe_content(content: Dict[str, List[str]]) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    """
+    Collapses the same story carried by several sources so it is only summarized once.
+
+    Args:
+        content: A dictionary where keys are sources (e.g., subreddit names) and
+                values are lists of headlines.
+
+    Returns:
+        The deduplicated content with headlines unchanged, and a dictionary
+        mapping each merged headline to its other sources.
+    """
+    content, also_in, stats = dedupe_news(content)
+    print(f"--- Tool result: {stats['input_headlines']} -> {stats['output_headlines']} headlines after dedup ({stats['reduction_ratio']:.0%} reduction) ---")
+    return content, also_in
+
+@traced()
 def summarize_content(content: Dict[str, List[str]]) -> Dict[str, List[str]]:
     """
     Summarizes a dictionary of content where keys are sources and values are lists of headlines.
@@ -22,9 +45,11 @@ def summarize_content(content: Dict[str, List[str]]) -> Dict[str, List[str]]:
     """
     print(f"--- Tool called: Summarizing content from {len(content)} sources ---")
     
+    content, also_in = dedupe_content(content)
+    
     # The actual summarization will be handled by the LLM through the agent's reasoning
     # This function is just a passthrough to make the dictionary available to the agent
-    return content
+    return annotate_sources(content, also_in)
 
 # Define the Agent
 agent = Agent(
@@ -43,6 +68,7 @@ agent = Agent(
         "   - Arrange summaries by source, clearly indicating which source each summary is for"
         "3. **Focus on Facts**:"
         "   - Stick to information presented in the headlines"
+        "   - A headline marked 'also in:' was reported by several sources; mention it once"
         "   - Do not add speculation or opinion"
         "   - If headlines contain contradictory information, note this in your summary"
         "4. **Be Concise**:"
@@ -51,4 +77,7 @@ agent = Agent(
         "   - Use straightforward language accessible to general audiences"
     ),
     tools=[summarize_content],
+    before_model_callback=cache_before_model,
+    after_model_callback=cache_after_model,
+    on_model_error_callback=cache_model_error,
 ) 
\ No newline at end of file
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Fraction of new headlines above which a source is summarized from scratch.
+ROLLING_SUMMARY_MAX_CHURN = float(os.getenv("ROLLING_SUMMARY_MAX_CHURN", "0.5"))
+# Optional JSON file that keeps rolling summaries across restarts.
+ROLLING_SUMMARY_PATH = os.getenv("ROLLING_SUMMARY_PATH")
+
+FULL = "full"
+INCREMENTAL = "incremental"
+UNCHANGED = "unchanged"
+
+
+def headline_id(headline: str) -> str:
+    """
+    Returns a stable id for a headline.
+
+    The scout tools pass titles rather than post ids between agents, so a
+    headline is identified by a hash of its normalized text.
+    """
+    normalized = " ".join(headline.lower().split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class SummaryPlan:
+    """What has to be sent to the summarization agent for one source."""
+
+    def __init__(self, mode: str, headlines: List[str], previous_summary: Optional[str] = None, dropped: int = 0):
+        self.mode = mode
+        self.headlines = headlines
+        self.previous_summary = previous_summary
+        self.dropped = dropped
+
+
+class RollingSummaries:
+    """
+    Per-source summary state that lets frequent polls summarize only the delta.
+
+    For each source it remembers the ids of the headlines its current summary
+    covers. A poll with a few new headlines is summarized incrementally from
+    the previous summary; one with many new headlines is summarized in full.
+    """
+
+    def __init__(self, max_churn: float = ROLLING_SUMMARY_MAX_CHURN, path: Optional[str] = ROLLING_SUMMARY_PATH):
+        self.max_churn = max_churn
+        self.path = path
+        self._lock = threading.Lock()
+        self._states: Dict[str, Dict] = self._load()
+        self._stats: Dict[str, int] = {FULL: 0, INCREMENTAL: 0, UNCHANGED: 0}
+
+    def plan(self, source: str, headlines: List[str]) -> SummaryPlan:
+        """
+        Decides how a source's current headlines should be summarized.
+
+        Args:
+            source: The source name, e.g. a subreddit.
+            headlines: The source's current headlines.
+
+        Returns:
+            A SummaryPlan. In INCREMENTAL mode `headlines` holds only the new
+            headlines; in UNCHANGED mode the previous summary can be reused as is.
+        """
+        with self._lock:
+            state = self._states.get(source)
+        ids = [headline_id(headline) for headline in headlines]
+        if state is None or not headlines:
+            mode = FULL
+            plan = SummaryPlan(FULL, headlines)
+        else:
+            covered = set(state["covered"])
+            new = [headline for headline, id_ in zip(headlines, ids) if id_ not in covered]
+            dropped = len(covered - set(ids))
+            if not new:
+                mode = UNCHANGED
+                plan = SummaryPlan(UNCHANGED, [], state["summary"], dropped)
+            elif len(new) / len(headlines) > self.max_churn:
+                mode = FULL
+                plan = SummaryPlan(FULL, headlines)
+            else:
+                mode = INCREMENTAL
+                plan = SummaryPlan(INCREMENTAL, new, state["summary"], dropped)
+        with self._lock:
+            self._stats[mode] += 1
+        return plan
+
+    def previous_summary(self, source: str) -> Optional[str]:
+        """Returns the last committed summary of a source, or None."""
+        with self._lock:
+            state = self._states.get(source)
+        return state["summary"] if state else None
+
+    def commit(self, source: str, headlines: List[str], summary: str) -> None:
+        """Records that `summary` now covers all of the source's `headlines`."""
+        with self._lock:
+            self._states[source] = {
+                "covered": [headline_id(headline) for headline in headlines],
+                "summary": summary,
+                "updated_at": time.time(),
+            }
+            self._save()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+            self._save()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._states, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"--- Summary warning: Could not save rolling summaries to {self.path}: {e} ---")
+
+
+def build_prompt(source: str, plan: SummaryPlan, payload: Optional[str] = None) -> str:
+    """
+    Builds the summarization request for one source from its plan.
+
+    Args:
+        source: The subreddit name.
+        plan: The plan returned by RollingSummaries.plan().
+        payload: The plan's headlines, already encoded (e.g. packed); by
+            default they are sent as a JSON list.
+    """
+    if payload is None:
+        payload = json.dumps(plan.headlines, ensure_ascii=False)
+    if plan.mode == INCREMENTAL:
+        prompt = (
+            f"Here is the current summary of r/{source}:\n{plan.previous_summary}\n\n"
+            "Update it with these headlines, which are new since that summary was written:\n"
+            + payload
+        )
+        if plan.dropped:
+            prompt += f"\n{plan.dropped} earlier headline(s) are no longer on the front page; drop them if they no longer matter."
+        return prompt + "\nKeep the updated summary to 2-3 sentences. Do not call any tools; answer directly."
+    return (
+        f"Summarize the following news headlines from r/{source}. They are already fetched and "
+        "deduplicated, so do not call any tools; answer directly in 2-3 sentences.\n"
+        + payload
+    )
+
+
+# Shared by every summary workflow run in the process.
+rolling_summaries = RollingSummaries()
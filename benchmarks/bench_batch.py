@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Measures how batch mode throughput scales with the number of concurrent sessions.
+
+    python -m benchmarks.bench_batch
+    python -m benchmarks.bench_batch --queries 128 --levels 1,4,16,64 --path pipeline
+
+A mixed set of summary, categorization and analysis queries is answered with
+run_batch() at every concurrency level, against the fake Reddit API and the
+stub model. The listing cache is cleared before each level, so every level
+fetches the same listings. Reports throughput, the speedup over the first
+level and the scaling efficiency (speedup divided by the concurrency ratio),
+together with per-query p50/p95 latency.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_suite import percentile
+from benchmarks.fake_reddit import start_fake_reddit
+
+SUBREDDITS = ["worldnews", "news", "sports", "politics", "technology", "business", "science", "economics"]
+TEMPLATES = [
+    "Get news from r/{0} and r/{1} and summarize it",
+    "Get news from r/{0} and r/{1} and categorize it by topic",
+    "Get political news from r/{0} and r/{1} and provide in-depth analysis",
+    "Get tech news from r/{0} and provide in-depth analysis",
+]
+
+
+def build_queries(count: int) -> List[str]:
+    """Returns `count` queries cycling through the templates and subreddit pairs."""
+    queries = []
+    for i in range(count):
+        first = SUBREDDITS[i % len(SUBREDDITS)]
+        second = SUBREDDITS[(i * 3 + 1) % len(SUBREDDITS)]
+        queries.append(TEMPLATES[i % len(TEMPLATES)].format(first, second))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=64, help="queries per concurrency level")
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="comma-separated concurrency levels")
+    parser.add_argument("--path", choices=["router", "pipeline"], default="router", help="answer through the router LLM or the coded workflows")
+    parser.add_argument("--reddit-latency", type=float, default=0.02, help="seconds the fake Reddit API adds per request")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="seconds per stub model call")
+    parser.add_argument("--output", help="write the JSON results to this file as well")
+    parser.add_argument("--verbose", action="store_true", help="show the tools' own log output")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.levels.split(",")]
+
+    server = start_fake_reddit(posts_per_subreddit=50, ratelimit_budget=1_000_000, latency=args.reddit_latency)
+    scratch = tempfile.mkdtemp(prefix="reddit-bench-")
+    os.environ.update({
+        "REDDIT_CLIENT_ID": "bench",
+        "REDDIT_CLIENT_SECRET": "bench",
+        "REDDIT_USER_AGENT": "reddit-news-aggregator benchmark",
+        "REDDIT_OAUTH_URL": server.url,
+        "REDDIT_URL": server.url,
+        "REDDIT_RATE_LIMIT_QPM": "1000000",
+        "REDDIT_RATE_LIMIT_BURST": "1000",
+        "REDDIT_POOL_MAXSIZE": str(max(levels)),
+        "AGENT_TOOL_THREADS": str(max(levels)),
+        "PREFETCH_ENABLED": "0",
+        "RESPONSE_CACHE_BYPASS": "1",
+        "HEADLINE_STORE_PATH": os.path.join(scratch, "headlines.sqlite3"),
+        "RESPONSE_CACHE_PATH": os.path.join(scratch, "responses.sqlite3"),
+    })
+
+    # Imported after the environment is set up, since the modules read it at import time.
+    from agents.pipeline import read_queries, run_batch
+    from agents.reddit_scout.cache import listing_cache
+    from agents.router.agent import agent as router_agent
+    from agents.summarization.rolling import rolling_summaries
+    from benchmarks.stub_model import install_stub_model
+
+    install_stub_model(router_agent, latency=args.model_latency)
+    queries = read_queries(json.dumps(query) for query in build_queries(args.queries))
+    use_pipeline = args.path == "pipeline"
+
+    results: Dict[str, Any] = {}
+    baseline = None
+    log = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with log:
+        asyncio.run(run_batch(queries[:4], io.StringIO(), concurrency=4, use_pipeline=use_pipeline))  # warm-up
+        for level in levels:
+            listing_cache.clear()
+            rolling_summaries.clear()
+            out = io.StringIO()
+            summary = asyncio.run(run_batch(queries, out, concurrency=level, use_pipeline=use_pipeline))
+            latencies = sorted(json.loads(line)["total_seconds"] for line in out.getvalue().splitlines())
+            if baseline is None:
+                baseline = (levels[0], summary["throughput_per_s"])
+            speedup = summary["throughput_per_s"] / baseline[1] if baseline[1] else 0.0
+            results[str(level)] = {
+                "throughput_per_s": summary["throughput_per_s"],
+                "seconds": summary["seconds"],
+                "errors": summary["errors"],
+                "speedup": round(speedup, 2),
+                "efficiency": round(speedup * baseline[0] / level, 2),
+                "p50_ms": round(1000 * percentile(latencies, 50), 1),
+                "p95_ms": round(1000 * percentile(latencies, 95), 1),
+            }
+
+    output = {"meta": {"args": vars(args), "fake_reddit": dict(server.counts)}, "results": results}
+    server.stop()
+    text = json.dumps(output, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Measures cold-start import times of the package entry points.
+
+    python -m benchmarks.bench_import
+    git worktree add /tmp/before HEAD~1
+    python -m benchmarks.bench_import --repo /tmp/before --output before.json
+
+Every scenario runs in a fresh interpreter, --repeat times, and reports the
+median and minimum wall time above that of an empty interpreter, together
+with whether ADK and PRAW ended up imported. --repo measures another checkout,
+e.g. an older commit, so before/after numbers come from the same machine.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Reports which heavy dependencies a scenario loaded.
+_PROBE = "import sys; print(sorted(m for m in ('google.adk', 'google.genai', 'praw') if m in sys.modules))"
+
+SCENARIOS = [
+    ("import agents", ["-c", "import agents; " + _PROBE]),
+    ("import agents.common.tracing", ["-c", "import agents.common.tracing; " + _PROBE]),
+    ("agents.reddit_scout_agent", ["-c", "import agents; agents.reddit_scout_agent; " + _PROBE]),
+    ("agents.router_agent", ["-c", "import agents; agents.router_agent; " + _PROBE]),
+    ("import agent (root)", ["-c", "import agent; " + _PROBE]),
+    ("run.py --help", ["run.py", "--help"]),
+]
+
+
+def run_once(args: List[str], repo: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, *args], cwd=repo, capture_output=True, text=True,
+        env={**os.environ, "PREFETCH_ENABLED": "0", "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    elapsed = time.perf_counter() - started
+    lines = completed.stdout.strip().splitlines()
+    return {
+        "seconds": elapsed,
+        "ok": completed.returncode == 0,
+        "loaded": lines[-1] if completed.returncode == 0 and lines and lines[-1].startswith("[") else None,
+        "error": completed.stderr.strip().splitlines()[-1] if completed.returncode != 0 and completed.stderr.strip() else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repo", default=ROOT, help="checkout to measure (default: this one)")
+    parser.add_argument("--repeat", type=int, default=7, help="fresh interpreters per scenario")
+    parser.add_argument("--output", help="write the JSON results to this file as well")
+    args = parser.parse_args()
+
+    # Compiles every module first, so the first scenario isn't charged for it.
+    subprocess.run([sys.executable, "-m", "compileall", "-q", "agents", "agent.py", "run.py"], cwd=args.repo, capture_output=True)
+    baseline = min(run_once(["-c", "pass"], args.repo)["seconds"] for _ in range(args.repeat))
+
+    results: Dict[str, Any] = {}
+    for name, scenario in SCENARIOS:
+        runs = [run_once(scenario, args.repo) for _ in range(args.repeat)]
+        times = [run["seconds"] - baseline for run in runs if run["ok"]]
+        results[name] = {
+            "median_ms": round(1000 * statistics.median(times), 1) if times else None,
+            "min_ms": round(1000 * min(times), 1) if times else None,
+            "failures": len(runs) - len(times),
+            "loaded": runs[-1]["loaded"],
+        }
+        if not times:
+            results[name]["error"] = runs[-1]["error"]
+
+    output = {"repo": os.path.abspath(args.repo), "interpreter_ms": round(1000 * baseline, 1), "results": results}
+    text = json.dumps(output, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Compares the memory held by Post records against plain dictionaries.
+
+    python -m benchmarks.bench_posts --count 1000000
+
+Each representation is built twice: once from field values shared by both
+(the per-record overhead) and once with freshly created strings per post
+(the total cost of holding a listing in memory).
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.reddit_scout.posts import Post
+
+FIELDS = Post.__slots__
+
+
+def make_row(i: int) -> tuple:
+    return (
+        f"t3{i:07x}",
+        f"Headline number {i} about something that happened somewhere today",
+        i % 50000,
+        i % 3000,
+        1700000000.0 + i,
+        f"https://example.com/articles/{i}",
+        f"/r/news/comments/t3{i:07x}/headline_number_{i}/",
+    )
+
+
+def measure(build) -> dict:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    records = build()
+    seconds = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(records)
+    del records
+    gc.collect()
+    return {"bytes": current, "bytes_per_post": round(current / count, 1), "build_seconds": round(seconds, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=1_000_000, help="posts to build per representation")
+    args = parser.parse_args()
+
+    rows = [make_row(i) for i in range(args.count)]
+    results = {
+        "count": args.count,
+        "overhead": {
+            "dict": measure(lambda: [dict(zip(FIELDS, row)) for row in rows]),
+            "post": measure(lambda: [Post(*row) for row in rows]),
+        },
+    }
+    del rows
+    results["total"] = {
+        "dict": measure(lambda: [dict(zip(FIELDS, make_row(i))) for i in range(args.count)]),
+        "post": measure(lambda: [Post(*make_row(i)) for i in range(args.count)]),
+    }
+    for scope in ("overhead", "total"):
+        results[scope]["post_vs_dict"] = round(results[scope]["post"]["bytes"] / results[scope]["dict"]["bytes"], 3)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
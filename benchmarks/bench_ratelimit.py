@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""
+Drives concurrent scout fetches against the fake Reddit API with a tight
+rate-limit budget and reports how the shared request scheduler coped.
+
+    python -m benchmarks.bench_ratelimit --budget 40 --window 10 --fetches 60
+
+A healthy run shows zero throttled responses from the server, background
+fetches waiting longer than interactive ones, and the queue draining to zero.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_reddit import start_fake_reddit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=int, default=40, help="requests allowed per window by the fake server")
+    parser.add_argument("--window", type=float, default=10.0, help="rate-limit window in seconds")
+    parser.add_argument("--fetches", type=int, default=60, help="subreddit fetches to issue")
+    parser.add_argument("--workers", type=int, default=16, help="concurrent callers")
+    args = parser.parse_args()
+
+    server = start_fake_reddit(ratelimit_budget=args.budget, ratelimit_window=args.window)
+    os.environ.update({
+        "REDDIT_CLIENT_ID": "bench",
+        "REDDIT_CLIENT_SECRET": "bench",
+        "REDDIT_USER_AGENT": "reddit-news-aggregator benchmark",
+        "REDDIT_OAUTH_URL": server.url,
+        "REDDIT_URL": server.url,
+        # Every fetch should reach the server.
+        "REDDIT_CACHE_TTL": "0",
+        "PREFETCH_ENABLED": "0",
+        "REDDIT_CACHE_STALE_TTL": "0",
+    })
+
+    from agents.reddit_scout.agent import get_subreddit_news
+    from agents.reddit_scout.ratelimit import BACKGROUND, INTERACTIVE, scheduler
+
+    waits = {INTERACTIVE: [], BACKGROUND: []}
+
+    def fetch(i: int):
+        level = BACKGROUND if i % 2 else INTERACTIVE
+        started = time.perf_counter()
+        with scheduler.priority(level):
+            result = get_subreddit_news(f"bench{i}", 5)
+        waits[level].append(time.perf_counter() - started)
+        return result
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        results = list(pool.map(fetch, range(args.fetches)))
+    elapsed = time.perf_counter() - started
+    server.stop()
+
+    errors = sum(1 for result in results for titles in result.values() if titles[0].startswith(("Error", "An unexpected")))
+    report = {
+        "fetches": args.fetches,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "server": server.counts,
+        "scheduler": scheduler.stats(),
+        "mean_latency_seconds": {
+            "interactive": round(sum(waits[INTERACTIVE]) / max(1, len(waits[INTERACTIVE])), 3),
+            "background": round(sum(waits[BACKGROUND]) / max(1, len(waits[BACKGROUND])), 3),
+        },
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if errors == 0 and server.counts["throttled"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
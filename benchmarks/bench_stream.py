@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+Streams new posts through the ingestion pipeline (poll -> dedup -> classify ->
+store) and reports throughput, stage counters and the deepest each queue got.
+
+Against the fake Reddit API, with posts submitted continuously:
+
+    python -m benchmarks.bench_stream --rounds 20 --new-per-minute 600
+
+Record the responses and replay them later without any network:
+
+    python -m benchmarks.bench_stream --rounds 5 --record stream.jsonl
+    python -m benchmarks.bench_stream --replay stream.jsonl
+
+`--store-delay` slows the last stage to show backpressure: the queue depths
+stay at or below `--queue-size` and the poller simply falls behind.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_reddit import start_fake_reddit
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subreddits", default="worldnews,news,sports,technology,politics")
+    parser.add_argument("--rounds", type=int, default=10, help="poll rounds against the fake server")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between poll rounds")
+    parser.add_argument("--new-per-minute", type=float, default=600.0, help="posts submitted per subreddit per minute")
+    parser.add_argument("--queue-size", type=int, default=4, help="batches buffered between stages")
+    parser.add_argument("--store-delay", type=float, default=0.0, help="extra seconds spent storing each batch")
+    parser.add_argument("--record", help="append every /new response to this JSONL file")
+    parser.add_argument("--replay", help="replay responses from this JSONL file instead of polling")
+    args = parser.parse_args()
+
+    server = None
+    os.environ.setdefault("HEADLINE_STORE_PATH", os.path.join(tempfile.mkdtemp(), "headlines.sqlite3"))
+    if not args.replay:
+        server = start_fake_reddit(new_posts_per_minute=args.new_per_minute, ratelimit_budget=100_000)
+        os.environ.update({
+            "REDDIT_CLIENT_ID": "bench",
+            "REDDIT_CLIENT_SECRET": "bench",
+            "REDDIT_USER_AGENT": "reddit-news-aggregator benchmark",
+            "REDDIT_OAUTH_URL": server.url,
+            "REDDIT_URL": server.url,
+        })
+
+    # Imported after the environment is set up, since the modules read it at import time.
+    from agents.pipeline.ingest import Ingestion
+    from agents.reddit_scout.stream import RecordingSource, RedditNewSource, ReplaySource
+
+    if args.replay:
+        source = ReplaySource(args.replay)
+        rounds = None
+    else:
+        source = RedditNewSource()
+        rounds = args.rounds
+        if args.record:
+            source = RecordingSource(source, args.record)
+
+    ingestion = Ingestion(
+        args.subreddits.split(","),
+        source=source,
+        interval=0.0 if args.replay else args.interval,
+        max_rounds=rounds,
+        queue_size=args.queue_size,
+    )
+    if args.store_delay:
+        store = ingestion.store
+
+        def slow_store(batches):
+            for items in store(batches):
+                time.sleep(args.store_delay)
+                yield items
+
+        slow_store.__name__ = "store"
+        ingestion.store = slow_store
+
+    started = time.perf_counter()
+    posts = 0
+    categories = {}
+    for items in ingestion:
+        posts += len(items)
+        for item in items:
+            categories[item.category] = categories.get(item.category, 0) + 1
+    seconds = time.perf_counter() - started
+
+    result = {
+        "mode": "replay" if args.replay else "fake_reddit",
+        "seconds": round(seconds, 3),
+        "posts": posts,
+        "posts_per_second": round(posts / seconds, 1) if seconds else 0.0,
+        "categories": categories,
+        **ingestion.stats(),
+    }
+    if server is not None:
+        result["server"] = dict(server.counts)
+        server.stop()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
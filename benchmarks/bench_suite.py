@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+"""
+Offline benchmark suite for the scout tools, the passthrough tools and the
+end-to-end workflows, run against the fake Reddit API and a stub model.
+
+    python -m benchmarks.bench_suite --output results.json
+    python -m benchmarks.bench_suite --compare results.json --only e2e
+    python -m benchmarks.bench_suite --record-cassette reddit.jsonl.gz
+    python -m benchmarks.bench_suite --cassette reddit.jsonl.gz --only scout
+
+Every scenario reports throughput and p50/p95/p99 latency. Results are written
+as JSON together with the commit they were measured on; --compare prints the
+ratio to an earlier result file and exits with status 1 if any p95 grew by
+more than --max-regression. With --cassette, Reddit responses are replayed
+from a cassette recorded earlier (against the fake API or the real one)
+instead of being served by the fake API. Before measuring anything, the suite
+checks that the requests in ROUTING_CASES take the expected path.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_reddit import generate_posts, start_fake_reddit
+
+QUERIES = {
+    "summary": "Get news from r/worldnews, r/news and r/sports and summarize it",
+    "categories": "Get news from r/worldnews, r/news and r/sports and categorize it by topic",
+    "analysis": "Get political news from r/worldnews and r/politics and provide in-depth analysis",
+}
+
+# Requests and the workflow match_workflow() must pick for them; None means the router.
+ROUTING_CASES = {
+    **{query: workflow for workflow, query in QUERIES.items()},
+    "Get news from r/worldnews and r/news": "summary",
+    "Summarize r/technology": "summary",
+    "Give me a brief of r/worldnews": "summary",
+    "What are today's headlines?": "summary",
+    "Classify the posts in r/news by topic": "categories",
+    "Who moderates r/news?": None,
+    "Show me r/askscience": None,
+    "Which subreddits cover space news?": None,
+    "Show the last 6 hours of r/news": None,
+    "Get the stored headlines from r/worldnews": None,
+    "Summarize r/technology news from the past week": None,
+    "What did r/worldnews post yesterday?": None,
+    "What are people saying in r/worldnews?": None,
+    "Show the top comments on the r/news headlines": None,
+    "How is r/technology reacting to the news?": None,
+    "What's trending in r/news?": None,
+    "Which r/worldnews posts are rising fastest?": None,
+    "Show trending news from r/technology and r/science": None,
+    "Rank r/news headlines by score velocity": None,
+}
+
+
+def checked(result: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Raises if a scout tool reported a failure, which it returns as a message."""
+    for headlines in result.values():
+        if headlines and headlines[0].startswith(("Error", "An unexpected error")):
+            raise RuntimeError(headlines[0])
+    return result
+
+
+def check_routing(match_workflow: Callable[[str], Optional[Dict[str, Any]]]) -> None:
+    """Raises if a request in ROUTING_CASES doesn't get the workflow it expects."""
+    wrong = []
+    for query, expected in ROUTING_CASES.items():
+        context = match_workflow(query)
+        workflow = context["workflow"] if context else None
+        if workflow != expected:
+            wrong.append(f"{query!r} -> {workflow}, expected {expected}")
+    if wrong:
+        raise AssertionError("Misrouted requests:\n" + "\n".join(wrong))
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not values:
+        return 0.0
+    rank = max(1, min(len(values), int(round(q / 100 * len(values) + 0.5))))
+    return values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, wall: float) -> Dict[str, Any]:
+    values = sorted(latencies)
+    count = len(values)
+    return {
+        "iterations": count,
+        "errors": errors,
+        "throughput_per_s": round(count / wall, 2) if wall else 0.0,
+        "mean_ms": round(1000 * sum(values) / count, 2) if count else 0.0,
+        "p50_ms": round(1000 * percentile(values, 50), 2),
+        "p95_ms": round(1000 * percentile(values, 95), 2),
+        "p99_ms": round(1000 * percentile(values, 99), 2),
+    }
+
+
+def bench_sync(func: Callable[[], Any], iterations: int, concurrency: int, reset: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+
+    def one(_):
+        if reset is not None:
+            reset()
+        started = time.perf_counter()
+        try:
+            func()
+            return time.perf_counter() - started, False
+        except Exception:
+            return time.perf_counter() - started, True
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, failed in pool.map(one, range(iterations)):
+            latencies.append(latency)
+            errors += failed
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def bench_async(factory: Callable[[], Awaitable[Any]], iterations: int, concurrency: int, reset: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    async def run() -> Tuple[List[float], int, float]:
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: List[float] = []
+        errors = 0
+
+        async def one():
+            nonlocal errors
+            async with semaphore:
+                if reset is not None:
+                    reset()
+                started = time.perf_counter()
+                try:
+                    await factory()
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(iterations)))
+        return latencies, errors, time.perf_counter() - started
+
+    return summarize(*asyncio.run(run()))
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Any], baseline_path: str, max_regression: float) -> bool:
+    """Prints the p50/p95 ratios to a baseline; returns False if any p95 regressed too far."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    ok = True
+    print(f"Compared with {baseline['meta'].get('commit')} ({baseline_path}):", file=sys.stderr)
+    for name, current in results["results"].items():
+        before = baseline["results"].get(name)
+        if not before or not before["p95_ms"] or not before["p50_ms"]:
+            continue
+        p50 = current["p50_ms"] / before["p50_ms"]
+        p95 = current["p95_ms"] / before["p95_ms"]
+        flag = ""
+        if p95 > max_regression:
+            ok = False
+            flag = "  REGRESSION"
+        print(f"  {name:<45} p50 x{p50:.2f}  p95 x{p95:.2f}{flag}", file=sys.stderr)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=30, help="iterations of each tool scenario")
+    parser.add_argument("--e2e-iterations", type=int, default=5, help="iterations of each end-to-end scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="calls in flight per scenario")
+    parser.add_argument("--only", help="run only scenarios whose name contains this text")
+    parser.add_argument("--posts", type=int, default=100, help="posts per fake subreddit")
+    parser.add_argument("--reddit-latency", type=float, default=0.02, help="seconds the fake Reddit API adds per request")
+    parser.add_argument("--reddit-jitter", type=float, default=0.01, help="random extra seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of Reddit requests failing with 503")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="seconds per stub model call")
+    parser.add_argument("--response-cache", action="store_true", help="keep the model response cache enabled")
+    parser.add_argument("--cassette", help="replay Reddit responses from this cassette instead of the fake API")
+    parser.add_argument("--cassette-latency", default="0", help="seconds per replayed response, or 'recorded'")
+    parser.add_argument("--record-cassette", help="record the fake API's responses to this cassette")
+    parser.add_argument("--output", help="write the JSON results to this file as well")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=1.25, help="allowed p95 ratio for --compare")
+    parser.add_argument("--verbose", action="store_true", help="show the tools' own log output")
+    args = parser.parse_args()
+
+    server = None
+    if args.cassette:
+        os.environ.update({
+            "REDDIT_CASSETTE": args.cassette,
+            "REDDIT_CASSETTE_MODE": "replay",
+            "REDDIT_CASSETTE_LATENCY": args.cassette_latency,
+        })
+    else:
+        server = start_fake_reddit(
+            posts_per_subreddit=args.posts,
+            ratelimit_budget=1_000_000,
+            latency=args.reddit_latency,
+            latency_jitter=args.reddit_jitter,
+            error_rate=args.error_rate,
+        )
+        os.environ.update({
+            "REDDIT_CLIENT_ID": "bench",
+            "REDDIT_CLIENT_SECRET": "bench",
+            "REDDIT_USER_AGENT": "reddit-news-aggregator benchmark",
+            "REDDIT_OAUTH_URL": server.url,
+            "REDDIT_URL": server.url,
+        })
+        if args.record_cassette:
+            os.environ.update({"REDDIT_CASSETTE": args.record_cassette, "REDDIT_CASSETTE_MODE": "record"})
+    scratch = tempfile.mkdtemp(prefix="reddit-bench-")
+    os.environ.update({
+        "REDDIT_RATE_LIMIT_QPM": "1000000",
+        "REDDIT_RATE_LIMIT_BURST": "1000",
+        "PREFETCH_ENABLED": "0",
+        "HEADLINE_STORE_PATH": os.path.join(scratch, "headlines.sqlite3"),
+        "RESPONSE_CACHE_PATH": os.path.join(scratch, "responses.sqlite3"),
+    })
+    if not args.response_cache:
+        os.environ["RESPONSE_CACHE_BYPASS"] = "1"
+
+    # Imported after the environment is set up, since the modules read it at import time.
+    import importlib
+
+    from agents.pipeline import match_workflow, run_query
+    from agents.reddit_scout.cache import listing_cache
+    from agents.reddit_scout.cassette import get_cassette
+    from agents.reddit_scout.comments import comment_cache
+    from agents.router.agent import agent as router_agent
+    from agents.summarization.rolling import rolling_summaries
+    from benchmarks.stub_model import install_stub_model
+
+    # The packages export their agent objects under the module names, so the
+    # tool functions are looked up on the modules themselves.
+    scout = importlib.import_module("agents.reddit_scout.agent")
+    politics_agent = importlib.import_module("agents.analysis.politics_agent")
+    technology_agent = importlib.import_module("agents.analysis.technology_agent")
+    business_agent = importlib.import_module("agents.analysis.business_agent")
+    finance_agent = importlib.import_module("agents.analysis.finance_agent")
+    classification = importlib.import_module("agents.classification.agent")
+    summarization = importlib.import_module("agents.summarization.agent")
+    install_stub_model(router_agent, latency=args.model_latency)
+    check_routing(match_workflow)
+
+    def cold():
+        listing_cache.clear()
+        comment_cache.clear()
+        rolling_summaries.clear()
+
+    subreddits = ["worldnews", "news", "sports", "politics", "technology"]
+    content = {name: [post["title"] for post in generate_posts(name, 25)] for name in subreddits}
+    many = [f"bench{i}" for i in range(10)]
+
+    tool_scenarios: List[Tuple[str, Callable[[], Any], Optional[Callable[[], None]]]] = [
+        ("scout.get_subreddit_news[cold]", lambda: checked(scout.get_subreddit_news("worldnews", 5)), cold),
+        ("scout.get_subreddit_news[warm]", lambda: checked(scout.get_subreddit_news("worldnews", 5)), None),
+        ("scout.get_multi_subreddit_news[3,cold]", lambda: checked(scout.get_multi_subreddit_news(None, 5)), cold),
+        ("scout.get_multi_subreddit_news[10,cold]", lambda: checked(scout.get_multi_subreddit_news(many, 5)), cold),
+        ("scout.get_comment_digests[5,cold]", lambda: checked(scout.get_comment_digests("worldnews", 5)), cold),
+        ("tool.summarize_content", lambda: summarization.summarize_content(content), None),
+        ("tool.classify_news", lambda: classification.classify_news(content), None),
+        ("tool.analyze_politics_news", lambda: politics_agent.analyze_politics_news(content), None),
+        ("tool.analyze_tech_news", lambda: technology_agent.analyze_tech_news(content), None),
+        ("tool.analyze_business_news", lambda: business_agent.analyze_business_news(content), None),
+        ("tool.analyze_finance_news", lambda: finance_agent.analyze_finance_news(content), None),
+    ]
+    e2e_scenarios = [
+        (f"e2e.{path}.{workflow}", lambda query=query, pipeline=(path == "pipeline"): run_query(query, use_pipeline=pipeline))
+        for path in ("pipeline", "router")
+        for workflow, query in QUERIES.items()
+    ]
+
+    results: Dict[str, Any] = {}
+    log = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with log:
+        for name, func, reset in tool_scenarios:
+            if args.only and args.only not in name:
+                continue
+            with contextlib.suppress(Exception):
+                func()  # warm-up: client, token and imports
+            results[name] = bench_sync(func, args.iterations, args.concurrency, reset)
+        for name, factory in e2e_scenarios:
+            if args.only and args.only not in name:
+                continue
+            cold()
+            asyncio.run(factory())  # warm-up: runners and sessions
+            results[name] = bench_async(factory, args.e2e_iterations, args.concurrency, cold)
+
+    output = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+            "fake_reddit": dict(server.counts) if server is not None else None,
+            "cassette": get_cassette().stats() if get_cassette() is not None else None,
+        },
+        "results": results,
+    }
+    if server is not None:
+        server.stop()
+    text = json.dumps(output, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if args.compare and not compare(output, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+"""
+Measures the cost of the trending engine: updates, top-K queries and memory.
+
+    python -m benchmarks.bench_trending
+    python -m benchmarks.bench_trending --histories 4,8,64,512 --tracked 1000,10000,100000
+
+Synthetic polls of 100-post listings are observed one minute apart, each post
+growing at its own rate. Reports the time per observed post at several ring
+buffer sizes (constant if updates are O(1)), the latency of a top-10 query at
+several numbers of tracked posts, and the memory the engine holds once far
+more posts than `--max-posts` have passed through it.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.reddit_scout.posts import Post
+from agents.reddit_scout.trending import TrendingEngine
+
+LISTING_SIZE = 100
+STARTED = 1_700_000_000.0
+
+
+def make_listing(subreddit: int, poll: int, offset: int = 0) -> List[Post]:
+    """Returns one poll of a listing; post i grows at i % 97 points per minute."""
+    return [
+        Post(f"s{subreddit}p{offset + i}", f"Headline {offset + i}", 100 + poll * ((offset + i) % 97), poll,
+             STARTED - 3600, permalink=f"/r/s{subreddit}/comments/{offset + i}/")
+        for i in range(LISTING_SIZE)
+    ]
+
+
+def update_cost(history: int, polls: int, subreddits: int) -> float:
+    """Seconds per observed post, with every ring already full."""
+    engine = TrendingEngine(history=history, max_posts=subreddits * LISTING_SIZE, ttl=10**9)
+    listings = [[make_listing(s, p) for s in range(subreddits)] for p in range(history + polls)]
+    for p in range(history):
+        for s in range(subreddits):
+            engine.observe(f"s{s}", listings[p][s], STARTED + 60 * p)
+    started = time.perf_counter()
+    for p in range(history, history + polls):
+        for s in range(subreddits):
+            engine.observe(f"s{s}", listings[p][s], STARTED + 60 * p)
+    return (time.perf_counter() - started) / (polls * subreddits * LISTING_SIZE)
+
+
+def top_latency(tracked: int, k: int, repeats: int) -> float:
+    """Seconds per top-k query over `tracked` posts."""
+    engine = TrendingEngine(max_posts=tracked, ttl=10**9)
+    for p in range(3):
+        for s in range(tracked // LISTING_SIZE):
+            engine.observe(f"s{s % 20}", make_listing(s, p, offset=s * LISTING_SIZE), STARTED + 60 * p)
+    started = time.perf_counter()
+    for _ in range(repeats):
+        engine.top(k)
+    return (time.perf_counter() - started) / repeats
+
+
+def bounded_memory(max_posts: int, history: int, seen: int) -> dict:
+    """Memory held after `seen` distinct posts, each polled a few times, passed through the engine."""
+    gc.collect()
+    tracemalloc.start()
+    engine = TrendingEngine(history=history, max_posts=max_posts, ttl=10**9)
+    peak_tracked = 0
+    for batch in range(seen // LISTING_SIZE):
+        for p in range(3):
+            engine.observe(f"s{batch % 20}", make_listing(batch, p, offset=batch * LISTING_SIZE), STARTED + 60 * (batch + p))
+        peak_tracked = max(peak_tracked, len(engine))
+        if batch == max_posts // LISTING_SIZE:
+            gc.collect()
+            at_capacity, _ = tracemalloc.get_traced_memory()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "posts_seen": seen,
+        "max_posts": max_posts,
+        "tracked": len(engine),
+        "peak_tracked": peak_tracked,
+        "evictions": engine.stats()["evictions"],
+        "bytes_at_capacity": at_capacity,
+        "bytes_at_end": current,
+        "bytes_per_tracked_post": round(current / max(1, len(engine)), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--histories", default="4,8,32,128", help="comma-separated ring buffer sizes")
+    parser.add_argument("--tracked", default="1000,5000,20000", help="comma-separated numbers of tracked posts")
+    parser.add_argument("--polls", type=int, default=20, help="polls timed per ring buffer size")
+    parser.add_argument("--subreddits", type=int, default=10, help="listings per poll")
+    parser.add_argument("--max-posts", type=int, default=5000, help="posts the engine tracks at most in the memory test")
+    parser.add_argument("--seen", type=int, default=50000, help="distinct posts passed through in the memory test")
+    args = parser.parse_args()
+
+    results = {
+        "update_us_per_post": {
+            history: round(1e6 * update_cost(int(history), args.polls, args.subreddits), 2)
+            for history in args.histories.split(",")
+        },
+        "top10_ms": {
+            tracked: round(1000 * top_latency(int(tracked), 10, repeats=20), 3)
+            for tracked in args.tracked.split(",")
+        },
+        "memory": bounded_memory(args.max_posts, 8, args.seen),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,495 @@
+#!/usr/bin/env python
+"""
+Local fake of the Reddit API used by the benchmarks.
+
+It serves just enough of the OAuth, listing and comment endpoints for PRAW,
+generates deterministic posts and comment trees for any subreddit name and sends the x-ratelimit-* headers
+Reddit uses, answering 429 once the configured budget is spent. Point the scout
+at it with:
+
+    REDDIT_OAUTH_URL=http://127.0.0.1:8765 REDDIT_URL=http://127.0.0.1:8765
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+
+HEADLINE_TEMPLATES = [
+    "Senate passes {adj} bill on {topic} after late-night vote",
+    "{company} unveils {adj} AI chip aimed at data centers",
+    "Stocks {move} as investors weigh {topic} outlook",
+    "Scientists report {adj} discovery about {topic}",
+    "Star player signs {adj} contract extension",
+    "New study links {topic} to heart health",
+    "Record heatwave strains power grid across {region}",
+    "{company} shares {move} after quarterly earnings beat",
+    "Court rules on {adj} {topic} case",
+    "Streaming service announces {adj} series based on {topic}",
+]
+FILLERS = {
+    "adj": ["landmark", "controversial", "record-breaking", "surprising", "major", "long-awaited"],
+    "topic": ["climate policy", "privacy", "inflation", "space exploration", "vaccines", "trade"],
+    "company": ["Nvidia", "Apple", "Tesla", "Microsoft", "Amazon", "Samsung"],
+    "move": ["rally", "slide", "surge", "tumble"],
+    "region": ["Texas", "Europe", "India", "the Midwest"],
+}
+COMMENT_SENTENCES = [
+    "This is going to matter a lot more than people think.",
+    "Source? The article doesn't say that at all.",
+    "I work in this field and the headline oversells it.",
+    "Everyone saw this coming years ago.",
+    "The second paragraph is the real story here.",
+    "Can someone explain what this means for regular people?",
+    "Not surprised, given what happened last quarter.",
+    "Great, another thing to worry about.",
+]
+# Replies below this depth are not generated.
+MAX_COMMENT_DEPTH = 6
+# Top-level comments generated per post at most, whatever its num_comments says.
+MAX_TOP_LEVEL_COMMENTS = 500
+
+
+def generate_posts(subreddit: str, count: int, now: Optional[float] = None) -> List[dict]:
+    """
+    Generates a deterministic hot listing for a subreddit.
+
+    Args:
+        subreddit: The subreddit name; also seeds the generator.
+        count: Number of posts in the listing.
+        now: Timestamp the newest post is created at.
+
+    Returns:
+        A list of Reddit "t3" data dictionaries ordered by descending score.
+    """
+    rng = random.Random(subreddit.lower())
+    now = time.time() if now is None else now
+    return [
+        make_post(rng, subreddit, f"{subreddit.lower()[:4]}{i:05d}", f"#{i}", 50_000 // (i + 1), now - i * 90)
+        for i in range(count)
+    ]
+
+
+def make_post(rng: random.Random, subreddit: str, post_id: str, label: str, base_score: int, created_utc: float) -> dict:
+    """Builds one Reddit "t3" data dictionary with a generated headline and score."""
+    template = rng.choice(HEADLINE_TEMPLATES)
+    title = template.format(**{key: rng.choice(values) for key, values in FILLERS.items()})
+    return {
+        "id": post_id,
+        "name": f"t3_{post_id}",
+        "title": f"{title} ({subreddit} {label})",
+        "subreddit": subreddit,
+        "score": max(1, base_score + rng.randint(0, 50)),
+        "num_comments": rng.randint(0, 5_000),
+        "created_utc": created_utc,
+        "url": f"https://example.com/{subreddit}/{post_id}",
+        "permalink": f"/r/{subreddit}/comments/{post_id}/",
+    }
+
+
+def comment_id(post_id: str, path: Tuple[int, ...]) -> str:
+    """Id of the comment at `path` (reply positions from the top level down) under a post."""
+    return f"{post_id}-{'_'.join(str(i) for i in path)}"
+
+
+def reply_count(post: dict, path: Tuple[int, ...]) -> int:
+    """Replies of the comment at `path`; the empty path stands for the post itself."""
+    if not path:
+        return min(post["num_comments"], MAX_TOP_LEVEL_COMMENTS)
+    if len(path) >= MAX_COMMENT_DEPTH:
+        return 0
+    return random.Random(comment_id(post["id"], path)).choice([0, 0, 1, 2, 3, 5])
+
+
+def make_comment(post: dict, path: Tuple[int, ...]) -> dict:
+    """Builds one Reddit "t1" data dictionary; earlier replies score higher, like a 'top' sort."""
+    rng = random.Random(comment_id(post["id"], path))
+    parent = f"t1_{comment_id(post['id'], path[:-1])}" if len(path) > 1 else post["name"]
+    return {
+        "id": comment_id(post["id"], path),
+        "name": f"t1_{comment_id(post['id'], path)}",
+        "parent_id": parent,
+        "link_id": post["name"],
+        "author": f"user{rng.randint(1, 99_999)}",
+        "body": " ".join(rng.choice(COMMENT_SENTENCES) for _ in range(rng.randint(1, 6))),
+        "score": max(1, post["score"] // (10 * (path[-1] + 1) * len(path)) + rng.randint(-3, 3)),
+        "depth": len(path) - 1,
+        "stickied": False,
+        "replies": "",
+    }
+
+
+class FakeRedditServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server emulating the parts of the Reddit API the scout uses.
+
+    Args:
+        port: Port to bind on 127.0.0.1; 0 picks a free one.
+        posts_per_subreddit: Length of each generated listing.
+        ratelimit_budget: Requests allowed per rate-limit window.
+        ratelimit_window: Length of the rate-limit window in seconds.
+        missing: Subreddits answered with a redirect, like nonexistent ones.
+        private: Subreddits answered with 403.
+        new_posts_per_minute: Posts submitted to every subreddit per minute
+            after startup; they appear at the top of its /new listing.
+        latency: Seconds added to every response.
+        latency_jitter: Up to this many seconds are added on top, at random.
+        error_rate: Fraction of API requests answered with a 503.
+        score_growth: Points per minute an average post gains while the server
+            runs. Each post grows at its own rate; some accelerate.
+        seed: Seeds the latency jitter and error injection.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        posts_per_subreddit: int = 100,
+        ratelimit_budget: int = 600,
+        ratelimit_window: float = 600.0,
+        missing: Optional[Set[str]] = None,
+        private: Optional[Set[str]] = None,
+        new_posts_per_minute: float = 0.0,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        score_growth: float = 0.0,
+        seed: int = 0,
+    ):
+        super().__init__(("127.0.0.1", port), FakeRedditHandler)
+        self.posts_per_subreddit = posts_per_subreddit
+        self.ratelimit_budget = ratelimit_budget
+        self.ratelimit_window = ratelimit_window
+        self.missing = {name.lower() for name in (missing or set())}
+        self.private = {name.lower() for name in (private or set())}
+        self.new_posts_per_minute = new_posts_per_minute
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.score_growth = score_growth
+        self.rng = random.Random(seed)
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.window_started = time.monotonic()
+        self.used = 0
+        self.counts: Dict[str, int] = {"requests": 0, "token_requests": 0, "throttled": 0, "injected_errors": 0}
+        self._listings: Dict[str, List[dict]] = {}
+        self._submitted: Dict[str, List[dict]] = {}
+        self._posts: Dict[str, dict] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def start(self) -> "FakeRedditServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def listing(self, subreddit: str) -> List[dict]:
+        with self.lock:
+            posts = self._listings.get(subreddit.lower())
+            if posts is None:
+                posts = generate_posts(subreddit, self.posts_per_subreddit)
+                self._listings[subreddit.lower()] = posts
+                self._posts.update((post["id"], post) for post in posts)
+            return posts
+
+    def post(self, post_id: str) -> Optional[dict]:
+        """Returns a post already served in a listing, by id."""
+        with self.lock:
+            return self._posts.get(post_id)
+
+    def comment_tree(self, post: dict, path: Tuple[int, ...], depth: int, budget: List[int]) -> List[dict]:
+        """
+        Renders the replies under `path` like Reddit's comments endpoint.
+
+        At most budget[0] comments are rendered in total and `depth` levels
+        deep; the rest of each reply list is left as a "more" stub listing
+        the ids that /api/morechildren expands.
+        """
+        things = []
+        count = reply_count(post, path)
+        for i in range(count):
+            if budget[0] <= 0 or depth <= 0:
+                remaining = [comment_id(post["id"], path + (j,)) for j in range(i, count)]
+                things.append({"kind": "more", "data": {
+                    "count": len(remaining),
+                    "children": remaining,
+                    "parent_id": f"t1_{comment_id(post['id'], path)}" if path else post["name"],
+                    "depth": len(path),
+                }})
+                break
+            budget[0] -= 1
+            data = make_comment(post, path + (i,))
+            replies = self.comment_tree(post, path + (i,), depth - 1, budget)
+            if replies:
+                data["replies"] = {"kind": "Listing", "data": {"children": replies, "after": None, "before": None}}
+            things.append({"kind": "t1", "data": data})
+        return things
+
+    def new_listing(self, subreddit: str) -> List[dict]:
+        """Returns the /new listing: posts submitted since startup, then the generated ones."""
+        base = self.listing(subreddit)
+        key = subreddit.lower()
+        with self.lock:
+            submitted = self._submitted.setdefault(key, [])
+            if self.new_posts_per_minute > 0:
+                interval = 60.0 / self.new_posts_per_minute
+                due = int((time.time() - self.started) / interval)
+                while len(submitted) < due:
+                    k = len(submitted)
+                    rng = random.Random(f"{key}/new/{k}")
+                    post_id = f"{key[:4]}n{k:05d}"
+                    submitted.append(make_post(rng, subreddit, post_id, f"new #{k}", 0,
+                                               self.started + (k + 1) * interval))
+                    self._posts[post_id] = submitted[-1]
+            return submitted[::-1] + base
+
+    def grown(self, post: dict) -> dict:
+        """Returns `post` with the score and comments it has gained since startup."""
+        if self.score_growth <= 0:
+            return post
+        rng = random.Random(f"{post['id']}/growth")
+        minutes = (time.time() - max(self.started, post["created_utc"])) / 60
+        rate = self.score_growth * rng.uniform(0, 2)
+        # One post in five takes off: its rate grows by itself every ten minutes.
+        gained = rate * minutes * (1 + minutes / 10) if rng.random() < 0.2 else rate * minutes
+        return dict(post, score=post["score"] + int(gained), num_comments=post["num_comments"] + int(gained / 10))
+
+    def charge(self) -> Dict[str, str]:
+        """Counts one API request and returns the rate-limit headers for it."""
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_started >= self.ratelimit_window:
+                self.window_started = now
+                self.used = 0
+            self.used += 1
+            self.counts["requests"] += 1
+            reset = max(0, int(self.ratelimit_window - (now - self.window_started)))
+            remaining = max(0, self.ratelimit_budget - self.used)
+            return {
+                "x-ratelimit-used": str(self.used),
+                "x-ratelimit-remaining": f"{remaining:.1f}",
+                "x-ratelimit-reset": str(reset),
+                "over_budget": "1" if self.used > self.ratelimit_budget else "",
+            }
+
+
+class FakeRedditHandler(BaseHTTPRequestHandler):
+    server: FakeRedditServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self) -> Dict[str, List[str]]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return parse_qs(self.rfile.read(length).decode("utf-8")) if length else {}
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        form = self._read_body()
+        if path == "/api/v1/access_token":
+            with self.server.lock:
+                self.server.counts["token_requests"] += 1
+            self._send_json({"access_token": "fake-token", "token_type": "bearer", "expires_in": 86400, "scope": "*"})
+            return
+        headers = self._admit()
+        if headers is None:
+            return
+        if path == "/api/search_reddit_names":
+            name = form.get("query", [""])[0]
+            if name.lower() in self.server.missing:
+                self._send_json({"message": "Not Found", "error": 404}, 404, headers)
+            else:
+                self._send_json({"names": [name]}, headers=headers)
+            return
+        self._send_json({"message": "Not Found", "error": 404}, 404, headers)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        parts = [part for part in parsed.path.split("/") if part]
+        headers = self._admit()
+        if headers is None:
+            return
+        if len(parts) == 3 and parts[0] == "r" and parts[2] in ("hot", "new", "top", "rising"):
+            self._send_listing(parts[1], parts[2], query, headers)
+            return
+        if len(parts) == 2 and parts[0] == "comments":
+            self._send_comments(parts[1], query, headers)
+            return
+        if parts == ["api", "morechildren"]:
+            self._send_more_children(query, headers)
+            return
+        self._send_json({"message": "Not Found", "error": 404}, 404, headers)
+
+    def _admit(self) -> Optional[Dict[str, str]]:
+        """
+        Charges an API request and applies the configured latency and errors.
+
+        Returns:
+            The rate-limit headers, or None if a 429 or 503 was already sent.
+        """
+        server = self.server
+        headers = server.charge()
+        over_budget = headers.pop("over_budget")
+        with server.lock:
+            delay = server.latency + server.rng.uniform(0, server.latency_jitter)
+            failed = server.rng.random() < server.error_rate
+        if delay:
+            time.sleep(delay)
+        if over_budget:
+            with server.lock:
+                server.counts["throttled"] += 1
+            self._send_json({"message": "Too Many Requests", "error": 429}, 429, headers)
+            return None
+        if failed:
+            with server.lock:
+                server.counts["injected_errors"] += 1
+            self._send_json({"message": "Service Unavailable", "error": 503}, 503, headers)
+            return None
+        return headers
+
+    def _send_listing(self, name: str, sort: str, query: Dict[str, List[str]], headers: Dict[str, str]) -> None:
+        subreddits = name.split("+")
+        for subreddit in subreddits:
+            if subreddit.lower() in self.server.missing:
+                headers["Location"] = f"{self.server.url}/subreddits/search?q={subreddit}"
+                self._send_json({}, 302, headers)
+                return
+            if subreddit.lower() in self.server.private:
+                self._send_json({"reason": "private", "message": "Forbidden", "error": 403}, 403, headers)
+                return
+
+        listing = self.server.new_listing if sort == "new" else self.server.listing
+        if len(subreddits) == 1:
+            posts = listing(subreddits[0])
+        else:
+            order = "created_utc" if sort == "new" else "score"
+            posts = sorted(
+                (post for subreddit in subreddits for post in listing(subreddit)),
+                key=lambda post: -post[order],
+            )
+
+        limit = min(100, int(query.get("limit", ["25"])[0]))
+        names = [post["name"] for post in posts]
+        before = query.get("before", [None])[0]
+        after = query.get("after", [None])[0]
+        if before:
+            # The page of items listed just above `before`, i.e. newer ones.
+            end = names.index(before) if before in names else 0
+            page = posts[max(0, end - limit):end]
+            next_after = None
+        else:
+            start = 0
+            if after:
+                start = names.index(after) + 1 if after in names else len(posts)
+            page = posts[start:start + limit]
+            next_after = page[-1]["name"] if page and start + limit < len(posts) else None
+        self._send_json({
+            "kind": "Listing",
+            "data": {
+                "after": next_after,
+                "before": None,
+                "dist": len(page),
+                "children": [{"kind": "t3", "data": self.server.grown(post)} for post in page],
+            },
+        }, headers=headers)
+
+
+    def _send_comments(self, post_id: str, query: Dict[str, List[str]], headers: Dict[str, str]) -> None:
+        post = self.server.post(post_id)
+        if post is None:
+            self._send_json({"message": "Not Found", "error": 404}, 404, headers)
+            return
+        limit = min(500, int(query.get("limit", ["200"])[0]))
+        depth = min(10, int(query.get("depth", ["10"])[0]))
+        comments = self.server.comment_tree(post, (), depth, [limit])
+        self._send_json([
+            {"kind": "Listing", "data": {"children": [{"kind": "t3", "data": post}], "after": None, "before": None}},
+            {"kind": "Listing", "data": {"children": comments, "after": None, "before": None}},
+        ], headers=headers)
+
+    def _send_more_children(self, query: Dict[str, List[str]], headers: Dict[str, str]) -> None:
+        post = self.server.post(query.get("link_id", [""])[0].replace("t3_", "", 1))
+        if post is None:
+            self._send_json({"json": {"errors": [["INVALID_LINK", "invalid link", "link_id"]]}}, headers=headers)
+            return
+        depth = min(10, int(query.get("depth", ["1"])[0]))
+        things = []
+
+        def add(path: Tuple[int, ...], levels: int) -> None:
+            things.append({"kind": "t1", "data": make_comment(post, path)})
+            if levels > 1:
+                for i in range(reply_count(post, path)):
+                    add(path + (i,), levels - 1)
+
+        # Like Reddit, the requested comments come back as a flat list; replies
+        # follow their parent and point to it by parent_id.
+        for child in query.get("children", [""])[0].split(",")[:100]:
+            _, _, path = child.partition("-")
+            if path:
+                add(tuple(int(i) for i in path.split("_")), depth)
+        self._send_json({"json": {"errors": [], "data": {"things": things}}}, headers=headers)
+
+
+def start_fake_reddit(**kwargs) -> FakeRedditServer:
+    """Starts a FakeRedditServer in a background thread and returns it."""
+    return FakeRedditServer(**kwargs).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake Reddit API.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--posts", type=int, default=100, help="posts per subreddit")
+    parser.add_argument("--budget", type=int, default=600, help="requests per rate-limit window")
+    parser.add_argument("--window", type=float, default=600.0, help="rate-limit window in seconds")
+    parser.add_argument("--new-per-minute", type=float, default=0.0, help="posts submitted per subreddit per minute")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="up to this many extra seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--score-growth", type=float, default=0.0, help="points per minute an average post gains")
+    args = parser.parse_args()
+
+    server = FakeRedditServer(
+        port=args.port,
+        posts_per_subreddit=args.posts,
+        ratelimit_budget=args.budget,
+        ratelimit_window=args.window,
+        new_posts_per_minute=args.new_per_minute,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        score_growth=args.score_growth,
+    )
+    print(f"Fake Reddit API listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
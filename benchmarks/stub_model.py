@@ -0,0 +1,193 @@
+"""
+Deterministic stand-in for the Gemini model used by the benchmarks.
+
+StubModel plays every agent of the system without network access. Agents with
+tools call them in a fixed order derived from the tools they have and the
+request text; the router calls the scout and then the summarization,
+classification or analysis agents like the real model would for the standard
+workflows. Each call sleeps for a simulated latency that grows with the
+prompt size, so timings stay comparable between runs.
+"""
+
+import asyncio
+import json
+import re
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.tools import agent_tool
+from google.genai import types
+
+DEFAULT_SUBREDDITS = ["worldnews", "news", "sports"]
+
+_SUBREDDIT_RE = re.compile(r"\br/([A-Za-z0-9_]+)")
+_ANALYSIS_RE = re.compile(r"\b(analy[sz]|in-depth|insight)", re.I)
+_CATEGORIES_RE = re.compile(r"\b(categori|classif|topic)", re.I)
+# The pipeline sends data it already fetched and asks for a direct answer.
+_NO_TOOLS_RE = re.compile(r"do not call any tools", re.I)
+# Packed payload lines: headline id, source keys, headline.
+_PACKED_LINE_RE = re.compile(r"^(\d+) [a-z,]+ ", re.M)
+
+# Analysis agents the router calls for words in the request.
+_ANALYSTS = [
+    (re.compile(r"\bpolitic", re.I), "politics_analysis_agent"),
+    (re.compile(r"\btech", re.I), "technology_analysis_agent"),
+    (re.compile(r"\b(business|market|econom|stock)", re.I), "business_analysis_agent"),
+    (re.compile(r"\bfinanc", re.I), "finance_analysis_agent"),
+]
+# Classification category each analysis tool reads.
+_ANALYSIS_CATEGORIES = {
+    "analyze_politics_news": "politics",
+    "analyze_tech_news": "technology",
+    "analyze_business_news": "business",
+    "analyze_finance_news": "business",
+}
+
+
+def _extract_json(text: str) -> Dict[str, Any]:
+    """Returns the first JSON object embedded in `text`, or an empty dict."""
+    start = text.find("{")
+    end = text.rfind("}")
+    if start < 0 or end < start:
+        return {}
+    try:
+        value = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def _flatten(content: Dict[str, Any], category: Optional[str] = None) -> Dict[str, List[str]]:
+    """Turns classified content (category -> source -> headlines) into source -> headlines."""
+    if not content or all(isinstance(value, list) for value in content.values()):
+        return content
+    flat: Dict[str, List[str]] = {}
+    for name, sources in content.items():
+        if category is not None and name != category or not isinstance(sources, dict):
+            continue
+        for source, headlines in sources.items():
+            flat.setdefault(source, []).extend(headlines)
+    return flat
+
+
+class StubModel(BaseLlm):
+    """
+    A BaseLlm that answers from a fixed script instead of calling a model.
+
+    Attributes:
+        latency: Seconds every call takes.
+        latency_per_kchar: Additional seconds per 1000 characters of prompt.
+    """
+
+    model: str = "stub-model"
+    latency: float = 0.05
+    latency_per_kchar: float = 0.002
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        request_text, responses = self._turn(llm_request)
+        prompt_chars = sum(len(part.text or "") for content in llm_request.contents for part in content.parts or [])
+        prompt_chars += sum(len(json.dumps(response, default=str)) for _, response in responses)
+        await asyncio.sleep(self.latency + self.latency_per_kchar * prompt_chars / 1000)
+
+        plan = self._plan(set(llm_request.tools_dict), request_text, responses)
+        if len(responses) < len(plan):
+            name, args = plan[len(responses)]
+            part = types.Part(function_call=types.FunctionCall(name=name, args=args))
+        else:
+            part = types.Part(text=self._answer(request_text, responses))
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+    @staticmethod
+    def _turn(llm_request: LlmRequest) -> Tuple[str, List[Tuple[str, Any]]]:
+        """Returns the latest user text and the tool responses received since."""
+        request_text = ""
+        responses: List[Tuple[str, Any]] = []
+        for content in llm_request.contents:
+            for part in content.parts or []:
+                if part.function_response is not None:
+                    responses.append((part.function_response.name, part.function_response.response))
+                elif content.role == "user" and part.text:
+                    request_text = part.text
+                    responses = []
+        return request_text, responses
+
+    def _plan(self, tools: set, text: str, responses: List[Tuple[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Returns the (tool, args) calls this agent makes for the request, in order."""
+        if _NO_TOOLS_RE.search(text):
+            return []
+        if "reddit_scout_agent" in tools:
+            return self._router_plan(text, responses)
+        if "get_multi_subreddit_news" in tools:
+            subreddits = _SUBREDDIT_RE.findall(text) or list(DEFAULT_SUBREDDITS)
+            return [("get_multi_subreddit_news", {"subreddits": subreddits, "limit": 5})]
+        content = _extract_json(text)
+        if "summarize_content" in tools:
+            return [("summarize_content", {"content": _flatten(content)})]
+        if "classify_news" in tools:
+            return [("classify_news", {"news_content": _flatten(content)})]
+        for tool in sorted(tools):
+            if tool in _ANALYSIS_CATEGORIES:
+                news = _flatten(content, _ANALYSIS_CATEGORIES[tool]) or _flatten(content)
+                return [(tool, {"news_content": news})]
+        return []
+
+    def _router_plan(self, text: str, responses: List[Tuple[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+        def previous(step: int) -> str:
+            if step < len(responses):
+                result = responses[step][1]
+                return str(result.get("result", result)) if isinstance(result, dict) else str(result)
+            return ""
+
+        plan = [("reddit_scout_agent", {"request": text})]
+        if _ANALYSIS_RE.search(text):
+            plan.append(("classification_agent", {"request": previous(0)}))
+            analysts = [agent for pattern, agent in _ANALYSTS if pattern.search(text)] or ["politics_analysis_agent"]
+            plan.extend((agent, {"request": previous(1)}) for agent in analysts)
+        elif _CATEGORIES_RE.search(text):
+            plan.append(("classification_agent", {"request": previous(0)}))
+        else:
+            plan.append(("summarization_agent", {"request": previous(0)}))
+        return plan
+
+    @staticmethod
+    def _answer(text: str, responses: List[Tuple[str, Any]]) -> str:
+        if not responses:
+            if "list of headline ids" in text:
+                # Classification by id: every headline into the first category.
+                return json.dumps({"politics": [int(i) for i in _PACKED_LINE_RE.findall(text)]})
+            return f"Stub answer to a {len(text)}-character request."
+        name, result = responses[-1]
+        if isinstance(result, dict) and set(result) == {"result"}:
+            result = result["result"]
+        # Tool results are passed on as JSON so the next agent can use them.
+        return json.dumps(result, ensure_ascii=False, default=str)
+
+
+def walk_agents(root: BaseAgent) -> List[BaseAgent]:
+    """Returns the agent and every agent reachable through sub-agents or AgentTools."""
+    found: Dict[str, BaseAgent] = {}
+    pending = [root]
+    while pending:
+        agent = pending.pop()
+        if agent.name in found:
+            continue
+        found[agent.name] = agent
+        pending.extend(agent.sub_agents)
+        for tool in getattr(agent, "tools", []):
+            if isinstance(tool, agent_tool.AgentTool):
+                pending.append(tool.agent)
+    return list(found.values())
+
+
+def install_stub_model(root: BaseAgent, latency: float = 0.05, latency_per_kchar: float = 0.002) -> StubModel:
+    """Replaces the model of `root` and every agent below it with one StubModel."""
+    stub = StubModel(latency=latency, latency_per_kchar=latency_per_kchar)
+    for agent in walk_agents(root):
+        if hasattr(agent, "model"):
+            agent.model = stub
+    return stub
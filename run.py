@@ -1,10 +1,95 @@
 #!/usr/bin/env python
 """
 Command line entry point for the Reddit News Aggregator and Analysis System.
+
+Without arguments it starts an interactive session with the router agent.
+With --query it answers a single request, running the standard workflows
+(news + summary, news + categories, news + in-depth analysis) directly and
+falling back to the router LLM for anything else, then prints per-stage timings.
+With --batch it answers every query of a JSONL file the same way, several at a
+time, and writes one JSON result line per query. With --archive it pages through
+the hot, new and top listings of subreddits and writes every post as a JSON line.
 """
 
-from google.adk.run import run_cli
-from agents import agent
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+
+
+def run_single_query(query: str, use_pipeline: bool) -> None:
+    from agents.pipeline import run_query
+
+    result = asyncio.run(run_query(query, use_pipeline=use_pipeline))
+    print(result.text)
+    print(f"\n--- Answered via {result.path}" + (f" ('{result.workflow}' workflow)" if result.workflow else "") + " ---")
+    print(result.timings.format())
+
+
+def run_batch_file(path: str, output: str, concurrency: int, use_pipeline: bool) -> None:
+    from agents.pipeline import read_queries, run_batch
+
+    if path == "-":
+        queries = read_queries(sys.stdin)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            queries = read_queries(f)
+
+    out = sys.stdout if output == "-" else open(output, "w", encoding="utf-8")
+    try:
+        # Results own stdout when they are written there; the tools' log lines go to stderr.
+        log = contextlib.redirect_stdout(sys.stderr) if out is sys.stdout else contextlib.nullcontext()
+        with log:
+            summary = asyncio.run(run_batch(queries, out, concurrency=concurrency, use_pipeline=use_pipeline))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"--- Batch: {json.dumps(summary)} ---", file=sys.stderr)
+
+
+def run_archive(subreddits: str, output: str, cursor_path: str, limit: int) -> None:
+    from agents.reddit_scout.archive import CursorFile, JsonlSink, archive
+
+    cursors = CursorFile(cursor_path) if cursor_path else None
+    # A resumed run continues its output file from where its cursors were saved;
+    # a fresh one starts it over.
+    resuming = cursors is not None and os.path.exists(cursor_path)
+    sink = JsonlSink(output, append=resuming, resume_at=cursors.output_offset if resuming else None)
+    try:
+        log = contextlib.redirect_stdout(sys.stderr) if output == "-" else contextlib.nullcontext()
+        with log:
+            summary = archive([name.strip() for name in subreddits.split(",") if name.strip()], sink, limit=limit, cursors=cursors)
+    finally:
+        sink.close()
+    print(f"--- Archive: {json.dumps(summary)} ---", file=sys.stderr)
+
 
 if __name__ == "__main__":
-    run_cli(agent) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Reddit News Aggregator CLI")
+    parser.add_argument("--query", help="answer a single request and print per-stage timings")
+    parser.add_argument("--batch", metavar="FILE", help="answer every query of a JSONL file ('-' for stdin)")
+    parser.add_argument("--concurrency", type=int, help="queries answered at once in batch mode (default: BATCH_CONCURRENCY or 8)")
+    parser.add_argument("--archive", metavar="SUBREDDITS", help="page through the listings of comma-separated subreddits and write every post")
+    parser.add_argument("--limit", type=int, help="posts per subreddit and listing in archive mode (default: ARCHIVE_MAX_POSTS or 1000)")
+    parser.add_argument("--cursors", metavar="FILE", help="resume an archive run from this file and save its progress there")
+    parser.add_argument("--output", default="-", help="file for the batch results or archived posts (default: stdout)")
+    parser.add_argument("--router-only", action="store_true", help="always use the router LLM, even for standard workflows")
+    args = parser.parse_args()
+
+    if args.archive:
+        run_archive(args.archive, args.output, args.cursors, args.limit)
+    elif args.batch:
+        run_batch_file(args.batch, args.output, args.concurrency, use_pipeline=not args.router_only)
+    elif args.query:
+        run_single_query(args.query, use_pipeline=not args.router_only)
+    else:
+        # Imported only here, so --help and --query don't pay for the interactive runner.
+        from google.adk.run import run_cli
+        from agents import agent
+        from agents.reddit_scout.agent import start_prefetch
+
+        # Warm the default subreddits while the user types the first request.
+        start_prefetch()
+        run_cli(agent)